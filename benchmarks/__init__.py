@@ -0,0 +1,8 @@
+"""
+    Performance benchmarks.
+
+    Standalone micro-benchmarks are modules of this package that are run
+    with ``python -m benchmarks.<name>``. The hot path suite, with JSON
+    baselines for regression checks, is run with ``python -m benchmarks``,
+    see :mod:`benchmarks.suite`.
+"""
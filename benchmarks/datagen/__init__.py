@@ -0,0 +1,481 @@
+"""
+    Synthetic dataset generator.
+
+    Fills the tables of SQLAlchemy, Peewee and MongoEngine models with
+    realistic fake data, to find scaling problems of the admin views before
+    production does:
+
+    - values follow column types, lengths, choices and names, for example
+      an ``email`` column gets e-mail addresses
+    - foreign keys reference existing rows, with a skewed fan-out: a few
+      parents have many children, most have a few
+    - nullable columns get a fraction of `NULL` values
+    - unique columns get unique values
+
+    Rows are generated in chunks and written with the bulk insert path of
+    the backend, so tables of tens of millions of rows can be loaded with
+    constant memory.
+
+    Backend modules turn model metadata into :class:`TableSpec` instances
+    and write the chunks produced by :meth:`Generator.generate`. See
+    :mod:`benchmarks.datagen.__main__` for the command line.
+"""
+import datetime
+import decimal
+import random
+import sys
+import time
+import uuid
+
+
+# Value kinds
+INTEGER = 'integer'
+FLOAT = 'float'
+DECIMAL = 'decimal'
+BOOLEAN = 'boolean'
+DATE = 'date'
+DATETIME = 'datetime'
+TIME = 'time'
+STRING = 'string'
+TEXT = 'text'
+BINARY = 'binary'
+UUID = 'uuid'
+OBJECTID = 'objectid'
+GEOMETRY = 'geometry'
+
+DATE_START = datetime.datetime(2015, 1, 1)
+DATE_RANGE = 10 * 365 * 24 * 3600
+
+FIRST_NAMES = (
+    'Harry', 'Amelia', 'Oliver', 'Jack', 'Isabella', 'Charlie', 'Sophie', 'Mia',
+    'Jacob', 'Thomas', 'Emily', 'Lily', 'Ava', 'Isla', 'Alfie', 'Olivia', 'Jessica',
+    'Riley', 'William', 'James', 'Geoffrey', 'Lisa', 'Benjamin', 'Stacey', 'Lucy',
+)
+
+LAST_NAMES = (
+    'Brown', 'Smith', 'Patel', 'Jones', 'Williams', 'Johnson', 'Taylor', 'Thomas',
+    'Roberts', 'Khan', 'Lewis', 'Jackson', 'Clarke', 'James', 'Phillips', 'Wilson',
+    'Ali', 'Mason', 'Mitchell', 'Rose', 'Davis', 'Davies', 'Rodriguez', 'Cox', 'Alexander',
+)
+
+WORDS = (
+    'lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipisicing', 'elit',
+    'sed', 'eiusmod', 'tempor', 'incididunt', 'labore', 'dolore', 'magna', 'aliqua',
+    'enim', 'minim', 'veniam', 'quis', 'nostrud', 'exercitation', 'ullamco', 'laboris',
+    'nisi', 'aliquip', 'commodo', 'consequat', 'duis', 'aute', 'irure', 'voluptate',
+)
+
+DOMAINS = ('example.com', 'example.org', 'example.net')
+
+# Number of distinct values of text columns
+TEXT_POOL_SIZE = 1024
+
+
+class ColumnSpec(object):
+    """
+        Column of a generated table.
+    """
+    def __init__(self, name, kind, nullable=True, unique=False, primary_key=False,
+                 references=None, choices=None, max_length=None):
+        """
+            Constructor.
+
+            :param name:
+                Column name, as used by the backend writer
+            :param kind:
+                Value kind, for example `INTEGER` or `STRING`
+            :param nullable:
+                Column accepts `None`
+            :param unique:
+                Values must be unique
+            :param primary_key:
+                Column is the primary key. Primary key values are a function
+                of the row index, see :func:`key_value`.
+            :param references:
+                Name of the referenced table, for foreign keys
+            :param choices:
+                Allowed values
+            :param max_length:
+                Maximum length of string values
+        """
+        self.name = name
+        self.kind = kind
+        self.nullable = nullable and not primary_key
+        self.unique = unique or primary_key
+        self.primary_key = primary_key
+        self.references = references
+        self.choices = choices
+        self.max_length = max_length
+
+
+class TableSpec(object):
+    """
+        Generated table.
+    """
+    def __init__(self, name, columns, rows=None):
+        """
+            Constructor.
+
+            :param name:
+                Table (or collection) name
+            :param columns:
+                List of :class:`ColumnSpec`
+            :param rows:
+                Number of rows. Set by :func:`plan` if not provided.
+        """
+        self.name = name
+        self.columns = columns
+        self.rows = rows
+
+    @property
+    def primary_key(self):
+        for c in self.columns:
+            if c.primary_key:
+                return c
+        return None
+
+    @property
+    def dependencies(self):
+        return set(c.references for c in self.columns
+                   if c.references is not None and c.references != self.name)
+
+
+def key_value(kind, table, index):
+    """
+        Return primary key of the row. Keys are generated, not assigned by
+        the database, so foreign keys can reference them without a lookup.
+
+        :param kind:
+            Primary key value kind
+        :param table:
+            Table name
+        :param index:
+            Zero-based row index
+    """
+    if kind == INTEGER:
+        return index + 1
+    if kind == OBJECTID:
+        from bson.objectid import ObjectId
+        return ObjectId('%024x' % (index + 1))
+    if kind == UUID:
+        return uuid.UUID(int=index + 1)
+
+    return '%s-%d' % (table, index + 1)
+
+
+def sort_tables(tables):
+    """
+        Return tables sorted so that referenced tables come first.
+        Self references and cycles are allowed, cycles are broken in the
+        original order.
+    """
+    by_name = dict((t.name, t) for t in tables)
+    result = []
+    visiting = set()
+    done = set()
+
+    def visit(table):
+        if table.name in done or table.name in visiting:
+            return
+
+        visiting.add(table.name)
+
+        for name in sorted(table.dependencies):
+            if name in by_name:
+                visit(by_name[name])
+
+        visiting.discard(table.name)
+        done.add(table.name)
+        result.append(table)
+
+    for table in tables:
+        visit(table)
+
+    return result
+
+
+def plan(tables, rows, table_rows=None):
+    """
+        Set number of rows of every table.
+
+        :param tables:
+            List of :class:`TableSpec`
+        :param rows:
+            Default number of rows
+        :param table_rows:
+            Dictionary of table name to number of rows
+    """
+    table_rows = table_rows or {}
+
+    for table in tables:
+        table.rows = table_rows.get(table.name, rows if table.rows is None else table.rows)
+
+    return tables
+
+
+class Generator(object):
+    """
+        Produces rows of the tables.
+    """
+    def __init__(self, tables, seed=0, skew=1.0, null_rate=0.1):
+        """
+            Constructor.
+
+            :param tables:
+                List of :class:`TableSpec` with row counts
+            :param seed:
+                Random seed. The same seed generates the same data.
+            :param skew:
+                Skew of foreign key fan-out and choices. `0` is uniform,
+                larger values concentrate references on fewer rows.
+            :param null_rate:
+                Fraction of `None` values in nullable columns
+        """
+        self.tables = dict((t.name, t) for t in tables)
+        self.random = random.Random(seed)
+        self.skew = skew
+        self.null_rate = null_rate
+
+    def skewed_index(self, count):
+        """
+            Return random index in ``[0, count)``, lower indexes are more
+            likely when `skew` is positive.
+        """
+        return int(count * self.random.random() ** (1 + self.skew))
+
+    def get_column_generator(self, table, column):
+        """
+            Return function that takes the row index and returns the value
+            of the column.
+        """
+        if column.references is not None:
+            fn = self._reference_generator(table, column)
+        elif column.primary_key:
+            return lambda i, kind=column.kind: key_value(kind, table.name, i)
+        elif column.choices:
+            choices = list(column.choices)
+            fn = lambda i: choices[self.skewed_index(len(choices))]
+        else:
+            fn = self._value_generator(column)
+
+        if column.nullable and self.null_rate:
+            rnd = self.random.random
+            null_rate = self.null_rate
+            fn = lambda i, inner=fn: None if rnd() < null_rate else inner(i)
+
+        return fn
+
+    def _reference_generator(self, table, column):
+        target = self.tables.get(column.references)
+
+        if target is None or not target.rows:
+            return lambda i: None
+
+        pk = target.primary_key
+        kind = pk.kind if pk is not None else INTEGER
+        name = target.name
+        count = target.rows
+
+        if column.primary_key:
+            # Part of a composite key of references, like an association
+            # table: enumerate the combinations so that keys are unique
+            keys = [c for c in table.columns if c.primary_key and c.references]
+            divisor = 1
+
+            for c in keys[:keys.index(column)]:
+                divisor *= max(self.tables[c.references].rows or 1, 1)
+
+            return lambda i: key_value(kind, name, (i // divisor) % count)
+
+        if target is table:
+            # Self reference: point to one of the previous rows
+            def fn(i):
+                if i == 0:
+                    return None if column.nullable else key_value(kind, name, 0)
+                return key_value(kind, name, self.skewed_index(i))
+
+            return fn
+
+        if column.unique:
+            # One-to-one, every parent at most once
+            return lambda i: key_value(kind, name, i % count)
+
+        return lambda i: key_value(kind, name, self.skewed_index(count))
+
+    def _value_generator(self, column):
+        rnd = self.random
+        kind = column.kind
+        name = column.name.lower()
+        max_length = column.max_length
+        unique = column.unique
+
+        if kind == INTEGER:
+            if unique:
+                return lambda i: i + 1
+            if 'age' in name:
+                return lambda i: rnd.randint(18, 90)
+            return lambda i: int(rnd.paretovariate(1.2))
+
+        if kind in (FLOAT, DECIMAL):
+            convert = float if kind == FLOAT else (lambda v: decimal.Decimal('%.2f' % v))
+            return lambda i: convert(rnd.lognormvariate(3, 1))
+
+        if kind == BOOLEAN:
+            return lambda i: rnd.random() < 0.5
+
+        if kind in (DATE, DATETIME, TIME):
+            def fn(i):
+                value = DATE_START + datetime.timedelta(seconds=rnd.randint(0, DATE_RANGE))
+
+                if kind == DATE:
+                    return value.date()
+                if kind == TIME:
+                    return value.time()
+                return value
+
+            return fn
+
+        if kind == UUID:
+            return lambda i: uuid.UUID(int=rnd.getrandbits(128))
+
+        if kind == OBJECTID:
+            from bson.objectid import ObjectId
+            return lambda i: ObjectId()
+
+        if kind == BINARY:
+            return lambda i: bytes(bytearray(rnd.getrandbits(8) for _ in range(16)))
+
+        if kind == GEOMETRY:
+            return lambda i: 'SRID=4326;POINT(%.6f %.6f)' % (rnd.uniform(-180, 180),
+                                                             rnd.uniform(-90, 90))
+
+        if kind == TEXT:
+            # Long values are picked from a pool, generating them per row
+            # would dominate the load time
+            pool = [self.sentence(rnd.randint(20, 120)).capitalize() + '.'
+                    for _ in range(TEXT_POOL_SIZE)]
+            fn = lambda i: pool[int(rnd.random() * TEXT_POOL_SIZE)]
+        else:
+            fn = self._string_generator(name)
+
+        if unique:
+            fn = lambda i, inner=fn: self._unique(inner(i), i, max_length)
+
+        if max_length:
+            fn = lambda i, inner=fn: inner(i)[:max_length]
+
+        return fn
+
+    def _string_generator(self, name):
+        rnd = self.random
+
+        if 'email' in name:
+            return lambda i: '%s.%s@%s' % (rnd.choice(FIRST_NAMES).lower(),
+                                           rnd.choice(LAST_NAMES).lower(),
+                                           rnd.choice(DOMAINS))
+        if 'first' in name:
+            return lambda i: rnd.choice(FIRST_NAMES)
+        if 'last' in name or 'surname' in name:
+            return lambda i: rnd.choice(LAST_NAMES)
+        if 'username' in name or 'login' in name:
+            return lambda i: '%s%s' % (rnd.choice(FIRST_NAMES).lower(),
+                                       rnd.choice(LAST_NAMES).lower())
+        if 'name' in name:
+            return lambda i: '%s %s' % (rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES))
+        if 'url' in name or 'website' in name:
+            return lambda i: 'https://%s/%s' % (rnd.choice(DOMAINS), rnd.choice(WORDS))
+        if 'phone' in name:
+            return lambda i: '+44 20 %04d %04d' % (rnd.randint(0, 9999), rnd.randint(0, 9999))
+        if 'title' in name:
+            return lambda i: self.sentence(rnd.randint(2, 6)).title()
+
+        return lambda i: self.sentence(rnd.randint(1, 3))
+
+    def sentence(self, words):
+        choice = self.random.choice
+        return ' '.join(choice(WORDS) for _ in range(words))
+
+    @staticmethod
+    def _unique(value, i, max_length):
+        suffix = '-%d' % (i + 1)
+
+        if '@' in value:
+            local, domain = value.split('@', 1)
+            return '%s%s@%s' % (local, suffix, domain)
+
+        if max_length:
+            value = value[:max_length - len(suffix)]
+
+        return value + suffix
+
+    def generate(self, table, chunk_size=10000):
+        """
+            Yield rows of the table as lists of dictionaries, `chunk_size`
+            rows at a time.
+
+            :param table:
+                :class:`TableSpec`
+            :param chunk_size:
+                Number of rows per chunk
+        """
+        columns = [(c.name, self.get_column_generator(table, c)) for c in table.columns]
+
+        for start in range(0, table.rows, chunk_size):
+            chunk = []
+
+            for i in range(start, min(start + chunk_size, table.rows)):
+                chunk.append(dict((name, fn(i)) for name, fn in columns))
+
+            yield chunk
+
+
+def fill(tables, write, rows, table_rows=None, seed=0, skew=1.0, null_rate=0.1,
+         chunk_size=10000, out=sys.stderr):
+    """
+        Generate and write rows of the tables. Returns dictionary of table
+        name to number of written rows.
+
+        :param tables:
+            List of :class:`TableSpec`
+        :param write:
+            Function that takes the table spec and a list of row
+            dictionaries and writes them with the backend bulk insert
+        :param rows:
+            Default number of rows per table
+        :param table_rows:
+            Dictionary of table name to number of rows
+        :param seed:
+            Random seed
+        :param skew:
+            Foreign key fan-out skew, see :class:`Generator`
+        :param null_rate:
+            Fraction of `None` values in nullable columns
+        :param chunk_size:
+            Number of rows per bulk insert
+        :param out:
+            Stream for progress output or `None`
+    """
+    tables = sort_tables(plan(tables, rows, table_rows))
+    generator = Generator(tables, seed, skew, null_rate)
+    written = {}
+
+    for table in tables:
+        start = time.time()
+        count = 0
+
+        for chunk in generator.generate(table, chunk_size):
+            write(table, chunk)
+            count += len(chunk)
+
+            if out is not None:
+                out.write('\r%-30s %12d / %d' % (table.name, count, table.rows))
+                out.flush()
+
+        written[table.name] = count
+
+        if out is not None:
+            elapsed = time.time() - start
+            out.write('\r%-30s %12d rows in %.1f s (%.0f rows/s)\n' % (
+                table.name, count, elapsed, count / elapsed if elapsed else 0))
+
+    return written
@@ -0,0 +1,138 @@
+"""
+    Fill the tables of the models with synthetic data.
+
+    Models are found in a module, or a ``module:attribute`` that is a
+    declarative base, `MetaData`, model or document. Tables are created
+    if needed; ``--drop`` recreates them first.
+
+    Usage::
+
+        python -m benchmarks.datagen sqla benchmarks.scenarios.sqla --url sqlite:///bench.db
+        python -m benchmarks.datagen sqla myapp.models --url postgresql:///bench \\
+            --rows 1000000 --table posts=50000000 --skew 1.5
+        python -m benchmarks.datagen peewee myapp.models --rows 100000
+        python -m benchmarks.datagen mongoengine myapp.documents \\
+            --url mongodb://localhost/bench --rows 100000
+"""
+import argparse
+import importlib
+import sys
+
+from . import fill
+
+
+def import_object(path):
+    module_name, _, attr = path.partition(':')
+    obj = importlib.import_module(module_name)
+
+    for name in attr.split('.') if attr else ():
+        obj = getattr(obj, name)
+
+    return obj
+
+
+def parse_table_rows(value):
+    name, _, rows = value.partition('=')
+
+    try:
+        return name, int(rows)
+    except ValueError:
+        raise argparse.ArgumentTypeError('expected TABLE=ROWS, got %r' % value)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.datagen',
+                                     description='Fill model tables with synthetic data')
+    parser.add_argument('backend', choices=('sqla', 'peewee', 'mongoengine'))
+    parser.add_argument('models', help='module or module:attribute with the models')
+    parser.add_argument('--url', help='database URL (sqla, mongoengine)')
+    parser.add_argument('--rows', type=int, default=10000,
+                        help='rows per table (default: 10000)')
+    parser.add_argument('--table', type=parse_table_rows, action='append', default=[],
+                        metavar='TABLE=ROWS', help='rows of a table, can be repeated')
+    parser.add_argument('--only', action='append', metavar='TABLE',
+                        help='fill only this table, can be repeated')
+    parser.add_argument('--drop', action='store_true',
+                        help='drop and recreate tables first')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed (default: 0)')
+    parser.add_argument('--skew', type=float, default=1.0,
+                        help='foreign key fan-out skew, 0 is uniform (default: 1.0)')
+    parser.add_argument('--null-rate', type=float, default=0.1,
+                        help='fraction of NULL values in nullable columns (default: 0.1)')
+    parser.add_argument('--chunk-size', type=int, default=10000,
+                        help='rows per bulk insert (default: 10000)')
+    return parser
+
+
+def prepare_sqla(options, obj):
+    from sqlalchemy import create_engine
+
+    from . import sqla
+
+    engine = create_engine(options.url or 'sqlite://')
+    metadata = sqla.find_metadata(obj)
+
+    for md in metadata:
+        if options.drop:
+            md.drop_all(engine)
+        md.create_all(engine)
+
+    specs = sqla.get_specs(metadata, options.only)
+
+    return specs, sqla.get_writer(engine, metadata), lambda: sqla.reset_sequences(engine, specs)
+
+
+def prepare_peewee(options, obj):
+    from . import peewee
+
+    models = peewee.find_models(obj)
+
+    for model in models:
+        if options.drop:
+            model.drop_table(True)
+        model.create_table(True)
+
+    return peewee.get_specs(models, options.only), peewee.get_writer(models), None
+
+
+def prepare_mongoengine(options, obj):
+    import mongoengine as me
+
+    from . import mongoengine
+
+    if options.url:
+        me.connect(host=options.url)
+
+    documents = mongoengine.find_documents(obj)
+
+    if options.drop:
+        for document in documents:
+            document.drop_collection()
+
+    return mongoengine.get_specs(documents, options.only), mongoengine.get_writer(documents), None
+
+
+def main(argv=None):
+    options = get_parser().parse_args(argv)
+
+    prepare = {
+        'sqla': prepare_sqla,
+        'peewee': prepare_peewee,
+        'mongoengine': prepare_mongoengine,
+    }[options.backend]
+
+    specs, write, finish = prepare(options, import_object(options.models))
+
+    fill(specs, write, options.rows, dict(options.table),
+         seed=options.seed, skew=options.skew, null_rate=options.null_rate,
+         chunk_size=options.chunk_size)
+
+    if finish is not None:
+        finish()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
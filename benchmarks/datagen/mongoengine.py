@@ -0,0 +1,132 @@
+"""
+    MongoEngine backend of the dataset generator.
+
+    Documents are written as raw dictionaries with `insert_many` of the
+    collection, without document validation. `None` values are left out,
+    the same way MongoEngine stores unset fields.
+"""
+import mongoengine
+
+from . import (ColumnSpec, TableSpec, INTEGER, FLOAT, BOOLEAN, DATETIME, STRING,
+               BINARY, OBJECTID)
+
+
+# Most specific field classes first
+FIELD_KINDS = (
+    (mongoengine.ReferenceField, OBJECTID),
+    (mongoengine.ObjectIdField, OBJECTID),
+    (mongoengine.BooleanField, BOOLEAN),
+    (mongoengine.DateTimeField, DATETIME),
+    # Stored as floats unless `force_string` is set
+    (mongoengine.DecimalField, FLOAT),
+    (mongoengine.FloatField, FLOAT),
+    (mongoengine.IntField, INTEGER),
+    (mongoengine.LongField, INTEGER),
+    (mongoengine.StringField, STRING),
+    (mongoengine.BinaryField, BINARY),
+)
+
+
+def get_kind(field):
+    for cls, kind in FIELD_KINDS:
+        if isinstance(field, cls):
+            return kind
+
+    return None
+
+
+def find_documents(obj):
+    """
+        Return list of the documents of the module. Documents that share a
+        collection with their base are left out.
+    """
+    if isinstance(obj, type) and issubclass(obj, mongoengine.Document):
+        return [obj]
+
+    documents = []
+    collections = set()
+
+    for value in vars(obj).values():
+        if (not isinstance(value, type) or not issubclass(value, mongoengine.Document) or
+                value._meta.get('abstract')):
+            continue
+
+        name = value._get_collection_name()
+
+        if name and name not in collections:
+            collections.add(name)
+            documents.append(value)
+
+    return documents
+
+
+def get_field_spec(field):
+    kind = get_kind(field)
+
+    if kind is None:
+        return None
+
+    references = None
+    if isinstance(field, mongoengine.ReferenceField):
+        references = field.document_type._get_collection_name()
+
+    choices = None
+    if field.choices:
+        choices = [c[0] if isinstance(c, (tuple, list)) else c for c in field.choices]
+
+    return ColumnSpec(field.db_field, kind,
+                      nullable=not field.required,
+                      unique=bool(field.unique),
+                      primary_key=bool(field.primary_key) or field.db_field == '_id',
+                      references=references,
+                      choices=choices,
+                      max_length=getattr(field, 'max_length', None))
+
+
+def get_specs(documents, only=None):
+    """
+        Return :class:`~benchmarks.datagen.TableSpec` of the documents.
+
+        :param documents:
+            List of document classes
+        :param only:
+            Names of the collections to fill. All collections by default.
+    """
+    specs = []
+
+    for document in documents:
+        name = document._get_collection_name()
+
+        if only and name not in only:
+            continue
+
+        columns = []
+
+        for field in document._fields.values():
+            spec = get_field_spec(field)
+
+            if spec is not None:
+                columns.append(spec)
+
+        if document._meta.get('allow_inheritance'):
+            columns.append(ColumnSpec('_cls', STRING, nullable=False,
+                                      choices=[document._class_name]))
+
+        specs.append(TableSpec(name, columns))
+
+    return specs
+
+
+def get_writer(documents):
+    """
+        Return function that writes chunks of documents to the collections.
+    """
+    by_name = dict((d._get_collection_name(), d) for d in documents)
+
+    def write(spec, rows):
+        coll = by_name[spec.name]._get_collection()
+
+        docs = [dict((k, v) for k, v in row.items() if v is not None) for row in rows]
+        coll.insert_many(docs, ordered=False)
+
+    return write
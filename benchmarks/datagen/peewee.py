@@ -0,0 +1,142 @@
+"""
+    Peewee backend of the dataset generator.
+
+    Rows are written with `insert_many` in the database of the model, in
+    batches that fit into the SQL variable limit of SQLite.
+"""
+import peewee
+
+from . import (ColumnSpec, TableSpec, INTEGER, FLOAT, DECIMAL, BOOLEAN, DATE, DATETIME,
+               TIME, STRING, TEXT, BINARY, UUID)
+
+
+# Most specific field classes first, some are missing in older Peewee versions
+FIELD_KINDS = (
+    ('ForeignKeyField', INTEGER),
+    ('BooleanField', BOOLEAN),
+    ('DateTimeField', DATETIME),
+    ('DateField', DATE),
+    ('TimeField', TIME),
+    ('DecimalField', DECIMAL),
+    ('FloatField', FLOAT),
+    ('DoubleField', FLOAT),
+    ('PrimaryKeyField', INTEGER),
+    ('AutoField', INTEGER),
+    ('IntegerField', INTEGER),
+    ('BigIntegerField', INTEGER),
+    ('UUIDField', UUID),
+    ('BlobField', BINARY),
+    ('TextField', TEXT),
+    ('CharField', STRING),
+)
+
+# Maximum number of variables of a SQLite statement in older versions
+SQLITE_MAX_VARIABLES = 999
+
+
+def get_table_name(model):
+    meta = model._meta
+    return getattr(meta, 'table_name', None) or meta.db_table
+
+
+def get_kind(field):
+    for name, kind in FIELD_KINDS:
+        cls = getattr(peewee, name, None)
+
+        if cls is not None and isinstance(field, cls):
+            return kind
+
+    return None
+
+
+def find_models(obj):
+    """
+        Return list of the models of the module, without abstract bases of
+        other models of the module.
+    """
+    if isinstance(obj, type) and issubclass(obj, peewee.Model):
+        return [obj]
+
+    models = [value for value in vars(obj).values()
+              if isinstance(value, type) and issubclass(value, peewee.Model) and
+              value is not peewee.Model]
+
+    return [m for m in models
+            if not any(other is not m and issubclass(other, m) for other in models)]
+
+
+def get_field_spec(field):
+    kind = get_kind(field)
+
+    if kind is None:
+        return None
+
+    references = None
+    if isinstance(field, peewee.ForeignKeyField):
+        references = get_table_name(field.rel_model)
+
+    choices = None
+    if field.choices:
+        choices = [c[0] if isinstance(c, (tuple, list)) else c for c in field.choices]
+
+    return ColumnSpec(field.name, kind,
+                      nullable=field.null,
+                      unique=field.unique,
+                      primary_key=field.primary_key,
+                      references=references,
+                      choices=choices,
+                      max_length=getattr(field, 'max_length', None))
+
+
+def get_specs(models, only=None):
+    """
+        Return :class:`~benchmarks.datagen.TableSpec` of the models.
+
+        :param models:
+            List of model classes
+        :param only:
+            Names of the tables to fill. All tables by default.
+    """
+    specs = []
+
+    for model in models:
+        name = get_table_name(model)
+
+        if only and name not in only:
+            continue
+
+        columns = []
+
+        for field in model._meta.sorted_fields:
+            spec = get_field_spec(field)
+
+            if spec is not None:
+                columns.append(spec)
+            elif not field.null and field.default is None:
+                raise ValueError('Field %s.%s of type %s is not supported'
+                                 % (name, field.name, type(field).__name__))
+
+        specs.append(TableSpec(name, columns))
+
+    return specs
+
+
+def get_writer(models):
+    """
+        Return function that writes chunks of rows to the model tables.
+    """
+    by_name = dict((get_table_name(m), m) for m in models)
+
+    def write(spec, rows):
+        model = by_name[spec.name]
+        db = model._meta.database
+
+        batch = len(rows)
+        if isinstance(db, peewee.SqliteDatabase):
+            batch = max(SQLITE_MAX_VARIABLES // max(len(spec.columns), 1), 1)
+
+        with db.atomic():
+            for start in range(0, len(rows), batch):
+                model.insert_many(rows[start:start + batch]).execute()
+
+    return write
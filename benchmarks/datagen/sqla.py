@@ -0,0 +1,172 @@
+"""
+    SQLAlchemy backend of the dataset generator.
+
+    Works on table metadata, so association tables without a mapped class
+    are filled too. Rows are written with executemany of a Core insert,
+    one transaction per chunk.
+"""
+from sqlalchemy import MetaData, types
+
+from . import (ColumnSpec, TableSpec, INTEGER, FLOAT, DECIMAL, BOOLEAN, DATE, DATETIME,
+               TIME, STRING, TEXT, BINARY, UUID, GEOMETRY)
+
+
+def find_metadata(obj):
+    """
+        Return list of `MetaData` of the object: a `MetaData` instance, a
+        declarative base or a module with either of them.
+    """
+    if isinstance(obj, MetaData):
+        return [obj]
+
+    if isinstance(getattr(obj, 'metadata', None), MetaData):
+        return [obj.metadata]
+
+    result = []
+
+    for value in vars(obj).values():
+        for metadata in find_metadata_attr(value):
+            if metadata not in result:
+                result.append(metadata)
+
+    return result
+
+
+def find_metadata_attr(value):
+    if isinstance(value, MetaData):
+        return [value]
+
+    if isinstance(value, type) and isinstance(getattr(value, 'metadata', None), MetaData):
+        return [value.metadata]
+
+    return []
+
+
+def get_kind(column_type):
+    if isinstance(column_type, types.Boolean):
+        return BOOLEAN
+    if isinstance(column_type, types.DateTime):
+        return DATETIME
+    if isinstance(column_type, types.Date):
+        return DATE
+    if isinstance(column_type, types.Time):
+        return TIME
+    if isinstance(column_type, types.Integer):
+        return INTEGER
+    if isinstance(column_type, types.Float):
+        return FLOAT
+    if isinstance(column_type, types.Numeric):
+        return DECIMAL
+    if isinstance(column_type, (types.Text, types.UnicodeText)):
+        return TEXT
+    if isinstance(column_type, types.String):
+        return STRING
+    if isinstance(column_type, types.LargeBinary):
+        return BINARY
+
+    name = type(column_type).__name__
+
+    if name in ('Geometry', 'Geography'):
+        return GEOMETRY
+    if name in ('Uuid', 'UUID'):
+        return UUID
+
+    return None
+
+
+def get_column_spec(column):
+    column_type = column.type
+    choices = getattr(column_type, 'enums', None)
+    kind = STRING if choices else get_kind(column_type)
+
+    if kind is None:
+        return None
+
+    references = None
+    for fk in column.foreign_keys:
+        references = fk.column.table.name
+        break
+
+    return ColumnSpec(column.key, kind,
+                      nullable=bool(column.nullable),
+                      unique=bool(column.unique),
+                      primary_key=column.primary_key,
+                      references=references,
+                      choices=choices,
+                      max_length=getattr(column_type, 'length', None))
+
+
+def get_specs(metadata, only=None):
+    """
+        Return :class:`~benchmarks.datagen.TableSpec` of the tables.
+
+        :param metadata:
+            `MetaData` or list of `MetaData`
+        :param only:
+            Names of the tables to fill. All tables by default.
+    """
+    if isinstance(metadata, MetaData):
+        metadata = [metadata]
+
+    specs = []
+
+    for md in metadata:
+        for table in md.sorted_tables:
+            if only and table.name not in only:
+                continue
+
+            columns = []
+
+            for column in table.columns:
+                if getattr(column, 'computed', None) is not None:
+                    continue
+
+                spec = get_column_spec(column)
+
+                if spec is not None:
+                    columns.append(spec)
+                elif not column.nullable and column.server_default is None:
+                    raise ValueError('Column %s.%s of type %s is not supported'
+                                     % (table.name, column.name, column.type))
+
+            specs.append(TableSpec(table.name, columns))
+
+    return specs
+
+
+def get_writer(engine, metadata):
+    """
+        Return function that writes chunks of rows to the tables.
+    """
+    if isinstance(metadata, MetaData):
+        metadata = [metadata]
+
+    tables = {}
+    for md in metadata:
+        tables.update((t.name, t) for t in md.sorted_tables)
+
+    def write(spec, rows):
+        with engine.begin() as conn:
+            conn.execute(tables[spec.name].insert(), rows)
+
+    return write
+
+
+def reset_sequences(engine, specs):
+    """
+        Move PostgreSQL sequences of integer primary keys past the generated
+        keys, so that rows created later through the admin get free keys.
+    """
+    if engine.dialect.name != 'postgresql':
+        return
+
+    with engine.begin() as conn:
+        for spec in specs:
+            pk = spec.primary_key
+
+            if pk is None or pk.kind != INTEGER or not spec.rows:
+                continue
+
+            conn.exec_driver_sql(
+                "SELECT setval(pg_get_serial_sequence('%s', '%s'), %d)"
+                % (spec.name, pk.name, spec.rows))
@@ -0,0 +1,235 @@
+"""
+    Benchmark runner for the hot path suite.
+
+    A benchmark is a callable that runs one operation, for example renders
+    a list page. The runner measures the best time of several timed runs
+    and the memory allocated by one run, using `tracemalloc`.
+
+    Results and baselines are stored as JSON::
+
+        {
+            "meta": {"python": "3.11.4", "platform": "..."},
+            "results": {
+                "sqla.index_view[rows=1000,page=20]": {
+                    "seconds": 0.0041,
+                    "ops_per_second": 4878.0,
+                    "peak_bytes": 512000,
+                    "retained_bytes": 1200
+                }
+            }
+        }
+"""
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from pyramid.config import Configurator
+from pyramid.request import Request
+from pyramid.session import SignedCookieSessionFactory
+
+from pyramid_admin import Admin
+
+
+# Differences below these are noise, whatever the tolerance
+MIN_TIME_DELTA = 0.00005
+MIN_BYTES_DELTA = 4096
+
+
+class Benchmark(object):
+    """
+        Single benchmark.
+    """
+    def __init__(self, name, fn, ops=1, **params):
+        """
+            Constructor.
+
+            :param name:
+                Benchmark name, for example `sqla.index_view`
+            :param fn:
+                Callable that runs the operation once
+            :param ops:
+                Number of items processed by one call, for example rows of
+                the page. Used to report throughput.
+            :param params:
+                Scenario parameters, added to the name
+        """
+        if params:
+            name = '%s[%s]' % (name, ','.join('%s=%s' % (k, params[k])
+                                              for k in sorted(params)))
+
+        self.name = name
+        self.fn = fn
+        self.ops = ops
+
+
+def measure(fn, min_time=0.2, repeat=5):
+    """
+        Return best time of one call, in seconds.
+
+        The number of calls per timed run is calibrated so that a run takes
+        at least `min_time` divided by `repeat`.
+    """
+    target = float(min_time) / repeat
+    number = 1
+
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+
+        if elapsed >= target or number >= 1000000:
+            break
+
+        number *= 10 if elapsed < target / 10 else 2
+
+    timings = [elapsed / number]
+
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+
+    return min(timings)
+
+
+def measure_memory(fn):
+    """
+        Return ``(peak, retained)`` bytes allocated by one call.
+    """
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+        fn()
+
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return max(peak - before, 0), max(current - before, 0)
+
+
+def run(benchmarks, min_time=0.2, repeat=5, out=sys.stdout):
+    """
+        Run benchmarks and return results dictionary.
+
+        :param benchmarks:
+            Iterable of :class:`Benchmark`
+    """
+    results = {}
+
+    for bench in benchmarks:
+        # Warm up caches (templates, compiled queries, URL rules)
+        bench.fn()
+
+        seconds = measure(bench.fn, min_time, repeat)
+        peak, retained = measure_memory(bench.fn)
+
+        results[bench.name] = {
+            'seconds': seconds,
+            'ops_per_second': bench.ops / seconds if seconds else 0,
+            'peak_bytes': peak,
+            'retained_bytes': retained,
+        }
+
+        if out is not None:
+            out.write('%-60s %10.3f ms %12.0f ops/s %10.1f KiB\n' % (
+                bench.name, seconds * 1000, results[bench.name]['ops_per_second'], peak / 1024.0))
+            out.flush()
+
+    return results
+
+
+def get_meta():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+    }
+
+
+def save(path, results):
+    with open(path, 'w') as fp:
+        json.dump({'meta': get_meta(), 'results': results}, fp, indent=2, sort_keys=True)
+        fp.write('\n')
+
+
+def load(path):
+    with open(path) as fp:
+        return json.load(fp)['results']
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+        Return list of ``(name, metric, baseline, current)`` regressions.
+
+        Benchmarks that are not in both results are ignored, so baselines
+        recorded with other sizes or backends can be reused.
+
+        :param results:
+            Current results
+        :param baseline:
+            Baseline results
+        :param tolerance:
+            Allowed relative slowdown or memory growth
+    """
+    regressions = []
+
+    for name in sorted(results):
+        base = baseline.get(name)
+
+        if base is None:
+            continue
+
+        current = results[name]
+
+        if (current['seconds'] > base['seconds'] * (1 + tolerance) and
+                current['seconds'] - base['seconds'] > MIN_TIME_DELTA):
+            regressions.append((name, 'seconds', base['seconds'], current['seconds']))
+
+        if (current['peak_bytes'] > base['peak_bytes'] * (1 + tolerance) and
+                current['peak_bytes'] - base['peak_bytes'] > MIN_BYTES_DELTA):
+            regressions.append((name, 'peak_bytes', base['peak_bytes'], current['peak_bytes']))
+
+    return regressions
+
+
+def create_admin(template_mode='bootstrap3', **kwargs):
+    """
+        Return ``(config, admin)`` that can render the admin pages.
+    """
+    config = Configurator(settings={},
+                          session_factory=SignedCookieSessionFactory('benchmarks'))
+    config.include('pyramid_jinja2')
+    config.add_jinja2_search_path('pyramid_admin:templates/%s' % template_mode)
+    config.add_static_view('static', 'pyramid_admin:static')
+
+    admin = Admin(config, template_mode=template_mode, **kwargs)
+
+    return config, admin
+
+
+def client(config):
+    """
+        Return function that requests a path from the application and
+        returns the response. Non-200 responses raise `AssertionError`.
+    """
+    app = config.make_wsgi_app()
+
+    def get(path):
+        response = Request.blank(path).get_response(app)
+
+        if response.status_int != 200:
+            raise AssertionError('%s returned %s' % (path, response.status))
+
+        return response
+
+    return get
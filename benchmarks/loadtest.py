@@ -0,0 +1,666 @@
+"""
+    Load test driver for admin deployments.
+
+    Crawls the model views of the `Admin` instances of an application and
+    replays weighted admin traffic from concurrent virtual users:
+
+    - ``list``: list pages with random sort, search and filters
+    - ``deep_page``: pages from the second half of the list
+    - ``edit``: edit form, submitted back with the current values
+    - ``lookup``: AJAX lookups of a user typing a name, one request per key
+    - ``update``: inline edits of editable list columns
+
+    Requests go to the WSGI application in-process (the default), to a
+    local HTTP server started for the test (``--serve``) or to a running
+    deployment of the same application (``--url``). Latency percentiles
+    are reported per view and scenario. When the application runs with
+    the ``debug`` setting, queries per request are read from the query
+    inspector header.
+
+    ``edit`` and ``update`` write to the database; ``--read-only``
+    disables them.
+
+    Usage::
+
+        python -m benchmarks.loadtest myapp:make_app --concurrency 8 --duration 30
+        python -m benchmarks.loadtest myapp:application --serve --weights list=5,edit=1
+        python -m benchmarks.loadtest myapp:make_app --url http://127.0.0.1:6543
+"""
+import argparse
+import importlib
+import json
+import math
+import random
+import sys
+import threading
+import time
+from http.client import HTTPConnection
+from socketserver import ThreadingMixIn
+from urllib.parse import urlencode, urlsplit
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from pyramid.request import Request
+from pyramid.threadlocal import manager
+
+from pyramid_admin._compat import as_unicode
+from pyramid_admin.helpers import set_current_view
+from pyramid_admin.model import BaseModelView
+from pyramid_admin.queries import HEADER_NAME as QUERIES_HEADER
+from pyramid_admin.tools import iterencode, rec_getattr
+
+
+DEFAULT_WEIGHTS = {
+    'list': 40,
+    'deep_page': 10,
+    'edit': 20,
+    'lookup': 20,
+    'update': 10,
+}
+
+# Rows sampled per view to build the requests from
+SAMPLE_SIZE = 20
+
+# Values tried for filters without options, the first valid one is used
+FILTER_CANDIDATES = ('1', '2020-01-01', '2020-01-01 00:00:00', '2020-01-01 to 2021-01-01',
+                     '1,2', '0')
+
+
+class Step(object):
+    """
+        Single request of a scenario.
+    """
+    def __init__(self, name, method, path, data=None):
+        """
+            Constructor.
+
+            :param name:
+                Name the latency is reported under, ``<endpoint>.<request>``
+            :param method:
+                HTTP method
+            :param path:
+                Path with the query string
+            :param data:
+                Dictionary of form data for POST requests
+        """
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data
+
+
+class Scenario(object):
+    """
+        Kind of traffic for one view. `build` returns the steps of a single
+        run, using the random generator of the virtual user.
+    """
+    def __init__(self, kind, view, build):
+        self.kind = kind
+        self.view = view
+        self.build = build
+
+
+class ViewSample(object):
+    """
+        Data sampled from a model view when crawling.
+    """
+    def __init__(self, view, count, models):
+        self.view = view
+        self.count = count or 0
+        self.models = models
+        self.pks = [encode_pk(view.get_pk_value(m)) for m in models]
+
+        self.terms = []
+        for model in models:
+            for column, _ in view._list_columns:
+                value = rec_getattr(model, column)
+
+                if isinstance(value, str) and value.strip():
+                    word = value.split()[0]
+                    self.terms.append(word[:max(3, len(word) // 2)])
+
+        self.sort_indexes = [i for i, (c, _) in enumerate(view._list_columns)
+                             if c in (view._sortable_columns or ())]
+
+        self.filters = []
+        for key, (idx, flt) in sorted((view._filter_args or {}).items()):
+            value = get_filter_value(view, flt, self.terms)
+
+            if value is not None:
+                self.filters.append((key, value))
+
+    @property
+    def num_pages(self):
+        page_size = self.view.page_size or self.count or 1
+        return int(math.ceil(self.count / float(page_size)))
+
+
+def encode_pk(value):
+    if isinstance(value, (tuple, list)):
+        return iterencode(value)
+    return as_unicode(value)
+
+
+def get_filter_value(view, flt, terms):
+    options = flt.get_options(view)
+
+    if options:
+        return as_unicode(list(options)[0][0])
+
+    for value in tuple(terms[:1]) + FILTER_CANDIDATES:
+        try:
+            if flt.validate(value):
+                return value
+        except Exception:
+            pass
+
+    return None
+
+
+def serialize_form(form):
+    """
+        Return form data that a browser would submit for the form.
+    """
+    data = {}
+
+    for field in form:
+        if field.type in ('CSRFTokenField', 'SubmitField', 'FileField', 'ImageUploadField',
+                          'FileUploadField', 'InlineModelFormList', 'FieldList'):
+            continue
+
+        if field.type == 'BooleanField':
+            if field.data:
+                data[field.name] = 'y'
+        elif hasattr(field, 'iter_choices') and field.type != 'AjaxSelectField':
+            selected = [as_unicode(choice[0]) for choice in field.iter_choices() if choice[2]]
+
+            if selected:
+                data[field.name] = selected
+        elif hasattr(field, '_value'):
+            data[field.name] = as_unicode(field._value())
+
+    return data
+
+
+def in_request(registry, view, fn):
+    request = Request.blank('/')
+    request.registry = registry
+
+    manager.push({'request': request, 'registry': registry})
+
+    try:
+        set_current_view(view)
+        return fn()
+    finally:
+        manager.pop()
+
+
+def find_admins(app):
+    registry = app.registry
+    return getattr(registry, 'extensions', {}).get('admin', [])
+
+
+def crawl(app, read_only=False, sample_size=SAMPLE_SIZE):
+    """
+        Return list of :class:`Scenario` for the model views of the
+        application.
+
+        :param app:
+            Pyramid WSGI application
+        :param read_only:
+            Leave out scenarios that write to the database
+        :param sample_size:
+            Number of rows sampled per view
+    """
+    registry = app.registry
+    scenarios = []
+
+    for admin in find_admins(app):
+        for view in admin._views:
+            if not isinstance(view, BaseModelView):
+                continue
+
+            def sample(view=view):
+                count, models = view.get_list(0, None, False, None, None)
+                return ViewSample(view, count, list(models)[:sample_size])
+
+            s = in_request(registry, view, sample)
+
+            scenarios.append(Scenario('list', view, list_builder(s)))
+
+            if s.num_pages > 2:
+                scenarios.append(Scenario('deep_page', view, deep_page_builder(s)))
+
+            if s.pks and view.can_edit and not read_only:
+                forms = in_request(registry, view, lambda: [
+                    serialize_form(view.edit_form(obj=m)) for m in s.models[:5]])
+                scenarios.append(Scenario('edit', view, edit_builder(s, forms)))
+
+            if s.pks and view.column_editable_list and not read_only:
+                scenarios.append(Scenario('update', view, update_builder(s)))
+
+            for name, loader in sorted((view._form_ajax_refs or {}).items()):
+                labels = in_request(registry, view, lambda loader=loader: [
+                    as_unicode(loader.format(m)[1]) for m in loader.get_list(u'', 0, 10)])
+                labels = [l for l in labels if l.strip()]
+
+                if labels:
+                    scenarios.append(Scenario('lookup', view, lookup_builder(view, name, labels)))
+
+    return scenarios
+
+
+def list_builder(s):
+    view = s.view
+    base = view.url + '/'
+
+    def build(rnd):
+        args = []
+
+        if s.sort_indexes and rnd.random() < 0.5:
+            args.append(('sort', rnd.choice(s.sort_indexes)))
+            if rnd.random() < 0.5:
+                args.append(('desc', 1))
+
+        if s.terms and view._search_supported and rnd.random() < 0.3:
+            args.append(('search', rnd.choice(s.terms)))
+
+        if s.filters and rnd.random() < 0.3:
+            key, value = rnd.choice(s.filters)
+            args.append(('flt0_%s' % key, value))
+
+        if s.num_pages > 1 and rnd.random() < 0.3:
+            args.append(('page', rnd.randint(1, min(s.num_pages - 1, 5))))
+
+        path = base + ('?' + urlencode(args) if args else '')
+        return [Step('%s.list' % view.endpoint, 'GET', path)]
+
+    return build
+
+
+def deep_page_builder(s):
+    view = s.view
+
+    def build(rnd):
+        page = rnd.randint(s.num_pages // 2, s.num_pages - 1)
+        return [Step('%s.deep_page' % view.endpoint, 'GET',
+                     '%s/?%s' % (view.url, urlencode({'page': page})))]
+
+    return build
+
+
+def edit_builder(s, forms):
+    view = s.view
+
+    def build(rnd):
+        i = rnd.randrange(len(forms))
+        path = '%s/edit/?%s' % (view.url, urlencode({'id': s.pks[i]}))
+
+        return [Step('%s.edit' % view.endpoint, 'GET', path),
+                Step('%s.edit_post' % view.endpoint, 'POST', path, forms[i])]
+
+    return build
+
+
+def update_builder(s):
+    view = s.view
+    columns = [c for c in view.column_editable_list if isinstance(c, str)]
+
+    def build(rnd):
+        i = rnd.randrange(len(s.models))
+        column = rnd.choice(columns)
+        value = rec_getattr(s.models[i], column)
+
+        if isinstance(value, bool):
+            value = '1' if value else ''
+
+        data = {'%s-%s' % (column, s.pks[i]): as_unicode(value if value is not None else '')}
+        return [Step('%s.update' % view.endpoint, 'POST', view.url + '/ajax/update/', data)]
+
+    return build
+
+
+def lookup_builder(view, name, labels):
+    def build(rnd):
+        label = rnd.choice(labels)
+
+        steps = []
+        for i in range(1, min(len(label), 6) + 1):
+            query = urlencode({'name': name, 'query': label[:i]})
+            steps.append(Step('%s.lookup' % view.endpoint, 'GET',
+                              '%s/ajax/lookup/?%s' % (view.url, query)))
+
+        return steps
+
+    return build
+
+
+class InProcessClient(object):
+    """
+        Sends requests to the WSGI application in-process.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    def request(self, method, path, data=None):
+        if method == 'POST':
+            request = Request.blank(path, method='POST', POST=data or {})
+        else:
+            request = Request.blank(path)
+
+        response = request.get_response(self.app)
+        return response.status_int, response.headers.get(QUERIES_HEADER)
+
+
+class HttpClient(object):
+    """
+        Sends requests over HTTP, with a keep-alive connection per thread.
+    """
+    def __init__(self, url):
+        parts = urlsplit(url)
+
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self._local = threading.local()
+
+    def get_connection(self):
+        conn = getattr(self._local, 'conn', None)
+
+        if conn is None:
+            conn = self._local.conn = HTTPConnection(self.host, self.port, timeout=60)
+
+        return conn
+
+    def request(self, method, path, data=None):
+        body = None
+        headers = {}
+
+        if method == 'POST':
+            body = urlencode(data or {}, doseq=True)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+        conn = self.get_connection()
+
+        try:
+            conn.request(method, self.prefix + path, body, headers)
+            response = conn.getresponse()
+            response.read()
+        except Exception:
+            conn.close()
+            self._local.conn = None
+            raise
+
+        return response.status, response.getheader(QUERIES_HEADER)
+
+
+def serve(app):
+    """
+        Serve the application from a background thread on a free local port
+        and return its URL.
+    """
+    class Server(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    class Handler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, server_class=Server, handler_class=Handler)
+
+    thread = threading.Thread(target=server.serve_forever, name='loadtest-server')
+    thread.daemon = True
+    thread.start()
+
+    return 'http://127.0.0.1:%d' % server.server_port
+
+
+class Stats(object):
+    """
+        Latencies and query counts per step name.
+    """
+    def __init__(self):
+        self.latencies = {}
+        self.queries = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds, status, queries_header):
+        queries = None
+
+        if queries_header:
+            try:
+                queries = json.loads(queries_header)['count']
+            except (ValueError, KeyError, TypeError):
+                pass
+
+        with self._lock:
+            self.latencies.setdefault(name, []).append(seconds)
+
+            if queries is not None:
+                self.queries.setdefault(name, []).append(queries)
+
+            if status >= 400:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def add_error(self, name):
+        with self._lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self, elapsed):
+        """
+            Return dictionary of step name to latency percentiles (in
+            seconds), throughput, errors and average queries per request.
+            The ``total`` entry covers all requests.
+        """
+        with self._lock:
+            latencies = dict((k, sorted(v)) for k, v in self.latencies.items())
+            queries = dict((k, list(v)) for k, v in self.queries.items())
+            errors = dict(self.errors)
+
+        latencies['total'] = sorted(sum(latencies.values(), []))
+        queries['total'] = sum(queries.values(), [])
+        errors['total'] = sum(errors.values())
+
+        result = {}
+
+        for name, values in latencies.items():
+            q = queries.get(name)
+
+            result[name] = {
+                'requests': len(values),
+                'errors': errors.get(name, 0),
+                'rps': len(values) / elapsed if elapsed else 0,
+                'p50': percentile(values, 50),
+                'p90': percentile(values, 90),
+                'p99': percentile(values, 99),
+                'max': values[-1] if values else None,
+                'queries': sum(q) / float(len(q)) if q else None,
+            }
+
+        return result
+
+
+def percentile(values, p):
+    """
+        Return nearest-rank percentile of sorted values.
+    """
+    if not values:
+        return None
+
+    rank = int(math.ceil(p / 100.0 * len(values)))
+    return values[max(rank, 1) - 1]
+
+
+def run(scenarios, client, concurrency=4, duration=10, weights=None, seed=0):
+    """
+        Run virtual users for `duration` seconds and return ``(stats,
+        elapsed)``.
+
+        Every user repeatedly picks a scenario kind by weight and a view
+        that supports it, and runs the scenario steps one after another.
+
+        :param scenarios:
+            List of :class:`Scenario`
+        :param client:
+            :class:`InProcessClient` or :class:`HttpClient`
+        :param concurrency:
+            Number of concurrent users
+        :param duration:
+            Test duration, in seconds
+        :param weights:
+            Dictionary of scenario kind to weight
+        :param seed:
+            Random seed of the first user
+    """
+    weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+
+    by_kind = {}
+    for scenario in scenarios:
+        by_kind.setdefault(scenario.kind, []).append(scenario)
+
+    kinds = [k for k in sorted(by_kind) if weights.get(k)]
+    if not kinds:
+        raise ValueError('No scenarios to run')
+
+    kind_weights = [weights[k] for k in kinds]
+
+    stats = Stats()
+    deadline = time.time() + duration
+
+    def user(rnd):
+        while time.time() < deadline:
+            kind = weighted_choice(rnd, kinds, kind_weights)
+            scenario = rnd.choice(by_kind[kind])
+
+            for step in scenario.build(rnd):
+                start = time.time()
+
+                try:
+                    status, queries = client.request(step.method, step.path, step.data)
+                except Exception:
+                    stats.add_error(step.name)
+                    break
+
+                stats.add(step.name, time.time() - start, status, queries)
+
+    threads = [threading.Thread(target=user, args=(random.Random(seed + i),))
+               for i in range(concurrency)]
+
+    start = time.time()
+
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return stats, time.time() - start
+
+
+def weighted_choice(rnd, items, weights):
+    value = rnd.random() * sum(weights)
+
+    for item, weight in zip(items, weights):
+        value -= weight
+        if value < 0:
+            return item
+
+    return items[-1]
+
+
+def format_report(summary):
+    def ms(value):
+        return '%8.1f' % (value * 1000) if value is not None else '%8s' % '-'
+
+    lines = ['%-40s %8s %6s %8s %8s %8s %8s %8s %8s' % (
+        'request', 'count', 'errors', 'rps', 'p50 ms', 'p90 ms', 'p99 ms', 'max ms', 'queries')]
+
+    for name in sorted(summary, key=lambda n: (n == 'total', n)):
+        s = summary[name]
+        lines.append('%-40s %8d %6d %8.1f %s %s %s %s %8s' % (
+            name, s['requests'], s['errors'], s['rps'],
+            ms(s['p50']), ms(s['p90']), ms(s['p99']), ms(s['max']),
+            '%.1f' % s['queries'] if s['queries'] is not None else '-'))
+
+    return '\n'.join(lines) + '\n'
+
+
+def load_app(path):
+    module_name, _, attr = path.partition(':')
+    obj = getattr(importlib.import_module(module_name), attr or 'application')
+
+    # Factory functions return the application
+    if not hasattr(obj, 'registry') and callable(obj):
+        obj = obj()
+
+    return obj
+
+
+def parse_weights(value):
+    weights = {}
+
+    for item in value.split(','):
+        kind, _, weight = item.partition('=')
+
+        if kind not in DEFAULT_WEIGHTS:
+            raise argparse.ArgumentTypeError('unknown scenario %r' % kind)
+
+        try:
+            weights[kind] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError('expected KIND=WEIGHT, got %r' % item)
+
+    return weights
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.loadtest',
+                                     description='Replay admin traffic against an application')
+    parser.add_argument('app', help='module:attribute of the WSGI application or its factory')
+    parser.add_argument('--url', help='send requests to a running server of the application')
+    parser.add_argument('--serve', action='store_true',
+                        help='serve the application on a local port and send requests over HTTP')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='concurrent users (default: 4)')
+    parser.add_argument('--duration', type=float, default=10,
+                        help='test duration in seconds (default: 10)')
+    parser.add_argument('--weights', type=parse_weights, default={},
+                        help='scenario weights, for example list=5,edit=1')
+    parser.add_argument('--read-only', action='store_true',
+                        help='do not submit edit forms or inline edits')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='FILE', help='store the summary as JSON')
+    return parser
+
+
+def main(argv=None, out=sys.stdout):
+    options = get_parser().parse_args(argv)
+
+    app = load_app(options.app)
+    scenarios = crawl(app, options.read_only)
+
+    if options.url:
+        client = HttpClient(options.url)
+    elif options.serve:
+        client = HttpClient(serve(app))
+    else:
+        client = InProcessClient(app)
+
+    out.write('%d scenarios: %s\n' % (len(scenarios), ', '.join(sorted(set(
+        '%s.%s' % (s.view.endpoint, s.kind) for s in scenarios)))))
+    out.flush()
+
+    stats, elapsed = run(scenarios, client, options.concurrency, options.duration,
+                         options.weights, options.seed)
+
+    summary = stats.summary(elapsed)
+    out.write(format_report(summary))
+
+    if options.json:
+        with open(options.json, 'w') as fp:
+            json.dump(summary, fp, indent=2, sort_keys=True)
+
+    return 1 if summary['total']['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+    Pre-fork worker memory benchmark.
+
+    Builds an admin with many model views in a master process, forks
+    workers and reports how much unique (private) memory each worker
+    gains while it prepares every view and compiles the admin templates,
+    as it would while serving the first requests.
+
+    The master either leaves preparation to the workers or calls
+    `Admin.prefork_warmup()` before forking.
+
+    Linux only, reads ``/proc/self/smaps_rollup``.
+
+    Usage::
+
+        python -m benchmarks.prefork_memory [views] [workers]
+"""
+import gc
+import os
+import sys
+
+from pyramid.config import Configurator
+
+from wtforms import fields
+
+from pyramid_admin import Admin, form, templating
+from pyramid_admin.model import BaseModelView, filters
+
+
+class Model(object):
+    pass
+
+
+class BenchForm(form.BaseForm):
+    pass
+
+
+for i in range(30):
+    setattr(BenchForm, 'field%d' % i, fields.StringField('Field %d' % i))
+
+
+class BenchFilter(filters.BaseFilter):
+    def apply(self, query, value):
+        return query
+
+    def operation(self):
+        return 'equals'
+
+
+class BenchModelView(BaseModelView):
+    lazy_scaffolding = True
+
+    column_filters = ['field%d' % i for i in range(10)]
+
+    def get_pk_value(self, model):
+        return 1
+
+    def scaffold_list_columns(self):
+        return ['field%d' % i for i in range(30)]
+
+    def scaffold_sortable_columns(self):
+        return dict(('field%d' % i, 'field%d' % i) for i in range(30))
+
+    def init_search(self):
+        return False
+
+    def scaffold_form(self):
+        return BenchForm
+
+    def scaffold_filters(self, name):
+        return [BenchFilter(name, options=[(str(i), 'Option %d' % i) for i in range(20)])]
+
+
+def unique_memory():
+    """
+        Private (unshared) memory of the current process, in bytes.
+    """
+    total = 0
+
+    with open('/proc/self/smaps_rollup') as fp:
+        for line in fp:
+            if line.startswith(('Private_Clean:', 'Private_Dirty:')):
+                total += int(line.split()[1]) * 1024
+
+    return total
+
+
+def serve(admin, config):
+    # What the first requests to every view do
+    for view in admin._views:
+        view.prepare()
+
+    env = templating.get_environment(config.registry)
+    templating.compile_templates(env, templating.list_templates(admin.template_mode))
+
+    # Regular collections walk (and write to) all tracked objects
+    gc.collect()
+
+
+def run_master(num_views, num_workers, warmup):
+    config = Configurator(settings={})
+    config.include('pyramid_jinja2')
+    config.add_jinja2_search_path('pyramid_admin:templates/bootstrap3')
+
+    admin = Admin(config, template_mode='bootstrap3')
+
+    for i in range(num_views):
+        admin.add_view(BenchModelView(Model, endpoint='model%d' % i))
+
+    config.make_wsgi_app()
+
+    if warmup:
+        admin.prefork_warmup()
+
+    pipes = []
+
+    for _ in range(num_workers):
+        r, w = os.pipe()
+        pid = os.fork()
+
+        if pid == 0:
+            try:
+                os.close(r)
+                baseline = unique_memory()
+                serve(admin, config)
+                os.write(w, ('%d\n' % (unique_memory() - baseline)).encode('ascii'))
+            finally:
+                os._exit(0)
+
+        os.close(w)
+        pipes.append((pid, r))
+
+    results = []
+
+    for pid, r in pipes:
+        with os.fdopen(r) as fp:
+            results.append(int(fp.read()))
+        os.waitpid(pid, 0)
+
+    return results
+
+
+def run(num_views, num_workers, warmup):
+    # Run every configuration in a fresh process
+    r, w = os.pipe()
+    pid = os.fork()
+
+    if pid == 0:
+        try:
+            os.close(r)
+            results = run_master(num_views, num_workers, warmup)
+            os.write(w, (' '.join(str(v) for v in results)).encode('ascii'))
+        finally:
+            os._exit(0)
+
+    os.close(w)
+
+    with os.fdopen(r) as fp:
+        results = [int(v) for v in fp.read().split()]
+
+    os.waitpid(pid, 0)
+
+    return results
+
+
+def main(num_views=200, num_workers=4):
+    print('%d model views, %d workers' % (num_views, num_workers))
+
+    for title, warmup in (('scaffolded in workers', False), ('prefork_warmup()', True)):
+        results = run(num_views, num_workers, warmup)
+        average = sum(results) / float(len(results))
+
+        print('  %-22s %8.1f MiB unique memory gained per worker' % (title, average / (1024 * 1024)))
+
+
+if __name__ == '__main__':
+    main(*[int(v) for v in sys.argv[1:3]])
@@ -0,0 +1,109 @@
+"""
+    Hot path benchmark scenarios.
+
+    Every module has a `create(options)` generator that sets up its data
+    and yields :class:`~benchmarks.harness.Benchmark` instances. Modules
+    whose backend is not installed raise `ImportError` and are skipped.
+"""
+from pyramid.request import Request
+from pyramid.threadlocal import manager
+
+from pyramid_admin.helpers import set_current_view
+
+from ..harness import Benchmark
+
+
+SCENARIOS = ('tools', 'sqla', 'peewee', 'pymongo', 'mongoengine', 'fileadmin')
+
+
+def in_request(config, view, fn, path='/admin/'):
+    """
+        Return callable that runs `fn` in a request for the view, for
+        benchmarks that call view methods directly.
+    """
+    def wrapper():
+        request = Request.blank(path)
+        request.registry = config.registry
+
+        manager.push({'request': request, 'registry': config.registry})
+
+        try:
+            set_current_view(view)
+            return fn()
+        finally:
+            manager.pop()
+
+    return wrapper
+
+
+def model_benchmarks(prefix, config, get, views, related_views, rows, edit_id, lookup_url=None,
+                     scaffold_form=True):
+    """
+        Yield benchmarks shared by the model backends.
+
+        :param prefix:
+            Backend name
+        :param config:
+            Pyramid configurator
+        :param get:
+            Client function, see :func:`~benchmarks.harness.client`
+        :param views:
+            Dictionary of page size to model view of the same model
+        :param related_views:
+            Dictionary of page size to model view with related columns in
+            the list or `None`
+        :param rows:
+            Number of rows in the table
+        :param edit_id:
+            Primary key of a row, as a URL argument
+        :param lookup_url:
+            AJAX lookup URL or `None` if the backend has no AJAX lookup
+        :param scaffold_form:
+            Benchmark form scaffolding. Disable for backends that require
+            an explicit form.
+    """
+    for page_size, view in sorted(views.items()):
+        url = view.url + '/'
+
+        yield Benchmark('%s.index_view' % prefix,
+                        lambda url=url: get(url),
+                        page_size, rows=rows, page=page_size)
+
+        yield Benchmark('%s.index_view_search_sort' % prefix,
+                        lambda url=url: get(url + '?sort=0&desc=1&search=user'),
+                        page_size, rows=rows, page=page_size)
+
+        count, data = in_request(config, view,
+                                 lambda view=view: view.get_list(0, None, False, None, None))()
+        data = list(data)
+        columns = [c for c, _ in view._list_columns]
+
+        def format_page(view=view, data=data, columns=columns):
+            for model in data:
+                for c in columns:
+                    view.get_list_value(None, model, c)
+
+        yield Benchmark('%s.get_list_value' % prefix,
+                        in_request(config, view, format_page),
+                        len(data) * len(columns), rows=rows, page=page_size)
+
+        if related_views:
+            yield Benchmark('%s.index_view_related' % prefix,
+                            lambda url=related_views[page_size].url + '/': get(url),
+                            page_size, rows=rows, page=page_size)
+
+    view = views[min(views)]
+
+    yield Benchmark('%s.edit_view' % prefix,
+                    lambda: get('%s/edit/?id=%s' % (view.url, edit_id)),
+                    rows=rows)
+
+    if scaffold_form:
+        yield Benchmark('%s.scaffold_form' % prefix,
+                        in_request(config, view, view.scaffold_form),
+                        rows=rows)
+
+    if lookup_url is not None:
+        yield Benchmark('%s.ajax_lookup' % prefix,
+                        lambda: get(lookup_url),
+                        rows=rows)
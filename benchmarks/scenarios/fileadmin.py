@@ -0,0 +1,48 @@
+"""
+    FileAdmin listing of a generated directory tree.
+"""
+import atexit
+import os
+import os.path as op
+import shutil
+import tempfile
+
+from pyramid_admin.contrib.fileadmin import FileAdmin
+
+from .. import harness
+from ..harness import Benchmark
+
+
+# Subdirectories per listed directory, the rest of the entries are files
+DIRECTORIES = 10
+
+
+def create_tree(path, entries):
+    for i in range(DIRECTORIES):
+        subdir = op.join(path, 'dir%d' % i)
+        os.mkdir(subdir)
+
+        with open(op.join(subdir, 'nested.txt'), 'w') as fp:
+            fp.write('nested')
+
+    for i in range(max(entries - DIRECTORIES, 0)):
+        with open(op.join(path, 'file%d.txt' % i), 'w') as fp:
+            fp.write('x' * (i % 1024))
+
+
+def create(options):
+    for entries in options.sizes:
+        path = tempfile.mkdtemp(prefix='pyramid-admin-bench-')
+        atexit.register(shutil.rmtree, path, True)
+
+        create_tree(path, entries)
+
+        config, admin = harness.create_admin()
+
+        view = FileAdmin(path, '/files/', name='Files', endpoint='files%d' % entries)
+        admin.add_view(view)
+
+        get = harness.client(config)
+
+        yield Benchmark('fileadmin.index', lambda: get(view.url + '/'),
+                        entries, rows=entries)
@@ -0,0 +1,71 @@
+"""
+    MongoEngine model views on a mongomock connection.
+"""
+from datetime import datetime
+
+import mongoengine
+import mongomock
+
+from pyramid_admin.contrib.mongoengine import ModelView
+
+from .. import harness
+from . import model_benchmarks
+
+
+class User(mongoengine.Document):
+    name = mongoengine.StringField(max_length=50)
+    email = mongoengine.StringField(max_length=120)
+    age = mongoengine.IntField()
+    created = mongoengine.DateTimeField()
+
+
+class Post(mongoengine.Document):
+    title = mongoengine.StringField(max_length=120)
+    user = mongoengine.ReferenceField(User)
+
+
+class UserView(ModelView):
+    column_searchable_list = ('name', 'email')
+    column_filters = ('name', 'age', 'created')
+
+
+class PostView(ModelView):
+    column_list = ('title', 'user')
+    form_ajax_refs = {
+        'user': {'fields': ('name',)},
+    }
+
+
+def create(options):
+    mongoengine.connect('benchmarks', host='mongodb://localhost',
+                        mongo_client_class=mongomock.MongoClient)
+
+    for rows in options.sizes:
+        Post.drop_collection()
+        User.drop_collection()
+
+        users = User.objects.insert([User(name='user%d' % i, email='user%d@example.com' % i,
+                                          age=i % 90, created=datetime(2020, 1, 1))
+                                     for i in range(rows)])
+        Post.objects.insert([Post(title='Post %d' % i, user=users[i]) for i in range(rows)])
+
+        config, admin = harness.create_admin()
+
+        views = {}
+        related_views = {}
+
+        for page_size in options.page_sizes:
+            views[page_size] = UserView(User, endpoint='user%d' % page_size)
+            views[page_size].page_size = page_size
+            admin.add_view(views[page_size])
+
+            related_views[page_size] = PostView(Post, endpoint='post%d' % page_size)
+            related_views[page_size].page_size = page_size
+            admin.add_view(related_views[page_size])
+
+        lookup_url = '%s/ajax/lookup/?name=user&query=user1' % related_views[min(related_views)].url
+
+        for bench in model_benchmarks('mongoengine', config, harness.client(config),
+                                      views, related_views, rows, users[rows // 2].id,
+                                      lookup_url):
+            yield bench
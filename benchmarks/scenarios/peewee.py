@@ -0,0 +1,84 @@
+"""
+    Peewee model views on an in-memory SQLite database.
+"""
+from datetime import datetime
+
+import peewee
+
+from pyramid_admin.contrib.peewee import ModelView
+
+from .. import harness
+from . import model_benchmarks
+
+
+db = peewee.SqliteDatabase(':memory:')
+
+
+class BaseModel(peewee.Model):
+    class Meta:
+        database = db
+
+
+class User(BaseModel):
+    name = peewee.CharField(max_length=50, index=True)
+    email = peewee.CharField(max_length=120)
+    age = peewee.IntegerField()
+    created = peewee.DateTimeField()
+
+
+class Post(BaseModel):
+    title = peewee.CharField(max_length=120)
+    user = peewee.ForeignKeyField(User)
+
+
+class UserView(ModelView):
+    column_searchable_list = ('name', 'email')
+    column_filters = ('name', 'age', 'created')
+
+
+class PostView(ModelView):
+    column_list = ('title', 'user')
+    form_ajax_refs = {
+        'user': {'fields': ('name',)},
+    }
+
+
+def populate(rows):
+    Post.drop_table(fail_silently=True)
+    User.drop_table(fail_silently=True)
+    User.create_table()
+    Post.create_table()
+
+    with db.transaction():
+        for i in range(rows):
+            user = User.create(name='user%d' % i, email='user%d@example.com' % i,
+                               age=i % 90, created=datetime(2020, 1, 1))
+            Post.create(title='Post %d' % i, user=user)
+
+
+def create(options):
+    db.connect()
+
+    for rows in options.sizes:
+        populate(rows)
+
+        config, admin = harness.create_admin()
+
+        views = {}
+        related_views = {}
+
+        for page_size in options.page_sizes:
+            views[page_size] = UserView(User, endpoint='user%d' % page_size)
+            views[page_size].page_size = page_size
+            admin.add_view(views[page_size])
+
+            related_views[page_size] = PostView(Post, endpoint='post%d' % page_size)
+            related_views[page_size].page_size = page_size
+            admin.add_view(related_views[page_size])
+
+        lookup_url = '%s/ajax/lookup/?name=user&query=user1' % related_views[min(related_views)].url
+
+        for bench in model_benchmarks('peewee', config, harness.client(config),
+                                      views, related_views, rows, rows // 2 or 1,
+                                      lookup_url):
+            yield bench
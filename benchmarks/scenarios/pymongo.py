@@ -0,0 +1,50 @@
+"""
+    pymongo model views on a mongomock collection.
+"""
+from datetime import datetime
+
+import mongomock
+from wtforms import fields, form
+
+from pyramid_admin.contrib.pymongo import ModelView
+
+from .. import harness
+from . import model_benchmarks
+
+
+class UserForm(form.Form):
+    name = fields.StringField('Name')
+    email = fields.StringField('Email')
+    age = fields.IntegerField('Age')
+
+
+class UserView(ModelView):
+    column_list = ('name', 'email', 'age', 'created')
+    column_sortable_list = ('name', 'email', 'age')
+    column_searchable_list = ('name', 'email')
+
+    form = UserForm
+
+
+def create(options):
+    for rows in options.sizes:
+        coll = mongomock.MongoClient().benchmarks.users
+        coll.insert_many([{'name': 'user%d' % i, 'email': 'user%d@example.com' % i,
+                           'age': i % 90, 'created': datetime(2020, 1, 1)}
+                          for i in range(rows)])
+
+        config, admin = harness.create_admin()
+
+        views = {}
+
+        for page_size in options.page_sizes:
+            views[page_size] = UserView(coll, endpoint='user%d' % page_size)
+            views[page_size].page_size = page_size
+            admin.add_view(views[page_size])
+
+        edit_id = coll.find_one({'name': 'user%d' % (rows // 2)})['_id']
+
+        for bench in model_benchmarks('pymongo', config, harness.client(config),
+                                      views, None, rows, edit_id,
+                                      scaffold_form=False):
+            yield bench
@@ -0,0 +1,114 @@
+"""
+    SQLAlchemy model views on an in-memory SQLite database.
+"""
+from datetime import datetime
+
+from sqlalchemy import create_engine, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.orm import declarative_base, relationship, scoped_session, sessionmaker
+
+from pyramid_admin.contrib.sqla import ModelView
+
+from .. import harness
+from ..harness import Benchmark
+from . import in_request, model_benchmarks
+
+
+Base = declarative_base()
+
+
+class User(Base):
+    __tablename__ = 'users'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), index=True)
+    email = Column(String(120))
+    age = Column(Integer)
+    created = Column(DateTime)
+
+
+class Post(Base):
+    __tablename__ = 'posts'
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(120))
+    user_id = Column(Integer, ForeignKey(User.id))
+    user = relationship(User)
+
+
+class UserView(ModelView):
+    column_searchable_list = ('name', 'email')
+    column_filters = ('name', 'age', 'created')
+
+
+class PostView(ModelView):
+    column_list = ('title', 'user.name', 'user.email')
+    form_ajax_refs = {
+        'user': {'fields': ('name',)},
+    }
+
+
+class PostRowView(PostView):
+    list_row_mode = 'tuples'
+
+
+def populate(session, rows):
+    users = [User(name='user%d' % i, email='user%d@example.com' % i, age=i % 90,
+                  created=datetime(2020, 1, 1))
+             for i in range(rows)]
+    session.add_all(users)
+    session.flush()
+
+    session.add_all(Post(title='Post %d' % i, user_id=users[i].id) for i in range(rows))
+    session.commit()
+
+
+def create(options):
+    for rows in options.sizes:
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+
+        session = scoped_session(sessionmaker(bind=engine))
+        populate(session, rows)
+
+        config, admin = harness.create_admin()
+
+        views = {}
+        related_views = {}
+        row_views = {}
+
+        for page_size in options.page_sizes:
+            views[page_size] = UserView(User, session, endpoint='user%d' % page_size)
+            views[page_size].page_size = page_size
+            admin.add_view(views[page_size])
+
+            related_views[page_size] = PostView(Post, session, endpoint='post%d' % page_size)
+            related_views[page_size].page_size = page_size
+            admin.add_view(related_views[page_size])
+
+            row_views[page_size] = PostRowView(Post, session, endpoint='postrow%d' % page_size)
+            row_views[page_size].page_size = page_size
+            admin.add_view(row_views[page_size])
+
+        lookup_url = '%s/ajax/lookup/?name=user&query=user1' % related_views[min(related_views)].url
+
+        get = harness.client(config)
+
+        for bench in model_benchmarks('sqla', config, get,
+                                      views, related_views, rows, rows // 2 or 1,
+                                      lookup_url):
+            yield bench
+
+        # Model instances against tuple rows, for large pages use
+        # --page-sizes 500,1000
+        for page_size in sorted(options.page_sizes):
+            for suffix, view in (('', related_views[page_size]),
+                                 ('_tuples', row_views[page_size])):
+                yield Benchmark('sqla.get_list_related%s' % suffix,
+                                in_request(config, view,
+                                           lambda view=view: view.get_list(0, None, False,
+                                                                           None, None)),
+                                page_size, rows=rows, page=page_size)
+
+            yield Benchmark('sqla.index_view_related_tuples',
+                            lambda url=row_views[page_size].url + '/': get(url),
+                            page_size, rows=rows, page=page_size)
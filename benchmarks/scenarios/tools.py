@@ -0,0 +1,43 @@
+"""
+    Helpers used for every row of the list view: primary key encoding for
+    composite keys and dotted attribute lookup of related columns.
+"""
+from pyramid_admin import tools
+
+from ..harness import Benchmark
+
+
+class Node(object):
+    def __init__(self, child=None, value=None):
+        self.child = child
+        self.value = value
+
+
+def create(options):
+    for count in options.sizes:
+        keys = [(i, 'key,%d' % i, None) for i in range(count)]
+        encoded = [tools.iterencode(k) for k in keys]
+
+        def encode(keys=keys):
+            for k in keys:
+                tools.iterencode(k)
+
+        def decode(encoded=encoded):
+            for v in encoded:
+                tools.iterdecode(v)
+
+        yield Benchmark('tools.iterencode', encode, count, rows=count)
+        yield Benchmark('tools.iterdecode', decode, count, rows=count)
+
+        objects = [Node(Node(Node(value=i))) for i in range(count)]
+
+        def getattr_nested(objects=objects):
+            for obj in objects:
+                tools.rec_getattr(obj, 'child.child.value')
+
+        def getattr_missing(objects=objects):
+            for obj in objects:
+                tools.rec_getattr(obj, 'child.missing.value')
+
+        yield Benchmark('tools.rec_getattr', getattr_nested, count, rows=count)
+        yield Benchmark('tools.rec_getattr_missing', getattr_missing, count, rows=count)
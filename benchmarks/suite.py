@@ -0,0 +1,100 @@
+"""
+    Hot path benchmark suite.
+
+    Measures list, edit, form scaffolding and AJAX lookup views of every
+    installed backend at several table and page sizes, plus the helpers
+    used for every list row. Backends that are not installed are skipped.
+
+    Results can be stored as a baseline and compared against later, for
+    example in CI on the same machine type::
+
+        python -m benchmarks --save benchmarks/baselines/ci.json
+        python -m benchmarks --baseline benchmarks/baselines/ci.json
+
+    The comparison exits with status 1 when a benchmark is slower, or
+    allocates more memory, than the baseline by more than the tolerance.
+
+    Usage::
+
+        python -m benchmarks [--quick] [--sizes 100,1000] [--page-sizes 20,100]
+                             [--filter sqla.index] [--save FILE]
+                             [--baseline FILE] [--tolerance 0.25]
+"""
+import argparse
+import importlib
+import sys
+
+from . import harness
+from .scenarios import SCENARIOS
+
+
+def parse_sizes(value):
+    return [int(v) for v in value.split(',') if v]
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Admin hot path benchmarks')
+    parser.add_argument('--sizes', type=parse_sizes, default=[100, 1000, 10000],
+                        help='comma separated table sizes (default: 100,1000,10000)')
+    parser.add_argument('--page-sizes', type=parse_sizes, default=[20, 100],
+                        help='comma separated page sizes (default: 20,100)')
+    parser.add_argument('--quick', action='store_true',
+                        help='small sizes and short runs, for smoke tests')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='run only these scenarios')
+    parser.add_argument('--filter', default=None,
+                        help='run only benchmarks with this substring in the name')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimum time per benchmark, in seconds')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of timed runs, the best one is reported')
+    parser.add_argument('--save', metavar='FILE',
+                        help='store results as JSON')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='compare results with the JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative regression (default: 0.25)')
+    return parser
+
+
+def iter_benchmarks(options, out=sys.stdout):
+    for name in options.scenario or SCENARIOS:
+        try:
+            module = importlib.import_module('.scenarios.%s' % name, __package__)
+            benchmarks = module.create(options)
+
+            for bench in benchmarks:
+                if options.filter is None or options.filter in bench.name:
+                    yield bench
+        except ImportError as ex:
+            out.write('%-60s skipped: %s\n' % (name, ex))
+
+
+def main(argv=None, out=sys.stdout):
+    options = get_parser().parse_args(argv)
+
+    if options.quick:
+        options.sizes = [100]
+        options.page_sizes = [20]
+        options.min_time = 0.05
+        options.repeat = 3
+
+    results = harness.run(iter_benchmarks(options, out),
+                          options.min_time, options.repeat, out)
+
+    if options.save:
+        harness.save(options.save, results)
+
+    if options.baseline:
+        regressions = harness.compare(results, harness.load(options.baseline),
+                                      options.tolerance)
+
+        for name, metric, base, current in regressions:
+            out.write('REGRESSION %s %s: %s -> %s (%+.0f%%)\n' % (
+                name, metric, base, current, (current / float(base) - 1) * 100 if base else 100))
+
+        if regressions:
+            return 1
+
+    return 0
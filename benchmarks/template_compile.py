@@ -0,0 +1,71 @@
+"""
+    Admin template loading benchmark.
+
+    Measures how long a fresh worker takes to load all admin templates:
+
+    - cold: templates are parsed and compiled from source
+    - bytecode cache: compiled code is loaded from the on-disk cache
+      populated ahead of time
+    - warm: templates are already in the environment cache, which is
+      what every request after the first one sees
+
+    Usage::
+
+        python -m benchmarks.template_compile [bootstrap2|bootstrap3]
+"""
+import shutil
+import sys
+import tempfile
+import time
+
+from pyramid.config import Configurator
+
+from pyramid_admin import Admin, templating
+
+
+def create_env(template_mode, bytecode_cache_dir=None):
+    config = Configurator(settings={})
+    config.include('pyramid_jinja2')
+    config.add_jinja2_search_path('pyramid_admin:templates/%s' % template_mode)
+
+    Admin(config, template_mode=template_mode, bytecode_cache_dir=bytecode_cache_dir)
+    config.commit()
+
+    return templating.get_environment(config.registry)
+
+
+def load(env, names):
+    start = time.time()
+    templating.compile_templates(env, names)
+    return time.time() - start
+
+
+def best(fn, repeat=5):
+    return min(fn() for _ in range(repeat))
+
+
+def main(template_mode='bootstrap3'):
+    names = templating.list_templates(template_mode)
+    path = tempfile.mkdtemp()
+
+    try:
+        # Ahead-of-time compilation
+        load(create_env(template_mode, path), names)
+
+        cold = best(lambda: load(create_env(template_mode), names))
+        cached = best(lambda: load(create_env(template_mode, path), names))
+
+        env = create_env(template_mode)
+        load(env, names)
+        warm = best(lambda: load(env, names))
+    finally:
+        shutil.rmtree(path)
+
+    print('%d %s admin templates' % (len(names), template_mode))
+    print('  cold:           %8.2f ms' % (cold * 1000))
+    print('  bytecode cache: %8.2f ms (%.1fx faster)' % (cached * 1000, cold / cached))
+    print('  warm:           %8.2f ms' % (warm * 1000))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2])
@@ -41,6 +41,7 @@ if not PY2:
     # Various tools
     from functools import reduce
     from urllib.parse import urljoin, urlparse
+    from time import perf_counter
 else:
     text_type = unicode
     string_types = (str, unicode)
@@ -60,6 +61,7 @@ else:
     # Helpers
     reduce = __builtins__['reduce'] if isinstance(__builtins__, dict) else __builtins__.reduce
     from urlparse import urljoin, urlparse
+    from time import time as perf_counter
 
 
 def with_metaclass(meta, *bases):
@@ -144,13 +146,30 @@ class Globals(object):
 
 def url_for(route_name, **kw):
     request = get_current_request()
-    mapper = request.registry.getUtility(IRoutesMapper)
     if route_name == 'admin.static':
+        # Fingerprinted files, if they were built
+        assets = getattr(request.registry, 'admin_static_assets', None)
+        if assets is not None:
+            url = assets.url(request, kw['filename'])
+            if url is not None:
+                return url
+
         return request.static_url('pyramid_admin:static/' + kw['filename'])
 
     if route_name.startswith('.'):
-        route_name = get_current_view().endpoint + route_name
+        view = get_current_view()
+        rules = view._url_rules.get(route_name[1:])
+        route_name = view.endpoint + route_name
+    else:
+        rules = getattr(request.registry, 'admin_url_rules', {}).get(route_name)
+
+    # Admin view URLs are compiled when views are configured
+    if rules:
+        url = build_url(request, rules, kw)
+        if url is not None:
+            return url
 
+    mapper = request.registry.getUtility(IRoutesMapper)
     for i in count(1):
         rname = '%s--%d' % (route_name, i)
         route = mapper.get_route(rname)
@@ -231,4 +250,5 @@ def secure_filename(filename):
 g = Globals()
 
 from .helpers import get_current_view
+from .dispatch import build_url
 from . import json
@@ -2,6 +2,7 @@ from pyramid.httpexceptions import HTTPFound
 from pyramid.threadlocal import get_current_request
 
 from pyramid_admin import tools
+from pyramid_admin.babel import get_catalog_key
 from ._compat import text_type
 
 
@@ -45,6 +46,7 @@ class ActionsMixin(object):
         """
         self._actions = []
         self._actions_data = {}
+        self._action_labels = {}
 
     def init_actions(self):
         """
@@ -52,6 +54,7 @@ class ActionsMixin(object):
         """
         self._actions = []
         self._actions_data = {}
+        self._action_labels = {}
 
         for p in dir(self):
             attr = tools.get_dict_attr(self, p)
@@ -75,6 +78,26 @@ class ActionsMixin(object):
         """
         return True
 
+    def _get_action_labels(self):
+        """
+            Return dictionary of translated action text and confirmation
+            text. Computed once per message catalog.
+        """
+        key = get_catalog_key()
+
+        labels = self._action_labels.get(key)
+        if labels is None:
+            labels = {}
+
+            for name, text in self._actions:
+                confirmation = self._actions_data[name][2]
+                labels[name] = (text_type(text),
+                                text_type(confirmation) if confirmation else None)
+
+            self._action_labels[key] = labels
+
+        return labels
+
     def get_actions_list(self):
         """
             Return a list and a dictionary of allowed actions.
@@ -82,15 +105,16 @@ class ActionsMixin(object):
         actions = []
         actions_confirmation = {}
 
-        for act in self._actions:
-            name, text = act
+        labels = self._get_action_labels()
 
+        for name, _ in self._actions:
             if self.is_action_allowed(name):
-                actions.append((name, text_type(text)))
+                text, confirmation = labels[name]
+
+                actions.append((name, text))
 
-                confirmation = self._actions_data[name][2]
                 if confirmation:
-                    actions_confirmation[name] = text_type(confirmation)
+                    actions_confirmation[name] = confirmation
 
         return actions, actions_confirmation
 
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+    pyramid_admin.assets
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Fingerprinted, precompressed admin static files.
+
+    The build step copies the admin static files into a directory, adding a
+    content hash to every file name, and writes precompressed ``.gz`` (and
+    ``.br``, if the `brotli` package is installed) siblings and a manifest::
+
+        python -m pyramid_admin.assets /srv/myapp/admin-static
+
+    Pass the directory to :class:`~pyramid_admin.base.Admin` as
+    `static_assets_dir`. `url_for('admin.static', filename=...)` then
+    resolves files through the manifest, and the files are served with
+    far-future, immutable cache headers and in the best encoding the
+    client accepts.
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import os
+import posixpath
+import re
+import shutil
+import sys
+
+from pyramid.httpexceptions import HTTPNotFound
+from pyramid.security import NO_PERMISSION_REQUIRED
+from pyramid.static import static_view
+
+from pyramid_admin import json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+STATIC_PATH = os.path.join(os.path.dirname(__file__), 'static')
+
+MANIFEST_NAME = 'manifest.json'
+
+# One year
+CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+COMPRESSIBLE_EXTENSIONS = frozenset(['.css', '.js', '.json', '.map', '.svg',
+                                     '.txt', '.html', '.xml', '.eot', '.ttf', '.otf'])
+
+_css_url_re = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+
+
+def _hash_name(name, content):
+    base, ext = posixpath.splitext(name)
+    return '%s.%s%s' % (base, hashlib.sha256(content).hexdigest()[:12], ext)
+
+
+def _rewrite_css(name, content, manifest):
+    """
+        Point relative `url()` references of a stylesheet to the
+        fingerprinted files.
+    """
+    directory = posixpath.dirname(name)
+
+    def replace(m):
+        url = m.group(2)
+
+        if url.startswith(('data:', '#', '/')) or '//' in url:
+            return m.group(0)
+
+        # Keep query string and fragment, e.g. font.eot?#iefix
+        path, suffix = re.match(r'([^?#]*)(.*)', url).groups()
+        target = posixpath.normpath(posixpath.join(directory, path))
+
+        hashed = manifest.get(target)
+        if hashed is None:
+            return m.group(0)
+
+        relative = posixpath.relpath(hashed, directory) if directory else hashed
+        return 'url(%s%s%s%s)' % (m.group(1), relative, suffix, m.group(1))
+
+    return _css_url_re.sub(replace, content.decode('utf-8')).encode('utf-8')
+
+
+def _write(path, content):
+    directory = os.path.dirname(path)
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    with open(path, 'wb') as fp:
+        fp.write(content)
+
+
+def _compress(path, content, use_brotli):
+    buf = io.BytesIO()
+
+    # Fixed mtime to keep builds reproducible
+    with gzip.GzipFile(filename='', mode='wb', fileobj=buf, compresslevel=9, mtime=0) as fp:
+        fp.write(content)
+
+    if len(buf.getvalue()) < len(content):
+        _write(path + '.gz', buf.getvalue())
+
+    if use_brotli:
+        compressed = brotli.compress(content)
+
+        if len(compressed) < len(content):
+            _write(path + '.br', compressed)
+
+
+def build(target, source=STATIC_PATH, use_brotli=None):
+    """
+        Build fingerprinted copy of the static files. Returns the manifest,
+        a dictionary of original to fingerprinted file names.
+
+        :param target:
+            Output directory. Existing files are replaced.
+        :param source:
+            Static files directory. Defaults to the admin static files.
+        :param use_brotli:
+            Write ``.br`` files. By default, enabled if `brotli` is installed.
+    """
+    if use_brotli is None:
+        use_brotli = brotli is not None
+    elif use_brotli and brotli is None:
+        raise Exception(u'Please install brotli to use brotli compression.')
+
+    names = []
+
+    for path, dirs, files in os.walk(source):
+        for filename in files:
+            name = os.path.relpath(os.path.join(path, filename), source).replace(os.sep, '/')
+            names.append(name)
+
+    # Stylesheets reference other files, so their hashes depend
+    # on the rewritten content
+    names.sort(key=lambda n: (n.endswith('.css'), n))
+
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+
+    manifest = {}
+
+    for name in names:
+        with open(os.path.join(source, name), 'rb') as fp:
+            content = fp.read()
+
+        if name.endswith('.css'):
+            content = _rewrite_css(name, content, manifest)
+
+        hashed = manifest[name] = _hash_name(name, content)
+
+        path = os.path.join(target, *hashed.split('/'))
+        _write(path, content)
+
+        if posixpath.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+            _compress(path, content, use_brotli)
+
+    with open(os.path.join(target, MANIFEST_NAME), 'w') as fp:
+        json.dump(manifest, fp, indent=1, sort_keys=True)
+
+    return manifest
+
+
+class StaticAssets(object):
+    """
+        Fingerprinted static files served by the admin.
+    """
+    def __init__(self, directory, route_name, cache_max_age=CACHE_MAX_AGE):
+        """
+            Constructor.
+
+            :param directory:
+                Directory created by :func:`build`
+            :param route_name:
+                Route that serves the files
+            :param cache_max_age:
+                Cache lifetime, in seconds
+        """
+        self.directory = directory
+        self.route_name = route_name
+        self.cache_max_age = cache_max_age
+
+        with open(os.path.join(directory, MANIFEST_NAME)) as fp:
+            self.manifest = json.load(fp)
+
+        self._files = frozenset(self.manifest.values())
+        self._url_cache = {}
+
+        self._static = static_view(directory,
+                                   cache_max_age=cache_max_age,
+                                   use_subpath=True,
+                                   content_encodings=('br', 'gzip'))
+
+    def url(self, request, filename):
+        """
+            Return URL of the fingerprinted file or `None` if the file is
+            not in the manifest.
+
+            :param request:
+                Current request
+            :param filename:
+                File name relative to the admin static directory
+        """
+        hashed = self.manifest.get(filename)
+
+        if hashed is None:
+            return None
+
+        key = (request.script_name, hashed)
+        path = self._url_cache.get(key)
+
+        if path is None:
+            path = self._url_cache[key] = request.route_path(self.route_name,
+                                                            subpath=hashed.split('/'))
+
+        return request.host_url + path
+
+    def __call__(self, context, request):
+        # Manifest and original file names are not served
+        if '/'.join(request.subpath) not in self._files:
+            raise HTTPNotFound()
+
+        response = self._static(context, request)
+
+        # Content of the file never changes, browsers do not need to revalidate
+        response.headers['Cache-Control'] = 'public, max-age=%d, immutable' % self.cache_max_age
+
+        return response
+
+    def register(self, config, url):
+        """
+            Register the route and view.
+
+            :param config:
+                Pyramid Configurator
+            :param url:
+                URL prefix of the files
+        """
+        config.add_route(self.route_name, url.rstrip('/') + '/*subpath')
+        config.add_view(view=self,
+                        route_name=self.route_name,
+                        permission=NO_PERMISSION_REQUIRED)
+
+        config.registry.admin_static_assets = self
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pyramid_admin.assets',
+                                     description='Build fingerprinted, precompressed admin static files.')
+    parser.add_argument('target', help='Output directory')
+    parser.add_argument('--source', default=STATIC_PATH, help='Static files directory')
+    parser.add_argument('--no-brotli', action='store_true', help='Do not write .br files')
+
+    args = parser.parse_args(argv)
+
+    manifest = build(args.target, args.source, use_brotli=False if args.no_brotli else None)
+
+    sys.stdout.write('Built %d files into %s\n' % (len(manifest), args.target))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+    pyramid_admin.audit
+    ~~~~~~~~~~~~~~~~~~~
+
+    Asynchronous, batched change log for model views.
+
+    Entries are produced from the model change hooks of
+    :class:`~pyramid_admin.model.BaseModelView`, pushed to a bounded
+    in-process queue and written to a sink by a background thread, so the
+    request that changed the model never waits for the audit write.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, time as dtime
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from pyramid.threadlocal import get_current_request
+
+from ._compat import as_unicode, iteritems, string_types, integer_types
+from . import json
+
+
+# Set up logger
+log = logging.getLogger("pyramid-admin.audit")
+
+
+ACTION_CREATE = 'create'
+ACTION_UPDATE = 'update'
+ACTION_DELETE = 'delete'
+
+
+def normalize_value(value):
+    """
+        Convert value to something that can be stored by every sink
+        (JSON, BSON, SQL text).
+
+        Has to be called in the request thread: ORM objects might lazy-load
+        or expire once the request is over.
+
+        :param value:
+            Value to convert
+    """
+    if value is None or isinstance(value, (bool, float) + integer_types + string_types):
+        return value
+
+    if isinstance(value, (datetime, date, dtime)):
+        return value.isoformat()
+
+    if isinstance(value, dict):
+        return dict((as_unicode(k), normalize_value(v)) for k, v in iteritems(value))
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [normalize_value(v) for v in value]
+
+    return as_unicode(value)
+
+
+def get_form_changes(form, is_created, exclude=None):
+    """
+        Return field-level changes for the submitted form as a dictionary
+        of ``field name: (old value, new value)``.
+
+        Old values come from the data the form was populated with, so no
+        extra query is needed to compute the diff.
+
+        :param form:
+            Form used to create/update the model
+        :param is_created:
+            If `True`, all fields are reported with `None` as old value
+        :param exclude:
+            Collection of field names that should never be logged
+    """
+    changes = {}
+
+    for field in form:
+        if field.name == 'csrf_token' or (exclude and field.name in exclude):
+            continue
+
+        new = normalize_value(field.data)
+        old = None if is_created else normalize_value(field.object_data)
+
+        if is_created or old != new:
+            changes[field.name] = (old, new)
+
+    return changes
+
+
+def make_entry(view, model, action, changes=None):
+    """
+        Build audit entry for the model.
+
+        :param view:
+            Model view that changed the model
+        :param model:
+            Model instance
+        :param action:
+            One of `ACTION_CREATE`, `ACTION_UPDATE` or `ACTION_DELETE`
+        :param changes:
+            Field changes, see :func:`get_form_changes`
+    """
+    request = get_current_request()
+    user = getattr(request, 'authenticated_userid', None) if request is not None else None
+
+    return {
+        'timestamp': datetime.utcnow().isoformat(),
+        'user': normalize_value(user),
+        'endpoint': view.endpoint,
+        'model': getattr(view.model, '__name__', None) or view.endpoint,
+        'pk': normalize_value(view.get_pk_value(model)),
+        'action': action,
+        'changes': changes or {},
+    }
+
+
+class BaseAuditSink(object):
+    """
+        Audit sink. Receives batches of entries from the writer thread.
+    """
+    def write(self, entries):
+        """
+            Store list of entries.
+
+            :param entries:
+                List of entry dictionaries
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        """
+            Release sink resources. Called once the log is shut down.
+        """
+        pass
+
+
+class JSONLinesAuditSink(BaseAuditSink):
+    """
+        Append entries to a file, one JSON document per line.
+    """
+    def __init__(self, path):
+        """
+            Constructor.
+
+            :param path:
+                Path to the log file
+        """
+        self.path = path
+
+    def write(self, entries):
+        data = u''.join(json.dumps(e) + u'\n' for e in entries)
+
+        with open(self.path, 'ab') as fp:
+            fp.write(data.encode('utf-8'))
+
+
+class AuditLog(object):
+    """
+        Bounded queue of audit entries flushed in batches by a background
+        writer thread.
+
+        Usage sample::
+
+            audit_log = AuditLog(JSONLinesAuditSink('/var/log/admin-audit.jsonl'))
+
+            class UserView(ModelView):
+                audit_log = audit_log
+
+        When the queue is full, `record` blocks for up to `put_timeout`
+        seconds, which throttles the writers instead of growing memory.
+        Entries that still do not fit are dropped and counted in `dropped`.
+
+        The writer thread is started on first use (so it is created in the
+        worker process when running under a pre-forking server) and the
+        queue is flushed on interpreter shutdown.
+    """
+    def __init__(self, sink, max_queue_size=10000, batch_size=500,
+                 flush_interval=1.0, put_timeout=0.5):
+        """
+            Constructor.
+
+            :param sink:
+                :class:`BaseAuditSink` instance
+            :param max_queue_size:
+                Maximum number of entries waiting to be written
+            :param batch_size:
+                Maximum number of entries passed to the sink at once
+            :param flush_interval:
+                How long the writer waits for more entries before writing
+                an incomplete batch, in seconds
+            :param put_timeout:
+                How long `record` blocks on a full queue before the entry is
+                dropped, in seconds. `None` blocks forever.
+        """
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+
+        self.dropped = 0
+
+        self._queue = queue.Queue(max_queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+
+    def _ensure_writer(self):
+        # Threads do not survive fork, so start a new writer in the child
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+
+            if self._pid is None:
+                atexit.register(self.close)
+
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='pyramid-admin-audit')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def record(self, entry):
+        """
+            Queue entry for writing.
+
+            Returns `False` if the entry was dropped.
+
+            :param entry:
+                Entry dictionary, see :func:`make_entry`
+        """
+        if self._closed:
+            return False
+
+        self._ensure_writer()
+
+        try:
+            self._queue.put(entry, timeout=self.put_timeout)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+            log.warning('Audit queue is full, dropped entry for %s %s',
+                        entry.get('model'), entry.get('pk'))
+            return False
+
+        return True
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return None
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+
+            if batch is None:
+                if self._closed:
+                    return
+
+                continue
+
+            try:
+                self.sink.write(batch)
+            except Exception:
+                log.exception('Failed to write %d audit entries.', len(batch))
+
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self, timeout=None):
+        """
+            Wait until all queued entries are written.
+
+            Returns `False` if the timeout expired first.
+
+            :param timeout:
+                Timeout in seconds or `None` to wait forever
+        """
+        if self._thread is None:
+            return True
+
+        deadline = None if timeout is None else time.time() + timeout
+
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                if deadline is None:
+                    self._queue.all_tasks_done.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return False
+
+                    self._queue.all_tasks_done.wait(remaining)
+
+        return True
+
+    def close(self, timeout=5.0):
+        """
+            Flush queued entries and stop the writer thread.
+
+            :param timeout:
+                Maximum time to wait for pending entries, in seconds
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+
+        if self._thread is not None and self._pid == os.getpid():
+            if not self.flush(timeout):
+                log.warning('Audit log closed with %d unwritten entries.',
+                            self._queue.unfinished_tasks)
+
+            self._thread.join(self.flush_interval * 2)
+
+        self.sink.close()
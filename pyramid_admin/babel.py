@@ -11,6 +11,9 @@ except ImportError:
     def lazy_gettext(string, **variables):
         return gettext(string, **variables)
 
+    def get_catalog_key():
+        return None
+
 else:
     from pyramid_admin import translations
 
@@ -18,6 +21,9 @@ else:
         def __init__(self):
             super(CustomDomain, self).__init__(translations.__path__[0], domain='admin')
 
+            # Loaded catalogs, per translations path and locale
+            self.path_caches = {}
+
         def get_translations_path(self, ctx):
             view = get_current_view()
 
@@ -28,11 +34,52 @@ else:
 
             return super(CustomDomain, self).get_translations_path(ctx)
 
+        def get_translations_cache(self, ctx):
+            # Default cache is keyed by locale only, which mixes up catalogs
+            # of admin instances with different translations paths
+            path = self.get_translations_path(ctx)
+
+            cache = self.path_caches.get(path)
+            if cache is None:
+                cache = self.path_caches.setdefault(path, {})
+
+            return cache
+
+        def get_translations(self):
+            # Locale does not change during the request, so lazy strings
+            # do not have to select the locale and catalog again
+            cache = get_request_cache()
+
+            if cache is None:
+                return super(CustomDomain, self).get_translations()
+
+            view = get_current_view()
+            key = ('translations', view.admin.translations_path if view is not None else None)
+
+            translations = cache.get(key)
+            if translations is None:
+                translations = cache[key] = super(CustomDomain, self).get_translations()
+
+            return translations
+
     domain = CustomDomain()
 
     gettext = domain.gettext
     ngettext = domain.ngettext
     lazy_gettext = domain.lazy_gettext
 
+    def get_catalog_key():
+        """
+            Return hashable key of the message catalog used by the current
+            request or `None` outside of the request.
+
+            Strings translated with the same catalog are the same, so they
+            can be cached by the key.
+        """
+        if get_request_cache() is None:
+            return None
+
+        return domain.get_translations()
+
 # lazy imports
-from .helpers import get_current_view
+from .helpers import get_current_view, get_request_cache
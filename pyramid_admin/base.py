@@ -1,18 +1,32 @@
+import gc
+import logging
+import time
 from itertools import count
-from functools import wraps
+from functools import partial, wraps
+from pyramid.csrf import get_csrf_token
+from pyramid.events import BeforeRender
 from pyramid.httpexceptions import HTTPForbidden
 
 from pyramid.renderers import render_to_response
+from pyramid.response import Response
 from pyramid.security import NO_PERMISSION_REQUIRED
-from pyramid.threadlocal import get_current_registry
+from pyramid.threadlocal import get_current_registry, get_current_request, manager
 from ._compat import g, url_for, get_flashed_messages
 from . import babel
-from ._compat import with_metaclass
+from ._compat import with_metaclass, perf_counter
 from . import helpers as h
+from . import queries
+from . import templating
+from .dispatch import AdminDispatcher, UrlRule
 
 # For compatibility reasons import MenuLink
 # noinspection PyUnresolvedReferences
-from .menu import MenuCategory, MenuView, MenuLink
+from .menu import MenuCategory, MenuView, MenuLink, MenuCache
+
+
+log = logging.getLogger("pyramid-admin")
+
+_missing = object()
 
 
 def expose(url='/', methods=('GET',)):
@@ -53,6 +67,43 @@ def expose_plugview(url='/'):
     return wrap
 
 
+def cached_permission(name=None):
+    """
+        Use this decorator to cache the result of a permission check method
+        for the rest of the request. For example::
+
+            class MyView(ModelView):
+                @cached_permission
+                def is_accessible(self):
+                    return check_access(get_current_request())
+
+                @cached_permission('action')
+                def is_action_allowed(self, name):
+                    return has_permission(name)
+
+        Decisions are cached per view, check name, arguments and
+        authenticated user. Arguments should be hashable.
+
+        :param name:
+            Check name. Defaults to the method name.
+    """
+    def wrap(f):
+        check_name = name or f.__name__
+
+        @wraps(f)
+        def inner(self, *args):
+            return self.get_cached_permission(check_name, partial(f, self), *args)
+
+        return inner
+
+    # Used without arguments
+    if callable(name):
+        f, name = name, None
+        return wrap(f)
+
+    return wrap
+
+
 # Base views
 def _wrap_view(f):
     # Avoid wrapping view method twice
@@ -64,12 +115,37 @@ def _wrap_view(f):
         # Store current admin view
         h.set_current_view(self)
 
-        # Check if administrative piece is accessible
-        abort = self._handle_view(f.__name__, **kwargs)
-        if abort is not None:
-            return abort
+        # Make sure view is ready to handle requests
+        self.prepare()
 
-        return self._run_view(f, *args, **kwargs)
+        # Record database queries in debug mode
+        query_log = queries.start() if self._debug else None
+
+        metrics = self._metrics
+        if metrics.enabled:
+            start = perf_counter()
+
+        try:
+            # Check if administrative piece is accessible
+            abort = self._handle_view(f.__name__, **kwargs)
+            if abort is not None:
+                return abort
+
+            profiler = self.admin.profiler if self.admin is not None else None
+
+            if profiler is not None:
+                response = profiler.run(self, f, *args, **kwargs)
+            else:
+                response = self._run_view(f, *args, **kwargs)
+
+            if query_log is not None:
+                queries.add_header(response, query_log)
+
+            return response
+        finally:
+            # Rejected and failed requests are measured too
+            if metrics.enabled:
+                metrics.observe_view(self.endpoint, f.__name__, perf_counter() - start)
 
     inner._wrapped = True
 
@@ -125,6 +201,12 @@ class BaseView(with_metaclass(AdminViewMeta, BaseViewClass)):
 
             admin.add_view(MyView(name='My View', menu_icon_type='glyph', menu_icon_value='glyphicon-home'))
     """
+    stream_chunk_size = 16384
+    """
+        Approximate size, in characters, of the chunks sent by
+        :meth:`render_streamed`.
+    """
+
     @property
     def _template_args(self):
         """
@@ -204,6 +286,8 @@ class BaseView(with_metaclass(AdminViewMeta, BaseViewClass)):
 
         self.admin = None
 
+        self._url_rules = {}
+
         # Default view
         # noinspection PyUnresolvedReferences
         if self._default_view is None:
@@ -262,16 +346,40 @@ class BaseView(with_metaclass(AdminViewMeta, BaseViewClass)):
         if not hasattr(config.registry, 'admin_routes'):
             config.registry.admin_routes = set()
 
+        if not hasattr(config.registry, 'admin_url_rules'):
+            config.registry.admin_url_rules = {}
+
+        dispatcher = admin.dispatcher
+        url_prefix = '/' + config.route_prefix.strip('/') if config.route_prefix else ''
+
+        # URL rules for `get_url`, compiled once instead of on every call
+        self._url_rules = {}
+
         # noinspection PyUnresolvedReferences
         for url, name, methods in self._urls:
             route_name = self.endpoint + '.' + name
+            url = prefix + '/' + url.lstrip('/')
+
+            if dispatcher is not None and dispatcher.handles(url):
+                rule = UrlRule(url, self, name, methods, url_prefix)
+            else:
+                # Pyramid routes use URL as a literal pattern
+                rule = UrlRule(url, self, name, methods, url_prefix, placeholders=False)
+
+            self._url_rules.setdefault(name, []).append(rule)
+            config.registry.admin_url_rules.setdefault(route_name, []).append(rule)
+
+            # Served by the admin-wide route, no need for a separate one
+            if dispatcher is not None and dispatcher.handles(url):
+                dispatcher.add(rule)
+                continue
+
             for i in count(1):
                 unique_route_name = '%s--%d' % (route_name, i)
                 if unique_route_name not in config.registry.admin_routes:
                     break
 
-            url = prefix + '/' + url.lstrip('/')
-
+            config.registry.admin_routes.add(unique_route_name)
             config.add_route(unique_route_name, url)
             view_func = getattr(self, name)
 
@@ -285,16 +393,10 @@ class BaseView(with_metaclass(AdminViewMeta, BaseViewClass)):
 
         return wrapper
 
-    def render(self, template, **kwargs):
+    def _get_render_args(self, kwargs):
         """
-            Render template
-
-            :param template:
-                Template path to render
-            :param kwargs:
-                Template arguments
+            Add admin helpers and extra template arguments to `kwargs`.
         """
-
         # Store self as admin_view
         kwargs['admin_view'] = self
         kwargs['admin_base_template'] = self.admin.base_template
@@ -313,10 +415,101 @@ class BaseView(with_metaclass(AdminViewMeta, BaseViewClass)):
         kwargs['get_flashed_messages'] = get_flashed_messages
         kwargs['config'] = get_current_registry()
 
+        # Queries of the request, in debug mode
+        kwargs['admin_query_log'] = queries.get_query_log()
+
         # Contribute extra arguments
         kwargs.update(self._template_args)
 
-        return render_to_response(template, kwargs)
+        return kwargs
+
+    def render(self, template, **kwargs):
+        """
+            Render template
+
+            :param template:
+                Template path to render
+            :param kwargs:
+                Template arguments
+        """
+        return render_to_response(template, self._get_render_args(kwargs))
+
+    def render_streamed(self, template, **kwargs):
+        """
+            Render template into a streaming response.
+
+            The response body is generated while it is sent to the client, in
+            chunks of about `stream_chunk_size` characters, so the beginning
+            of the page is sent before the rest is rendered and the whole page
+            is never held in memory.
+
+            The template is rendered after the view method returns. Template
+            arguments should not depend on resources released at the end of
+            the request, for example lazy loaded relationships of models from
+            a session closed when the transaction is committed.
+
+            Falls back to :meth:`render` if the Jinja2 environment is not
+            configured.
+
+            :param template:
+                Template path to render
+            :param kwargs:
+                Template arguments
+        """
+        request = get_current_request()
+        registry = get_current_registry()
+
+        env = templating.get_environment(registry)
+
+        if env is None:
+            return self.render(template, **kwargs)
+
+        kwargs = self._get_render_args(kwargs)
+
+        # Same system values and event as `render_to_response`
+        system = BeforeRender({
+            'view': None,
+            'renderer_name': template,
+            'renderer_info': None,
+            'context': getattr(request, 'context', None),
+            'request': request,
+            'req': request,
+            'get_csrf_token': partial(get_csrf_token, request),
+        }, kwargs)
+        registry.notify(system)
+        system.update(kwargs)
+
+        app_iter = self._generate(env.get_template(template), system, request, registry)
+
+        return Response(app_iter=app_iter, content_type='text/html', charset='utf-8')
+
+    def _generate(self, template, context, request, registry):
+        stream = template.generate(context)
+        chunk_size = self.stream_chunk_size
+
+        while True:
+            # Runs after the request was handled, restore request state
+            # for helpers like `url_for` while the next chunk is rendered
+            manager.push({'request': request, 'registry': registry})
+            h.set_current_view(self)
+
+            try:
+                chunk, size = [], 0
+
+                for s in stream:
+                    chunk.append(s)
+                    size += len(s)
+
+                    if size >= chunk_size:
+                        break
+            finally:
+                manager.pop()
+
+            if chunk:
+                yield u''.join(chunk).encode('utf-8')
+
+            if size < chunk_size:
+                break
 
     def _prettify_class_name(self, name):
         """
@@ -349,6 +542,47 @@ class BaseView(with_metaclass(AdminViewMeta, BaseViewClass)):
         """
         return True
 
+    def prepare(self):
+        """
+            Prepare the view for handling requests.
+
+            Called before every view method and by :meth:`Admin.warmup`, so
+            it should return quickly once the view is prepared. By default
+            does nothing.
+        """
+        pass
+
+    def get_cached_permission(self, name, check, *args):
+        """
+            Return result of the permission check, calling it only once per
+            request for the view, check name, arguments and authenticated user.
+
+            Outside of a request the check is called every time.
+
+            :param name:
+                Check name, for example `is_accessible`
+            :param check:
+                Function that makes the decision
+            :param args:
+                Check arguments, also part of the cache key
+        """
+        request = get_current_request()
+        cache = h.get_request_cache(request)
+
+        if cache is None:
+            return check(*args)
+
+        key = ('permission', id(self), name, request.authenticated_userid, args)
+
+        result = cache.get(key, _missing)
+        if result is _missing:
+            self._metrics.cache_miss('permission')
+            result = cache[key] = check(*args)
+        else:
+            self._metrics.cache_hit('permission')
+
+        return result
+
     def _handle_view(self, name, **kwargs):
         """
             This method will be executed before calling any view method.
@@ -400,6 +634,13 @@ class BaseView(with_metaclass(AdminViewMeta, BaseViewClass)):
         """
         return url_for(endpoint, **kwargs)
 
+    @property
+    def _metrics(self):
+        if self.admin is None:
+            return admin_metrics.NULL_METRICS
+
+        return self.admin.metrics
+
     @property
     def _debug(self):
         if not self.admin or not self.admin.config:
@@ -463,6 +704,13 @@ class AdminIndexView(BaseView):
         return self.render(self._template)
 
 
+def default_menu_cache_key(request):
+    """
+        Cache visible menu per authenticated user.
+    """
+    return request.authenticated_userid
+
+
 class Admin(object):
     """
         Collection of the admin views. Also manages menu structure.
@@ -474,7 +722,14 @@ class Admin(object):
                  endpoint=None,
                  static_url_path=None,
                  base_template=None,
-                 template_mode=None):
+                 template_mode=None,
+                 single_route=False,
+                 bytecode_cache_dir=None,
+                 static_assets_dir=None,
+                 menu_cache_ttl=None,
+                 menu_cache_key=None,
+                 metrics=None,
+                 profiler=None):
         """
             Constructor.
 
@@ -502,6 +757,41 @@ class Admin(object):
             :param template_mode:
                 Base template path. Defaults to `bootstrap2`. If you want to use
                 Bootstrap 3 integration, change it to `bootstrap3`.
+            :param single_route:
+                If set to `True`, register one ``<url>/*subpath`` route for the
+                whole admin instead of a route per exposed view method. View
+                methods are then resolved with a dictionary lookup, which keeps
+                Pyramid route matching fast for applications with many views.
+                Views with absolute URLs outside of the admin URL still get their
+                own routes.
+            :param bytecode_cache_dir:
+                Directory for the Jinja2 bytecode cache. If provided, compiled
+                templates are stored on disk and reused by other workers and
+                after restarts. Can be populated ahead of time with
+                ``python -m pyramid_admin.precompile``.
+            :param static_assets_dir:
+                Directory with fingerprinted static files built by
+                ``python -m pyramid_admin.assets``. If provided, admin static
+                files are served from it, under the ``_static`` URL of the
+                admin, with far-future cache headers.
+            :param menu_cache_ttl:
+                If provided, menu items visible to a user are cached for this
+                many seconds, so `is_accessible` and `is_visible` are not
+                called for every view on every page.
+            :param menu_cache_key:
+                Function that takes the request and returns cache key for the
+                visible menu. Users with the same key share the cached menu, so
+                it can return, for example, the set of user roles. If it returns
+                `None`, the menu is not cached. Defaults to
+                `request.authenticated_userid`.
+            :param metrics:
+                :class:`~pyramid_admin.metrics.AdminMetrics` instance that
+                collects view latency, list view phase timings and cache hit
+                rates. Metrics are not collected by default.
+            :param profiler:
+                :class:`~pyramid_admin.profiling.RequestProfiler` instance.
+                If provided, authorized requests can ask for the view to be
+                profiled and a fraction of requests can be sampled.
         """
         self.config = config
 
@@ -524,6 +814,22 @@ class Admin(object):
         self.subdomain = subdomain
         self.base_template = base_template or 'admin/base.jinja2'
         self.template_mode = template_mode or 'bootstrap2'
+        self.bytecode_cache_dir = bytecode_cache_dir
+        self.static_assets_dir = static_assets_dir
+
+        self.menu_cache_key = menu_cache_key or default_menu_cache_key
+        self._menu_cache = MenuCache(menu_cache_ttl) if menu_cache_ttl else None
+
+        self.metrics = metrics if metrics is not None else admin_metrics.NULL_METRICS
+        self.profiler = profiler
+
+        self.dispatcher = None
+
+        if single_route:
+            if self.url.rstrip('/') == '':
+                raise Exception(u'Single route mode requires non-root admin URL.')
+
+            self.dispatcher = AdminDispatcher(self.url)
 
         # Add predefined index view
         self.add_view(self.index_view)
@@ -548,6 +854,87 @@ class Admin(object):
 
         self._add_view_to_menu(view)
 
+    def warmup(self):
+        """
+            Prepare all views, including model views with `lazy_scaffolding`
+            enabled, before the first request.
+
+            Returns list of `(view, seconds)` tuples.
+        """
+        timings = []
+        start = time.time()
+
+        for view in self._views:
+            view_start = time.time()
+            view.prepare()
+            timings.append((view, time.time() - view_start))
+
+        log.info('Prepared %d admin views in %.1f ms',
+                 len(self._views), (time.time() - start) * 1000)
+
+        return timings
+
+    def compile_templates(self):
+        """
+            Compile admin templates into the Jinja2 environment cache and,
+            if it is configured, the bytecode cache.
+
+            Compiles templates shipped for the current `template_mode`, the
+            base template and templates configured on the views. Returns
+            number of compiled templates.
+        """
+        env = templating.get_environment(self.config.registry)
+
+        if env is None:
+            log.warning('Jinja2 environment is not configured, admin templates are not compiled')
+            return 0
+
+        names = set(templating.list_templates(self.template_mode))
+        names.add(self.base_template)
+
+        for view in self._views:
+            names.update(templating.get_view_templates(view))
+
+        compiled = templating.compile_templates(env, sorted(names))
+
+        log.info('Compiled %d admin templates', compiled)
+
+        return compiled
+
+    def prefork_warmup(self):
+        """
+            Prepare the admin in the master process of a pre-fork server.
+
+            Commits pending configuration, prepares all views, compiles admin
+            templates and then moves all objects created so far into the
+            permanent garbage collector generation with `gc.freeze()`. The
+            garbage collector does not write to frozen objects, so memory
+            pages holding them stay shared between forked workers.
+
+            Call it once the application is created, for example at the end
+            of the application factory when gunicorn runs with `preload_app`::
+
+                app = config.make_wsgi_app()
+                admin.prefork_warmup()
+                return app
+        """
+        start = time.time()
+
+        # Registers routes and the Jinja2 environment
+        self.config.commit()
+
+        self.warmup()
+
+        self.compile_templates()
+
+        gc.collect()
+
+        # Python 3.7+
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+
+        log.info('Pre-fork warmup finished in %.1f ms', (time.time() - start) * 1000)
+
     def add_link(self, link):
         """
             Add link to menu links collection.
@@ -560,6 +947,8 @@ class Admin(object):
         else:
             self._menu_links.append(link)
 
+        self._clear_menu_cache()
+
     def _add_menu_item(self, menu_item, target_category):
         if target_category:
             category = self._menu_categories.get(target_category)
@@ -574,6 +963,8 @@ class Admin(object):
         else:
             self._menu.append(menu_item)
 
+        self._clear_menu_cache()
+
     def _add_view_to_menu(self, view):
         """
             Add a view to the menu tree
@@ -618,6 +1009,19 @@ class Admin(object):
 
         admins.append(self)
 
+        # Registered before the dispatcher route, which would match it too
+        if self.static_assets_dir is not None:
+            from .assets import StaticAssets
+
+            assets = StaticAssets(self.static_assets_dir, self.endpoint + '--static')
+            assets.register(self.config, self.url.rstrip('/') + '/_static')
+
+        if self.dispatcher is not None:
+            self.dispatcher.register(self.config, self.endpoint + '--dispatch')
+
+        if self.bytecode_cache_dir is not None:
+            templating.setup_bytecode_cache(self.config, self.bytecode_cache_dir)
+
     def menu(self):
         """
             Return the menu hierarchy.
@@ -629,3 +1033,78 @@ class Admin(object):
             Return menu links.
         """
         return self._menu_links
+
+    def visible_menu(self):
+        """
+            Return menu items visible to the current user, as a list of
+            `(item, children)` tuples. `children` is a list of visible
+            items for categories and empty otherwise.
+
+            Computed once per request and, if `menu_cache_ttl` is set,
+            cached for all requests with the same `menu_cache_key`.
+        """
+        return self._get_visible_menu()[0]
+
+    def visible_menu_links(self):
+        """
+            Return menu links visible to the current user.
+        """
+        return self._get_visible_menu()[1]
+
+    def _build_visible_menu(self):
+        menu = []
+
+        for item in self._menu:
+            if item.is_category():
+                children = item.get_children()
+
+                if children:
+                    menu.append((item, children))
+            elif item.is_accessible() and item.is_visible():
+                menu.append((item, []))
+
+        links = [item for item in self._menu_links
+                 if item.is_accessible() and item.is_visible()]
+
+        return menu, links
+
+    def _get_visible_menu(self):
+        request = get_current_request()
+
+        if request is None:
+            return self._build_visible_menu()
+
+        cache = h.get_request_cache(request)
+        result = cache.get(('visible_menu', self.endpoint))
+
+        if result is None:
+            key = None
+
+            if self._menu_cache is not None:
+                key = self.menu_cache_key(request)
+
+                if key is not None:
+                    result = self._menu_cache.get(key)
+
+                    if result is None:
+                        self.metrics.cache_miss('menu')
+                    else:
+                        self.metrics.cache_hit('menu')
+
+            if result is None:
+                result = self._build_visible_menu()
+
+                if key is not None:
+                    self._menu_cache.set(key, result)
+
+            cache[('visible_menu', self.endpoint)] = result
+
+        return result
+
+    def _clear_menu_cache(self):
+        if self._menu_cache is not None:
+            self._menu_cache.clear()
+
+
+# lazy imports
+from . import metrics as admin_metrics
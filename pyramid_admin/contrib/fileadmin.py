@@ -99,6 +99,12 @@ class FileAdmin(BaseView, ActionsMixin):
         File list template
     """
 
+    list_streaming = False
+    """
+        If set to `True`, directory listing is sent to the client while it
+        is being rendered, which helps with large directories.
+    """
+
     upload_template = 'admin/file/form.jinja2'
     """
         File upload template
@@ -612,15 +618,17 @@ class FileAdmin(BaseView, ActionsMixin):
         # Actions
         actions, actions_confirmation = self.get_actions_list()
 
-        return self.render(self.list_template,
-                           dir_path=path,
-                           breadcrumbs=breadcrumbs,
-                           get_dir_url=self._get_dir_url,
-                           get_file_url=self._get_file_url,
-                           items=items,
-                           actions=actions,
-                           actions_confirmation=actions_confirmation,
-                           delete_form=delete_form)
+        render = self.render_streamed if self.list_streaming else self.render
+
+        return render(self.list_template,
+                      dir_path=path,
+                      breadcrumbs=breadcrumbs,
+                      get_dir_url=self._get_dir_url,
+                      get_file_url=self._get_file_url,
+                      items=items,
+                      actions=actions,
+                      actions_confirmation=actions_confirmation,
+                      delete_form=delete_form)
 
     @expose('/upload/', methods=('GET', 'POST'))
     @expose('/upload/<path:path>', methods=('GET', 'POST'))
@@ -4,6 +4,7 @@ from flask import request, flash, abort, Response
 
 from pyramid_admin import expose
 from pyramid_admin.babel import gettext, ngettext, lazy_gettext
+from pyramid_admin import json
 from pyramid_admin.model import BaseModelView
 from pyramid_admin.model.form import wrap_fields_in_fieldlist
 from pyramid_admin.model.fields import ListEditableFieldList
@@ -484,7 +485,12 @@ class ModelView(BaseModelView):
             query = self._search(query, search)
 
         # Get count
-        count = query.count() if not self.simple_list_pager else None
+        with self._list_phase('count'):
+            if not self.simple_list_pager or self._column_summaries:
+                count, _ = self._get_list_totals(search, filters,
+                                                 lambda: self._get_count_and_summaries(query))
+            else:
+                count = None
 
         # Sorting
         if sort_column:
@@ -502,10 +508,62 @@ class ModelView(BaseModelView):
         query = query.limit(self.page_size)
 
         if execute:
-            query = query.all()
+            with self._list_phase('fetch'):
+                query = query.all()
 
         return count, query
 
+    def _get_count_and_summaries(self, query):
+        """
+            Count documents matching the query and compute the column
+            summaries in one `$group` stage, return tuple of the count and
+            the summaries.
+        """
+        if not self._column_summaries:
+            return query.count(), None
+
+        fields = []
+        group = {'_id': None, 'count': {'$sum': 1}}
+
+        for name, functions in iteritems(self._column_summaries):
+            field = self.model._fields.get(name)
+
+            if field is None:
+                raise Exception('Can only summarize fields of %s, not %s.' %
+                                (self.model.__name__, name))
+
+            for function in functions:
+                key = 'summary%d' % len(fields)
+                group[key] = {'$' + function: '$' + field.db_field}
+                fields.append((name, function, key))
+
+        # Query filters are applied as the first stage of the pipeline
+        rows = list(query.aggregate({'$group': group}))
+        row = rows[0] if rows else {}
+
+        summaries = {}
+
+        for name, function, key in fields:
+            summaries.setdefault(name, {})[function] = row.get(key)
+
+        count = row.get('count', 0) if not self.simple_list_pager else None
+
+        return count, summaries
+
+    def explain_list(self, page, sort_column, sort_desc, search, filters):
+        """
+            Return filter and ``explain()`` output of the list query.
+        """
+        count, query = self.get_list(page, sort_column, sort_desc, search, filters,
+                                     execute=False)
+
+        plan = query.explain()
+        parsed = plan.get('queryPlanner', {}).get('parsedQuery')
+
+        statement = json.dumps(parsed, default=repr) if parsed is not None else None
+
+        return statement, json.dumps(plan, indent=2, default=repr)
+
     def get_one(self, id):
         """
             Return a single model instance by its ID
@@ -521,6 +579,22 @@ class ModelView(BaseModelView):
                   'error')
             return None
 
+    def get_many(self, ids):
+        """
+            Return model instances with the given IDs in one query
+
+            :param ids:
+                List of model IDs
+        """
+        try:
+            all_ids = [self.object_id_converter(pk) for pk in ids]
+            return list(self.get_query().in_bulk(all_ids).values())
+        except mongoengine.ValidationError as ex:
+            flash(gettext('Failed to get model. %(error)s',
+                          error=format_error(ex)),
+                  'error')
+            return []
+
     def create_model(self, form):
         """
             Create model helper
@@ -542,7 +616,7 @@ class ModelView(BaseModelView):
 
             return False
         else:
-            self.after_model_change(form, model, True)
+            self._after_model_change(form, model, True)
 
         return model
 
@@ -568,7 +642,7 @@ class ModelView(BaseModelView):
 
             return False
         else:
-            self.after_model_change(form, model, False)
+            self._after_model_change(form, model, False)
 
         return True
 
@@ -591,7 +665,7 @@ class ModelView(BaseModelView):
 
             return False
         else:
-            self.after_model_delete(model)
+            self._after_model_delete(model)
 
         return True
 
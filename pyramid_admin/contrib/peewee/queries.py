@@ -0,0 +1,35 @@
+import time
+from functools import wraps
+
+from pyramid_admin import queries
+
+
+def instrument_database(database):
+    """
+        Record queries executed by the database in the request query log.
+
+        Queries are recorded only for admin requests in debug mode and
+        in :func:`~pyramid_admin.queries.capture_queries` blocks, see
+        :mod:`pyramid_admin.queries`.
+
+        :param database:
+            Peewee `Database` instance
+    """
+    execute_sql = database.execute_sql
+
+    # Already instrumented
+    if getattr(execute_sql, '_admin_queries', False):
+        return
+
+    @wraps(execute_sql)
+    def inner(sql, params=None, *args, **kwargs):
+        start = time.time()
+
+        try:
+            return execute_sql(sql, params, *args, **kwargs)
+        finally:
+            queries.record('peewee', sql, time.time() - start)
+
+    inner._admin_queries = True
+
+    database.execute_sql = inner
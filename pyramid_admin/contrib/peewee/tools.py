@@ -1,4 +1,4 @@
-from peewee import PrimaryKeyField
+from peewee import PrimaryKeyField, SQL, fn
 
 
 def get_primary_key(model):
@@ -16,3 +16,29 @@ def parse_like_term(term):
         stmt = '%%%s%%' % term
 
     return stmt
+
+
+def get_aggregate_expression(model, foreign_key, function, field=None):
+    """
+        Return correlated subquery that aggregates the related models of
+        a model.
+
+        :param model:
+            Model class
+        :param foreign_key:
+            Foreign key field of the related model that references the model
+        :param function:
+            SQL aggregate function name, like `count` or `sum`
+        :param field:
+            Field of the related model to aggregate. If not set, the
+            function is called with ``*``, like ``count(*)``.
+    """
+    related = foreign_key.model_class
+
+    if related == model:
+        raise Exception('Can not aggregate self-referencing foreign key %s.' % foreign_key.name)
+
+    value = getattr(fn, function)(SQL('*') if field is None else field)
+    model_pk = getattr(model, get_primary_key(model))
+
+    return related.select(value).where(foreign_key == model_pk)
@@ -2,19 +2,20 @@ import logging
 
 from ..._compat import flash
 
-from pyramid_admin._compat import string_types
+from pyramid_admin._compat import iteritems, string_types, text_type
 from pyramid_admin.babel import gettext, ngettext, lazy_gettext
 from pyramid_admin.model import BaseModelView
 from pyramid_admin.model.form import wrap_fields_in_fieldlist
 from pyramid_admin.model.fields import ListEditableFieldList
 
-from peewee import PrimaryKeyField, ForeignKeyField, Field, CharField, TextField
+from peewee import (PrimaryKeyField, ForeignKeyField, Field, CharField, TextField,
+                    SqliteDatabase, SQL, fn)
 
 from pyramid_admin.actions import action
 from pyramid_admin.contrib.peewee import filters
 
 from .form import get_form, CustomModelConverter, InlineModelConverter, save_inline
-from .tools import get_primary_key, parse_like_term
+from .tools import get_aggregate_expression, get_primary_key, parse_like_term
 from .ajax import create_ajax_loader
 
 # Set up logger
@@ -133,6 +134,29 @@ class ModelView(BaseModelView):
                 column_labels = {'model_ones': 'Hello'}
     """
 
+    column_aggregates = None
+    """
+        Dictionary of list columns that aggregate related models. They are
+        computed in the list query with correlated subqueries, so the
+        related models are not loaded.
+
+        Values are `(foreign key, function)` or `(foreign key, function,
+        field)` tuples, where `foreign key` is the field of the related model
+        that references this model, `function` is the name of an SQL
+        aggregate function and `field` is the field to aggregate::
+
+            class CustomerAdmin(ModelView):
+                column_list = ('name', 'order_count', 'order_total')
+                column_aggregates = {
+                    'order_count': (Order.customer, 'count'),
+                    'order_total': (Order.customer, 'sum', Order.amount),
+                }
+                column_filters = ('order_count',)
+
+        Aggregate columns are sortable and can be used in `column_filters`.
+        Their values are set as attributes of the listed models.
+    """
+
     def __init__(self, model, name=None,
                  category=None, endpoint=None, url=None, static_folder=None,
                  menu_class_name=None, menu_icon_type=None, menu_icon_value=None):
@@ -145,6 +169,39 @@ class ModelView(BaseModelView):
 
         self._primary_key = self.scaffold_pk()
 
+    def _refresh_cache(self):
+        # List, sortable columns and filters need the aggregates
+        self._aggregates = self.scaffold_aggregates()
+
+        super(ModelView, self)._refresh_cache()
+
+        self._list_aggregates = [(name, self._aggregates[name])
+                                 for name, _ in self._list_columns
+                                 if name in self._aggregates and name not in self._column_deferred]
+
+        self._summary_fields = self._get_summary_fields()
+
+    def _get_summary_fields(self):
+        """
+            Return list of `(name, function, expression)` tuples of the
+            column summaries, which are selected by the count query.
+        """
+        fields = []
+
+        for name, functions in iteritems(self._column_summaries):
+            if name in self._aggregates:
+                column = self._aggregates[name]
+            elif isinstance(getattr(self.model, name, None), Field):
+                column = getattr(self.model, name)
+            else:
+                raise Exception('Can only summarize fields of %s, not %s.' %
+                                (self.model.__name__, name))
+
+            for function in functions:
+                fields.append((name, function, getattr(fn, function.upper())(column)))
+
+        return fields
+
     def _get_model_fields(self, model=None):
         if model is None:
             model = self.model
@@ -169,8 +226,26 @@ class ModelView(BaseModelView):
             elif self.column_display_pk or field_class != PrimaryKeyField:
                 columns.append(n)
 
+        columns.extend(sorted(self._aggregates))
+
         return columns
 
+    def scaffold_aggregates(self):
+        """
+            Return dictionary of the aggregate column names and their
+            expressions from `column_aggregates`.
+        """
+        aggregates = {}
+
+        for name, spec in iteritems(self.column_aggregates or {}):
+            if hasattr(self.model, name):
+                raise Exception('Aggregate column %s conflicts with attribute of %s.' %
+                                (name, self.model.__name__))
+
+            aggregates[name] = get_aggregate_expression(self.model, *spec)
+
+        return aggregates
+
     def scaffold_sortable_columns(self):
         columns = dict()
 
@@ -180,6 +255,20 @@ class ModelView(BaseModelView):
 
         return columns
 
+    def get_sortable_columns(self):
+        columns = super(ModelView, self).get_sortable_columns()
+
+        if self.column_sortable_list is None:
+            names = [name for name, _ in self._list_columns]
+        else:
+            names = list(columns)
+
+        for name in names:
+            if name in self._aggregates:
+                columns[name] = self._aggregates[name]
+
+        return columns
+
     def init_search(self):
         if self.column_searchable_list:
             for p in self.column_searchable_list:
@@ -198,6 +287,19 @@ class ModelView(BaseModelView):
         return bool(self._search_fields)
 
     def scaffold_filters(self, name):
+        if isinstance(name, string_types) and name in self._aggregates:
+            spec = self.column_aggregates[name]
+
+            # Counts are integers, other aggregates have type of the field
+            if spec[1].lower() == 'count' or len(spec) < 3:
+                type_name = 'IntegerField'
+            else:
+                type_name = type(spec[2]).__name__
+
+            return self.filter_converter.convert(type_name,
+                                                 self._aggregates[name],
+                                                 self.get_column_name(name))
+
         if isinstance(name, string_types):
             attr = getattr(self.model, name, None)
         else:
@@ -277,7 +379,8 @@ class ModelView(BaseModelView):
         return create_ajax_loader(self.model, name, name, options)
 
     def _handle_join(self, query, field, joins):
-        if field.model_class != self.model:
+        # Aggregates are subqueries, not fields
+        if isinstance(field, Field) and field.model_class != self.model:
             model_name = field.model_class.__name__
 
             if model_name not in joins:
@@ -295,6 +398,9 @@ class ModelView(BaseModelView):
                 query = self._handle_join(query, sort_field, joins)
 
             query = query.order_by(sort_field.desc() if sort_desc else sort_field.asc())
+        elif sort_field is not None:
+            # Aggregate subquery
+            query = query.order_by(sort_field.desc() if sort_desc else sort_field.asc())
 
         return query, joins
 
@@ -339,7 +445,12 @@ class ModelView(BaseModelView):
                 query = f.apply(query, f.clean(value))
 
         # Get count
-        count = query.count() if not self.simple_list_pager else None
+        with self._list_phase('count'):
+            if not self.simple_list_pager or self._summary_fields:
+                count, _ = self._get_list_totals(search, filters,
+                                                 lambda: self._get_count_and_summaries(query))
+            else:
+                count = None
 
         # Apply sorting
         if sort_column is not None:
@@ -352,6 +463,10 @@ class ModelView(BaseModelView):
             if order:
                 query, joins = self._order_by(query, joins, order[0], order[1])
 
+        if self._list_aggregates:
+            query = query.select(self.model,
+                                 *[expr.alias(name) for name, expr in self._list_aggregates])
+
         # Pagination
         if page is not None:
             query = query.offset(page * self.page_size)
@@ -359,13 +474,59 @@ class ModelView(BaseModelView):
         query = query.limit(self.page_size)
 
         if execute:
-            query = list(query.execute())
+            with self._list_phase('fetch'):
+                query = list(query.execute())
 
         return count, query
 
+    def _get_count_and_summaries(self, query):
+        """
+            Run the count with the column summaries in one query, return
+            tuple of the count and the summaries.
+        """
+        if not self._summary_fields:
+            return query.count(), None
+
+        row = query.select(fn.COUNT(SQL('*')),
+                           *[expr for _, _, expr in self._summary_fields]).scalar(as_tuple=True)
+
+        summaries = {}
+
+        for (name, function, _), value in zip(self._summary_fields, row[1:]):
+            summaries.setdefault(name, {})[function] = value
+
+        return (row[0] if not self.simple_list_pager else None), summaries
+
+    def explain_list(self, page, sort_column, sort_desc, search, filters):
+        """
+            Return SQL text and ``EXPLAIN`` output of the list query.
+        """
+        count, query = self.get_list(page, sort_column, sort_desc, search, filters,
+                                     execute=False)
+
+        sql, params = query.sql()
+
+        database = self.model._meta.database
+        prefix = 'EXPLAIN QUERY PLAN' if isinstance(database, SqliteDatabase) else 'EXPLAIN'
+
+        rows = database.execute_sql('%s %s' % (prefix, sql), params).fetchall()
+        plan = '\n'.join(' '.join(text_type(value) for value in row) for row in rows)
+
+        return '%s -- %r' % (sql, params), plan
+
     def get_one(self, id):
         return self.model.get(**{self._primary_key: id})
 
+    def get_many(self, ids):
+        model_pk = getattr(self.model, self._primary_key)
+        query = self.get_query().where(model_pk << ids)
+
+        if self._aggregates:
+            query = query.select(self.model,
+                                 *[expr.alias(name) for name, expr in self._aggregates.items()])
+
+        return list(query)
+
     def create_model(self, form):
         try:
             model = self.model()
@@ -382,7 +543,7 @@ class ModelView(BaseModelView):
 
             return False
         else:
-            self.after_model_change(form, model, True)
+            self._after_model_change(form, model, True)
 
         return model
 
@@ -401,7 +562,7 @@ class ModelView(BaseModelView):
 
             return False
         else:
-            self.after_model_change(form, model, False)
+            self._after_model_change(form, model, False)
 
         return True
 
@@ -416,7 +577,7 @@ class ModelView(BaseModelView):
 
             return False
         else:
-            self.after_model_delete(model)
+            self._after_model_delete(model)
 
         return True
 
@@ -0,0 +1,28 @@
+from pyramid_admin.audit import BaseAuditSink
+
+
+class MongoAuditSink(BaseAuditSink):
+    """
+        Write audit entries to a MongoDB collection.
+
+        Usage sample::
+
+            audit_log = AuditLog(MongoAuditSink(db.admin_audit_log))
+    """
+    def __init__(self, coll):
+        """
+            Constructor.
+
+            :param coll:
+                MongoDB collection object
+        """
+        self.coll = coll
+
+    def write(self, entries):
+        # Insert copies, pymongo adds `_id` to inserted documents
+        documents = [dict(e) for e in entries]
+
+        if hasattr(self.coll, 'insert_many'):
+            self.coll.insert_many(documents, ordered=False)
+        else:
+            self.coll.insert(documents)
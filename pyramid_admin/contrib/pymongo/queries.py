@@ -0,0 +1,63 @@
+from pymongo import monitoring
+
+from pyramid_admin import json, queries
+
+
+class QueryListener(monitoring.CommandListener):
+    """
+        Record MongoDB commands in the request query log.
+
+        Commands are recorded only for admin requests in debug mode and
+        in :func:`~pyramid_admin.queries.capture_queries` blocks, see
+        :mod:`pyramid_admin.queries`. Works for mongoengine too.
+
+        Register the listener for all clients::
+
+            from pymongo import monitoring
+            monitoring.register(QueryListener())
+
+        or pass it to the client::
+
+            MongoClient(event_listeners=[QueryListener()])
+    """
+    # Longer commands are truncated
+    max_statement_length = 1000
+
+    def __init__(self):
+        self._commands = {}
+
+    def started(self, event):
+        # Succeeded and failed events only carry the command name
+        if queries.is_recording():
+            self._commands[event.request_id] = self.format_command(event)
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        self._record(event)
+
+    def _record(self, event):
+        statement = self._commands.pop(event.request_id, None)
+
+        if statement is not None:
+            queries.record('pymongo', statement, event.duration_micros / 1000000.0)
+
+    def format_command(self, event):
+        """
+            Return command text.
+
+            :param event:
+                `CommandStartedEvent`
+        """
+        try:
+            text = json.dumps(event.command, default=repr)
+        except (TypeError, ValueError):
+            text = repr(event.command)
+
+        text = '%s.%s %s' % (event.database_name, event.command_name, text)
+
+        if len(text) > self.max_statement_length:
+            text = text[:self.max_statement_length] + '...'
+
+        return text
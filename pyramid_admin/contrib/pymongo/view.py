@@ -1,14 +1,15 @@
 import logging
 
 import pymongo
-from bson import ObjectId
+from bson import ObjectId, SON
 from bson.errors import InvalidId
 
 from ..._compat import flash
 
-from pyramid_admin._compat import string_types
+from pyramid_admin._compat import iteritems, string_types
 from pyramid_admin.babel import gettext, ngettext, lazy_gettext
-from pyramid_admin.model import BaseModelView
+from pyramid_admin import json
+from pyramid_admin.model import BaseModelView, typefmt
 from pyramid_admin.actions import action
 from pyramid_admin.helpers import get_form_data
 
@@ -18,6 +19,12 @@ from .tools import parse_like_term
 # Set up logger
 log = logging.getLogger("pyramid-admin.pymongo")
 
+# Prefix of the fields that hold length of the truncated columns
+TRUNCATE_LENGTH_PREFIX = '__length_'
+
+# Prefix of the fields that hold looked up documents of the aggregates
+AGGREGATE_PREFIX = '__aggregate_'
+
 
 class ModelView(BaseModelView):
     """
@@ -38,6 +45,28 @@ class ModelView(BaseModelView):
                 column_filters = (BooleanEqualFilter(User.name, 'Name'),)
     """
 
+    column_aggregates = None
+    """
+        Dictionary of list columns that aggregate documents of other
+        collections that reference the listed documents. They are computed
+        in the list query with ``$lookup``.
+
+        Values are `(collection, foreign field, function)` or `(collection,
+        foreign field, function, field)` tuples. `function` is either
+        `count` or an accumulator, like `sum` or `avg`, applied to `field`
+        of the looked up documents::
+
+            class CustomerView(ModelView):
+                column_list = ('name', 'order_count', 'order_total')
+                column_sortable_list = ('name', 'order_count')
+                column_aggregates = {
+                    'order_count': ('orders', 'customer_id', 'count'),
+                    'order_total': ('orders', 'customer_id', 'sum', 'amount'),
+                }
+
+        Aggregate columns can be sorted, but not filtered.
+    """
+
     def __init__(self, coll,
                  name=None, category=None, endpoint=None, url=None,
                  menu_class_name=None, menu_icon_type=None, menu_icon_value=None):
@@ -81,6 +110,18 @@ class ModelView(BaseModelView):
 
         self.coll = coll
 
+    def _refresh_cache(self):
+        super(ModelView, self)._refresh_cache()
+
+        aggregates = self.column_aggregates or {}
+
+        self._list_aggregates = [name for name, _ in self._list_columns
+                                 if name in aggregates and name not in self._column_deferred]
+
+        for name in self._column_summaries:
+            if name in aggregates:
+                raise Exception('Can not summarize aggregate column %s.' % name)
+
     def scaffold_pk(self):
         return '_id'
 
@@ -147,6 +188,68 @@ class ModelView(BaseModelView):
         """
         return model.get(name)
 
+    def _get_truncate_stage(self):
+        """
+            Return ``$addFields`` stage that replaces string values of the
+            truncated columns with their beginning and adds their length.
+        """
+        fields = {}
+
+        for name, length in self._column_truncate.items():
+            path = '$' + name
+            is_string = {'$eq': [{'$type': path}, 'string']}
+
+            fields[name] = {'$cond': [is_string, {'$substrCP': [path, 0, length]}, path]}
+            fields[TRUNCATE_LENGTH_PREFIX + name] = {'$cond': [is_string,
+                                                                {'$strLenCP': path},
+                                                                None]}
+
+        return {'$addFields': fields}
+
+    def _get_aggregate_stages(self, names):
+        """
+            Return ``$lookup`` stages that compute the aggregate columns.
+
+            :param names:
+                Names of the aggregate columns
+        """
+        stages = []
+        fields = {}
+
+        for name in names:
+            spec = self.column_aggregates[name]
+            collection, foreign_field, function = spec[:3]
+            path = AGGREGATE_PREFIX + name
+
+            stages.append({'$lookup': {'from': collection,
+                                       'localField': '_id',
+                                       'foreignField': foreign_field,
+                                       'as': path}})
+
+            if function == 'count':
+                fields[name] = {'$size': '$' + path}
+            else:
+                fields[name] = {'$' + function: '$%s.%s' % (path, spec[3])}
+
+        stages.append({'$addFields': fields})
+        stages.append({'$project': dict((AGGREGATE_PREFIX + name, 0) for name in names)})
+
+        return stages
+
+    def _get_truncated_rows(self, results):
+        rows = []
+
+        for doc in results:
+            for name in self._column_truncate:
+                length = doc.pop(TRUNCATE_LENGTH_PREFIX + name, None)
+
+                if length is not None:
+                    doc[name] = typefmt.TruncatedValue(doc[name], length)
+
+            rows.append(doc)
+
+        return rows
+
     def _search(self, query, search_term):
         values = search_term.split(' ')
 
@@ -222,7 +325,12 @@ class ModelView(BaseModelView):
             query = self._search(query, search)
 
         # Get count
-        count = self.coll.find(query).count() if not self.simple_list_pager else None
+        with self._list_phase('count'):
+            if not self.simple_list_pager or self._column_summaries:
+                count, _ = self._get_list_totals(search, filters,
+                                                 lambda: self._get_count_and_summaries(query))
+            else:
+                count = None
 
         # Sorting
         sort_by = None
@@ -241,13 +349,86 @@ class ModelView(BaseModelView):
         if page is not None:
             skip = page * self.page_size
 
-        results = self.coll.find(query, sort=sort_by, skip=skip, limit=self.page_size)
+        # Truncated and aggregate columns need an aggregation, which has
+        # no explain()
+        if execute and (self._column_truncate or self._list_aggregates):
+            pipeline = [{'$match': query}]
+
+            # Look up all matching documents only to sort by an aggregate
+            lookup_first = bool(sort_by) and sort_by[0][0] in self._list_aggregates
 
-        if execute:
-            results = list(results)
+            if self._list_aggregates and lookup_first:
+                pipeline.extend(self._get_aggregate_stages(self._list_aggregates))
+
+            if sort_by:
+                pipeline.append({'$sort': SON(sort_by)})
+
+            if skip:
+                pipeline.append({'$skip': skip})
+
+            pipeline.append({'$limit': self.page_size})
+
+            if self._list_aggregates and not lookup_first:
+                pipeline.extend(self._get_aggregate_stages(self._list_aggregates))
+
+            if self._column_truncate:
+                pipeline.append(self._get_truncate_stage())
+
+            with self._list_phase('fetch'):
+                results = self._get_truncated_rows(self.coll.aggregate(pipeline))
+        else:
+            results = self.coll.find(query, sort=sort_by, skip=skip, limit=self.page_size)
+
+            if execute:
+                with self._list_phase('fetch'):
+                    results = list(results)
 
         return count, results
 
+    def _get_count_and_summaries(self, query):
+        """
+            Count documents matching the query and compute the column
+            summaries in one `$group` stage, return tuple of the count and
+            the summaries.
+        """
+        if not self._column_summaries:
+            return self.coll.find(query).count(), None
+
+        fields = []
+        group = {'_id': None, 'count': {'$sum': 1}}
+
+        for name, functions in iteritems(self._column_summaries):
+            for function in functions:
+                key = 'summary%d' % len(fields)
+                group[key] = {'$' + function: '$' + name}
+                fields.append((name, function, key))
+
+        rows = list(self.coll.aggregate([{'$match': query}, {'$group': group}]))
+        row = rows[0] if rows else {}
+
+        summaries = {}
+
+        for name, function, key in fields:
+            summaries.setdefault(name, {})[function] = row.get(key)
+
+        count = row.get('count', 0) if not self.simple_list_pager else None
+
+        return count, summaries
+
+    def explain_list(self, page, sort_column, sort_desc, search, filters):
+        """
+            Return filter and ``explain()`` output of the list query.
+        """
+        count, query = self.get_list(page, sort_column, sort_desc, search, filters,
+                                     execute=False)
+
+        plan = query.explain()
+        parsed = plan.get('queryPlanner', {}).get('parsedQuery')
+
+        statement = json.dumps(parsed, default=repr) if parsed is not None else None
+
+        return statement, json.dumps(plan, indent=2, default=repr)
+
     def _get_valid_id(self, id):
         try:
             return ObjectId(id)
@@ -263,6 +444,23 @@ class ModelView(BaseModelView):
         """
         return self.coll.find_one({'_id': self._get_valid_id(id)})
 
+    def get_many(self, ids):
+        """
+            Return model instances with the given IDs in one query
+
+            :param ids:
+                List of model IDs
+        """
+        query = {'_id': {'$in': [self._get_valid_id(id) for id in ids]}}
+
+        if not self.column_aggregates:
+            return list(self.coll.find(query))
+
+        pipeline = [{'$match': query}]
+        pipeline.extend(self._get_aggregate_stages(sorted(self.column_aggregates)))
+
+        return list(self.coll.aggregate(pipeline))
+
     def edit_form(self, obj):
         """
             Create edit form from the MongoDB document
@@ -286,7 +484,7 @@ class ModelView(BaseModelView):
             log.exception('Failed to create record.')
             return False
         else:
-            self.after_model_change(form, model, True)
+            self._after_model_change(form, model, True)
 
         return model
 
@@ -311,7 +509,7 @@ class ModelView(BaseModelView):
             log.exception('Failed to update record.')
             return False
         else:
-            self.after_model_change(form, model, False)
+            self._after_model_change(form, model, False)
 
         return True
 
@@ -336,7 +534,7 @@ class ModelView(BaseModelView):
             log.exception('Failed to delete record.')
             return False
         else:
-            self.after_model_delete(model)
+            self._after_model_delete(model)
 
         return True
 
@@ -0,0 +1,69 @@
+from sqlalchemy import Table, Column, Integer, String, Text, MetaData
+
+from pyramid_admin import json
+from pyramid_admin._compat import as_unicode
+from pyramid_admin.audit import BaseAuditSink
+
+
+def create_audit_table(metadata, name='admin_audit_log'):
+    """
+        Create audit log table definition.
+
+        :param metadata:
+            SQLAlchemy `MetaData` instance
+        :param name:
+            Table name
+    """
+    return Table(name, metadata,
+                 Column('id', Integer, primary_key=True),
+                 Column('timestamp', String(32), index=True),
+                 Column('user', String(255)),
+                 Column('endpoint', String(255)),
+                 Column('model', String(255), index=True),
+                 Column('pk', String(255), index=True),
+                 Column('action', String(16)),
+                 Column('changes', Text))
+
+
+class SQLAAuditSink(BaseAuditSink):
+    """
+        Write audit entries to a SQL table.
+
+        The sink uses its own connections from the `engine`, so entries are
+        written outside of the request transaction.
+
+        Usage sample::
+
+            audit_log = AuditLog(SQLAAuditSink(engine))
+    """
+    def __init__(self, engine, table=None, create_table=True):
+        """
+            Constructor.
+
+            :param engine:
+                SQLAlchemy engine
+            :param table:
+                Table to write into. Should have the columns created by
+                :func:`create_audit_table`. If not provided, the default
+                `admin_audit_log` table is used.
+            :param create_table:
+                Create table if it does not exist yet
+        """
+        self.engine = engine
+        self.table = table if table is not None else create_audit_table(MetaData())
+
+        if create_table:
+            self.table.create(engine, checkfirst=True)
+
+    def write(self, entries):
+        rows = []
+
+        for entry in entries:
+            row = dict(entry)
+            row['user'] = None if row['user'] is None else as_unicode(row['user'])
+            row['pk'] = None if row['pk'] is None else as_unicode(row['pk'])
+            row['changes'] = json.dumps(row['changes'])
+            rows.append(row)
+
+        with self.engine.begin() as conn:
+            conn.execute(self.table.insert(), rows)
@@ -0,0 +1,42 @@
+import time
+
+from sqlalchemy import event
+
+from pyramid_admin import queries
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('admin_query_start', []).append(time.time())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info['admin_query_start'].pop()
+    queries.record('sqlalchemy', statement, time.time() - start)
+
+
+def _handle_error(context):
+    stack = context.connection.info.get('admin_query_start') if context.connection else None
+
+    if stack:
+        start = stack.pop()
+        queries.record('sqlalchemy', context.statement, time.time() - start)
+
+
+def instrument_engine(engine):
+    """
+        Record queries executed by the engine in the request query log.
+
+        Queries are recorded only for admin requests in debug mode and
+        in :func:`~pyramid_admin.queries.capture_queries` blocks, see
+        :mod:`pyramid_admin.queries`. Instrumenting the same engine
+        again does nothing.
+
+        :param engine:
+            SQLAlchemy engine
+    """
+    if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
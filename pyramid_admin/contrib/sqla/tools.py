@@ -1,9 +1,12 @@
-from sqlalchemy import tuple_, or_, and_
+from sqlalchemy import tuple_, or_, and_, func, select
 from sqlalchemy.sql.operators import eq
-from sqlalchemy.exc import DBAPIError
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, CompileError
 from ast import literal_eval
+from collections import OrderedDict
+from operator import itemgetter
 
-from pyramid_admin._compat import filter_list
+from pyramid_admin._compat import filter_list, string_types, text_type
 from pyramid_admin.tools import iterencode, iterdecode, escape
 
 
@@ -108,3 +111,162 @@ def get_query_for_ids(modelquery, model, ids):
         query = modelquery.filter(model_pk.in_(ids))
 
     return query
+
+
+def get_aggregate_expression(model, relation, function, column=None):
+    """
+        Return correlated scalar subquery that aggregates the related
+        models of a model.
+
+        :param model:
+            Model class
+        :param relation:
+            Relationship attribute of the model or its name
+        :param function:
+            SQL aggregate function name, like `count` or `sum`
+        :param column:
+            Column of the related model to aggregate. If not set, the
+            function is called without arguments, like ``count(*)``.
+    """
+    if isinstance(relation, string_types):
+        relation = getattr(model, relation)
+
+    prop = getattr(relation, 'property', None)
+
+    if not hasattr(prop, 'direction'):
+        raise Exception('Can not aggregate %s: not a relationship.' % relation)
+
+    tables = [prop.mapper.local_table]
+
+    if prop.secondary is not None:
+        tables.append(prop.secondary)
+
+    if model.__table__ in tables:
+        raise Exception('Can not aggregate self-referencing relationship %s.' % relation)
+
+    fn = getattr(func, function)
+    value = fn() if column is None else fn(column)
+
+    criteria = prop.primaryjoin
+
+    # Counting rows of the association table does not need the related table
+    if prop.secondary is not None and column is not None:
+        criteria = and_(criteria, prop.secondaryjoin)
+
+    return select(value).where(criteria).correlate_except(*tables).scalar_subquery()
+
+
+# EXPLAIN statement per dialect, everything else uses plain EXPLAIN
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN',
+}
+
+
+def explain_query(query, bind):
+    """
+        Return SQL text of the query and its execution plan. The plan is
+        `None` if query parameters can not be rendered into the SQL text.
+
+        The plan is retrieved with a separate connection if `bind` is an
+        engine, so a failed ``EXPLAIN`` does not affect the session transaction.
+
+        :param query:
+            SQLAlchemy query
+        :param bind:
+            Engine or connection
+    """
+    statement = query.statement if hasattr(query, 'statement') else query
+
+    try:
+        sql = text_type(statement.compile(dialect=bind.dialect,
+                                          compile_kwargs={'literal_binds': True}))
+    except (CompileError, NotImplementedError):
+        return text_type(statement.compile(dialect=bind.dialect)), None
+
+    explain = '%s %s' % (EXPLAIN_PREFIXES.get(bind.dialect.name, 'EXPLAIN'), sql)
+
+    conn = bind.connect() if isinstance(bind, Engine) else bind
+
+    try:
+        execute = getattr(conn, 'exec_driver_sql', conn.execute)
+        rows = execute(explain).fetchall()
+    finally:
+        if conn is not bind:
+            conn.close()
+
+    plan = '\n'.join(' '.join(text_type(value) for value in row) for row in rows)
+
+    return sql, plan
+
+
+class ListRow(object):
+    """
+        Base class of the lightweight list view rows, see :func:`get_row_factory`.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__,
+                           ', '.join('%s=%r' % (name, getattr(self, name))
+                                     for name in self.__slots__))
+
+
+def get_row_factory(name, fields):
+    """
+        Return function that converts flat result tuples into `ListRow`
+        objects with an attribute per field.
+
+        Dotted fields, like ``user.name``, become nested rows. A nested row
+        is `None` if all of its values are `None`, the same way a missing
+        outer joined relation is.
+
+        :param name:
+            Class name of the rows
+        :param fields:
+            Dotted attribute names, in the order of the result columns
+    """
+    tree = OrderedDict()
+
+    for idx, field in enumerate(fields):
+        node = tree
+        parts = field.split('.')
+
+        for part in parts[:-1]:
+            node = node.setdefault(part, OrderedDict())
+
+        node[parts[-1]] = idx
+
+    return _make_row_factory(name, tree, nullable=False)
+
+
+def _make_row_factory(name, tree, nullable):
+    cls = type(str(name), (ListRow,), {'__slots__': tuple(str(key) for key in tree)})
+    new = object.__new__
+
+    getters = []
+    indexes = []
+
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            getter = _make_row_factory(key, value, nullable=True)
+            indexes.extend(getter.indexes)
+        else:
+            getter = itemgetter(value)
+            indexes.append(value)
+
+        getters.append((str(key), getter))
+
+    def make(values):
+        if nullable and all(values[idx] is None for idx in indexes):
+            return None
+
+        row = new(cls)
+
+        for key, getter in getters:
+            setattr(row, key, getter(values))
+
+        return row
+
+    make.indexes = indexes
+
+    return make
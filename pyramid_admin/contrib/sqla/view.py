@@ -4,16 +4,16 @@ import warnings
 import inspect
 
 from sqlalchemy.orm.attributes import InstrumentedAttribute
-from sqlalchemy.orm import joinedload, aliased
-from sqlalchemy.sql.expression import desc
-from sqlalchemy import Boolean, Table, func, or_
+from sqlalchemy.orm import joinedload, aliased, defer
+from sqlalchemy.sql.expression import desc, null
+from sqlalchemy import Boolean, LargeBinary, Table, Text, func, or_
 from sqlalchemy.exc import IntegrityError
 
 from ..._compat import flash
 
-from pyramid_admin._compat import string_types, text_type
+from pyramid_admin._compat import iteritems, string_types, text_type
 from pyramid_admin.babel import gettext, ngettext, lazy_gettext
-from pyramid_admin.model import BaseModelView
+from pyramid_admin.model import BaseModelView, typefmt
 from pyramid_admin.model.form import wrap_fields_in_fieldlist
 from pyramid_admin.model.fields import ListEditableFieldList
 
@@ -43,9 +43,9 @@ class ModelView(BaseModelView):
                                               'auto_select_related',
                                               True)
     """
-        Enable automatic detection of displayed foreign keys in this view
-        and perform automatic joined loading for related models to improve
-        query performance.
+        Enable automatic detection of displayed foreign keys in this view,
+        including related columns like ``user.name``, and perform automatic
+        joined loading for related models to improve query performance.
 
         Please note that detection is not recursive: if `__unicode__` method
         of related model uses another model to generate string representation, it
@@ -72,6 +72,49 @@ class ModelView(BaseModelView):
         Please refer to the `subqueryload` on list of possible values.
     """
 
+    list_row_mode = 'models'
+    """
+        How the list view loads its rows.
+
+        `models` loads mapped model instances. `tuples` selects only the
+        primary key and the displayed columns and returns lightweight
+        :class:`~pyramid_admin.contrib.sqla.tools.ListRow` objects instead,
+        which skips the session identity map and attribute instrumentation.
+        This is considerably cheaper for large pages::
+
+            class PostAdmin(ModelView):
+                list_row_mode = 'tuples'
+                column_list = ('title', 'created', 'user.name')
+
+        Column formatters receive the rows in place of models, so they can
+        only use the displayed columns and the primary key. If the list
+        contains something other than model and related model columns, like
+        relations or properties, the view falls back to `models` with a warning.
+    """
+
+    column_aggregates = None
+    """
+        Dictionary of list columns that aggregate related models. They are
+        computed in the list query with correlated subqueries, so the
+        related models are not loaded.
+
+        Values are `(relation, function)` or `(relation, function, column)`
+        tuples, where `function` is the name of an SQL aggregate function
+        and `column` is the column of the related model to aggregate::
+
+            class CustomerAdmin(ModelView):
+                column_list = ('name', 'order_count', 'order_total')
+                column_aggregates = {
+                    'order_count': (Customer.orders, 'count'),
+                    'order_total': (Customer.orders, 'sum', Order.amount),
+                }
+                column_filters = ('order_count',)
+
+        Aggregate columns are sortable and can be used in `column_filters`.
+        Their values are set as attributes of the listed models, so column
+        formatters can use them too.
+    """
+
     column_display_all_relations = ObsoleteAttr('column_display_all_relations',
                                                 'list_display_all_relations',
                                                 False)
@@ -297,12 +340,58 @@ class ModelView(BaseModelView):
         if self._primary_key is None:
             raise Exception('Model %s does not have primary key.' % self.model.__name__)
 
+    def _refresh_cache(self):
+        # List, sortable columns and filters need the aggregates
+        self._aggregates = self.scaffold_aggregates()
+
+        super(ModelView, self)._refresh_cache()
+
         # Configuration
         if not self.column_select_related_list:
             self._auto_joins = self.scaffold_auto_joins()
         else:
             self._auto_joins = self.column_select_related_list
 
+        if self.list_row_mode == 'tuples':
+            self._list_row_fields = self.scaffold_list_row_fields()
+        elif self.list_row_mode == 'models':
+            self._list_row_fields = None
+        else:
+            raise Exception('Invalid list_row_mode %r of %s.' % (self.list_row_mode,
+                                                                 self.__class__.__name__))
+
+        if self._list_row_fields is not None:
+            self._list_row_factory = tools.get_row_factory(
+                '%sRow' % self.model.__name__, [name for name, _, _ in self._list_row_fields])
+
+        self._truncate_fields = self._get_truncate_fields()
+
+        # Deferred columns of the model are left out of the list query
+        self._deferred_fields = [getattr(self.model, name) for name in self._column_deferred
+                                 if self._get_model_column(name) is not None]
+
+        self._list_aggregates = [(name, self._aggregates[name].label(name))
+                                 for name, _ in self._list_columns
+                                 if name in self._aggregates and name not in self._column_deferred]
+
+        self._summary_fields = self._get_summary_fields()
+
+        if self.list_streaming and self._get_expire_on_commit():
+            warnings.warn('Session of %s expires models on commit, streamed list view '
+                          'will fail if the transaction is committed before rendering.' %
+                          self.__class__.__name__)
+
+    def _get_expire_on_commit(self):
+        """
+            Return `expire_on_commit` setting of the view session.
+        """
+        factory = getattr(self.session, 'session_factory', None)
+
+        if factory is not None:
+            return factory.kw.get('expire_on_commit', True)
+
+        return getattr(self.session, 'expire_on_commit', True)
+
     # Internal API
     def _get_model_iterator(self, model=None):
         """
@@ -455,10 +544,134 @@ class ModelView(BaseModelView):
                 if not self.column_display_pk and column.primary_key:
                     continue
 
+                # Binary data can not be displayed
+                if isinstance(column.type, LargeBinary):
+                    continue
+
                 columns.append(p.key)
 
+        columns.extend(sorted(self._aggregates))
+
         return columns
 
+    def scaffold_aggregates(self):
+        """
+            Return dictionary of the aggregate column names and their
+            expressions from `column_aggregates`.
+        """
+        aggregates = {}
+
+        for name, spec in iteritems(self.column_aggregates or {}):
+            if hasattr(self.model, name):
+                raise Exception('Aggregate column %s conflicts with attribute of %s.' %
+                                (name, self.model.__name__))
+
+            aggregates[name] = tools.get_aggregate_expression(self.model, *spec)
+
+        return aggregates
+
+    def scaffold_truncate_columns(self):
+        """
+            Return dictionary of the `Text` list columns of the model, which
+            are truncated to `column_truncate_length` characters, and of the
+            `LargeBinary` list columns, which are shown as their size with a
+            download link.
+        """
+        columns = {}
+
+        for prop, _ in self._list_columns:
+            column = self._get_model_column(prop)
+
+            if column is None:
+                continue
+
+            if isinstance(column.type, Text):
+                columns[prop] = self.column_truncate_length
+            elif isinstance(column.type, LargeBinary):
+                columns[prop] = 0
+
+        return columns
+
+    def _get_model_column(self, name):
+        """
+            Return table column of a model column property or `None`.
+            Only columns of the model itself can be truncated, deferred
+            or summarized in SQL.
+        """
+        if not isinstance(name, string_types) or '.' in name:
+            return None
+
+        prop = getattr(self.model, name, None)
+
+        if (prop is None or
+                not hasattr(prop, 'property') or
+                not hasattr(prop.property, 'columns') or
+                len(prop.property.columns) != 1):
+            return None
+
+        return prop.property.columns[0]
+
+    def _get_truncate_fields(self):
+        """
+            Return list of `(name, attribute, value expression, length
+            expression)` tuples of the columns truncated in SQL.
+
+            Only the length of binary columns is loaded. For other columns
+            the length expression is `True` if the value was truncated:
+            `length` counts bytes on some databases and `substr` counts
+            characters, so lengths of the full and the truncated value
+            are compared instead.
+        """
+        fields = []
+
+        for name, length in sorted(self._column_truncate.items()):
+            column = self._get_model_column(name)
+
+            if column is None:
+                continue
+
+            attr = getattr(self.model, name)
+
+            if isinstance(column.type, LargeBinary) or not length:
+                fields.append((name, attr, null(), func.length(attr)))
+            else:
+                value = func.substr(attr, 1, length)
+                fields.append((name, attr, value, func.length(attr) > func.length(value)))
+
+        return fields
+
+    @staticmethod
+    def _make_truncated_value(value, length):
+        """
+            Return `TruncatedValue` of the values selected by the
+            expressions of `_get_truncate_fields`.
+        """
+        if value is None:
+            return typefmt.TruncatedValue(None, length)
+
+        return typefmt.TruncatedValue(value, None, truncated=bool(length))
+
+    def _get_summary_fields(self):
+        """
+            Return list of `(name, function, expression)` tuples of the
+            column summaries, which are added to the count query.
+        """
+        fields = []
+
+        for name, functions in iteritems(self._column_summaries):
+            if name in self._aggregates:
+                column = self._aggregates[name]
+            elif self._get_model_column(name) is not None:
+                column = getattr(self.model, name)
+            else:
+                raise Exception('Can only summarize columns of %s, not %s.' %
+                                (self.model.__name__, name))
+
+            for function in functions:
+                fields.append((name, function, getattr(func, function)(column)))
+
+        return fields
+
     def scaffold_sortable_columns(self):
         """
             Return a dictionary of sortable columns.
@@ -497,11 +710,21 @@ class ModelView(BaseModelView):
         self._sortable_joins = dict()
 
         if self.column_sortable_list is None:
-            return self.scaffold_sortable_columns()
+            result = self.scaffold_sortable_columns()
+
+            for name, _ in self._list_columns:
+                if name in self._aggregates:
+                    result[name] = self._aggregates[name].label(name)
+
+            return result
         else:
             result = dict()
 
             for c in self.column_sortable_list:
+                if isinstance(c, string_types) and c in self._aggregates:
+                    result[c] = self._aggregates[c].label(c)
+                    continue
+
                 if isinstance(c, tuple):
                     column, path = self._get_field_with_path(c[1])
                     column_name = c[0]
@@ -545,6 +768,12 @@ class ModelView(BaseModelView):
         """
             Return list of enabled filters
         """
+        if isinstance(name, string_types) and name in self._aggregates:
+            column = self._aggregates[name]
+
+            return self.filter_converter.convert(type(column.type).__name__,
+                                                 column,
+                                                 self.get_column_name(name))
 
         attr, joins = self._get_field_with_path(name)
 
@@ -684,7 +913,7 @@ class ModelView(BaseModelView):
     def scaffold_auto_joins(self):
         """
             Return a list of joined tables by going through the
-            displayed columns.
+            displayed columns that are not deferred.
         """
         if not self.column_auto_select_related:
             return []
@@ -701,13 +930,150 @@ class ModelView(BaseModelView):
                     relations.add(p.key)
 
         joined = []
+        seen = set()
 
         for prop, name in self._list_columns:
-            if prop in relations:
-                joined.append(getattr(self.model, prop))
+            # Deferred columns are not loaded by the list query
+            if prop in self._column_deferred:
+                continue
+
+            # Related columns, like `user.name`, need their relation too
+            relation = prop.split('.', 1)[0] if isinstance(prop, string_types) else prop
+
+            if relation in relations and relation not in seen:
+                seen.add(relation)
+                joined.append(getattr(self.model, relation))
 
         return joined
 
+    def scaffold_list_row_fields(self):
+        """
+            Return list of `(name, attribute, join path)` tuples that are
+            selected by the `tuples` row mode: the primary key followed by
+            the list columns that are not deferred. Returns `None` if some
+            of these columns is not a model or related model column.
+        """
+        # Called by the constructor before `_primary_key` is set
+        primary_key = self.scaffold_pk()
+
+        if isinstance(primary_key, tuple):
+            names = list(primary_key)
+        else:
+            names = [primary_key]
+
+        for prop, _ in self._list_columns:
+            if prop in self._column_deferred:
+                continue
+
+            if not isinstance(prop, string_types):
+                warnings.warn('Can not select column %r of %s as a tuple, using models instead.'
+                              % (prop, self.__class__.__name__))
+                return None
+
+            if prop not in names:
+                names.append(prop)
+
+        fields = []
+
+        for name in names:
+            if name in self._aggregates:
+                fields.append((name, self._aggregates[name].label(name), []))
+                continue
+
+            try:
+                attr, path = self._get_field_with_path(name)
+            except AttributeError:
+                attr, path = None, None
+
+            # Relations and properties can not be selected, and join path to
+            # the same table (self-referencing relation) can not be aliased
+            if (not hasattr(attr, 'property') or
+                    not hasattr(attr.property, 'columns') or
+                    len(path) != name.count('.')):
+                warnings.warn('Can not select column %s of %s as a tuple, using models instead.'
+                              % (name, self.__class__.__name__))
+                return None
+
+            fields.append((name, attr, path))
+
+        return fields
+
+    def _apply_list_row_fields(self, query, joins):
+        """
+            Replace the selected entity of the list query with the columns
+            of the `tuples` row mode.
+        """
+        columns = []
+        truncated = dict((name, value) for name, _, value, _ in self._truncate_fields)
+
+        for name, attr, path in self._list_row_fields:
+            query, joins, alias = self._apply_path_joins(query, joins, path, inner_join=False)
+
+            if name in truncated:
+                columns.append(truncated[name])
+            else:
+                columns.append(attr if alias is None else getattr(alias, attr.key))
+
+        # Lengths of the truncated columns follow the row columns
+        columns.extend(length for _, _, _, length in self._truncate_fields)
+
+        return query.with_entities(*columns), joins
+
+    def _apply_list_columns(self, query):
+        """
+            Defer loading of the truncated columns and select their
+            beginning and length instead, then select the aggregates.
+        """
+        for name, attr, value, length in self._truncate_fields:
+            query = query.options(defer(attr)).add_columns(value, length)
+
+        for name, column in self._list_aggregates:
+            query = query.add_columns(column)
+
+        return query
+
+    def _get_list_rows(self, query):
+        """
+            Return list of rows of the list query with truncated and
+            aggregate columns.
+
+            Truncated values are kept in the `_truncated_values` dictionary
+            of models, mapped attributes are not touched. Aggregates are set
+            as attributes.
+        """
+        rows = []
+
+        if self._list_row_fields is not None:
+            make_row = self._list_row_factory
+            offset = len(self._list_row_fields)
+
+            for values in query:
+                row = make_row(values)
+
+                for idx, (name, _, _, _) in enumerate(self._truncate_fields):
+                    setattr(row, name, self._make_truncated_value(getattr(row, name),
+                                                                  values[offset + idx]))
+
+                rows.append(row)
+        else:
+            offset = 1 + len(self._truncate_fields) * 2
+
+            for values in query:
+                model = values[0]
+
+                if self._truncate_fields:
+                    model._truncated_values = dict(
+                        (name, self._make_truncated_value(values[1 + idx * 2],
+                                                          values[2 + idx * 2]))
+                        for idx, (name, _, _, _) in enumerate(self._truncate_fields))
+
+                for idx, (name, _) in enumerate(self._list_aggregates):
+                    setattr(model, name, values[offset + idx])
+
+                rows.append(model)
+
+        return rows
+
     # AJAX foreignkey support
     def _create_ajax_loader(self, name, options):
         return create_ajax_loader(self.model, self.session, name, name, options)
@@ -903,7 +1269,11 @@ class ModelView(BaseModelView):
         count_joins = {}
 
         query = self.get_query()
-        count_query = self.get_count_query() if not self.simple_list_pager else None
+        # Summaries are computed by the count query
+        if not self.simple_list_pager or self._summary_fields:
+            count_query = self.get_count_query()
+        else:
+            count_query = None
 
         # Ignore eager-loaded relations (prevent unnecessary joins)
         # TODO: Separate join detection for query and count query?
@@ -929,15 +1299,29 @@ class ModelView(BaseModelView):
                                                                          filters)
 
         # Calculate number of rows if necessary
-        count = count_query.scalar() if count_query else None
+        with self._list_phase('count'):
+            if count_query is not None:
+                count, _ = self._get_list_totals(search, filters,
+                                                 lambda: self._get_count_and_summaries(count_query))
+            else:
+                count = None
 
-        # Auto join
-        for j in self._auto_joins:
-            query = query.options(joinedload(j))
+        # Auto join, rows of the tuple mode join their columns instead
+        if self._list_row_fields is None:
+            for j in self._auto_joins:
+                query = query.options(joinedload(j))
+
+            for attr in self._deferred_fields:
+                query = query.options(defer(attr))
 
         # Sorting
         query, joins = self._apply_sorting(query, joins, sort_column, sort_desc)
 
+        if self._list_row_fields is not None:
+            query, joins = self._apply_list_row_fields(query, joins)
+        elif self._truncate_fields or self._list_aggregates:
+            query = self._apply_list_columns(query)
+
         # Pagination
         if page is not None:
             query = query.offset(page * self.page_size)
@@ -946,10 +1330,43 @@ class ModelView(BaseModelView):
 
         # Execute if needed
         if execute:
-            query = query.all()
+            with self._list_phase('fetch'):
+                if self._truncate_fields or self._list_aggregates:
+                    query = self._get_list_rows(query)
+                elif self._list_row_fields is not None:
+                    make_row = self._list_row_factory
+                    query = [make_row(row) for row in query]
+                else:
+                    query = query.all()
 
         return count, query
 
+    def _get_count_and_summaries(self, count_query):
+        """
+            Run the count query with the column summaries, return tuple of
+            the count and the summaries.
+        """
+        if not self._summary_fields:
+            return count_query.scalar(), None
+
+        row = count_query.add_columns(*[expr for _, _, expr in self._summary_fields]).one()
+
+        summaries = {}
+
+        for (name, function, _), value in zip(self._summary_fields, row[1:]):
+            summaries.setdefault(name, {})[function] = value
+
+        return (row[0] if not self.simple_list_pager else None), summaries
+
+    def explain_list(self, page, sort_column, sort_desc, search, filters):
+        """
+            Return SQL text and ``EXPLAIN`` output of the list query.
+        """
+        count, query = self.get_list(page, sort_column, sort_desc, search, filters,
+                                     execute=False)
+
+        return tools.explain_query(query, self.session.get_bind(mapper=self.model))
+
     def get_one(self, id):
         """
             Return a single model by its id.
@@ -959,6 +1376,49 @@ class ModelView(BaseModelView):
         """
         return self.session.query(self.model).get(tools.iterdecode(id))
 
+    def _get_field_value(self, model, name):
+        if name in self._column_truncate:
+            truncated = getattr(model, '_truncated_values', None)
+
+            if truncated is not None and name in truncated:
+                return truncated[name]
+
+        return super(ModelView, self)._get_field_value(model, name)
+
+    def _get_full_value(self, model, name):
+        # Skip `_truncated_values` left by a list view in the same session
+        return super(ModelView, self)._get_field_value(model, name)
+
+    def get_many(self, ids):
+        """
+            Return models with the given ids in one query.
+
+            :param ids:
+                List of model ids
+        """
+        query = tools.get_query_for_ids(self.get_query(), self.model, ids)
+
+        for j in self._auto_joins:
+            query = query.options(joinedload(j))
+
+        if not self._aggregates:
+            return query.all()
+
+        names = sorted(self._aggregates)
+        query = query.add_columns(*[self._aggregates[name].label(name) for name in names])
+
+        models = []
+
+        for values in query:
+            model = values[0]
+
+            for name, value in zip(names, values[1:]):
+                setattr(model, name, value)
+
+            models.append(model)
+
+        return models
+
     # Error handler
     def handle_view_exception(self, exc):
         if isinstance(exc, IntegrityError):
@@ -967,6 +1427,18 @@ class ModelView(BaseModelView):
 
         return super(ModelView, self).handle_view_exception(exc)
 
+    # Audit
+    def _record_audit(self, entry):
+        """
+            Queue audit entry once the surrounding transaction is committed,
+            so rolled back changes never reach the audit log.
+        """
+        transaction.get().addAfterCommitHook(self._audit_after_commit, args=(entry,))
+
+    def _audit_after_commit(self, status, entry):
+        if status:
+            self.audit_log.record(entry)
+
     # Model handlers
     def create_model(self, form):
         """
@@ -991,7 +1463,7 @@ class ModelView(BaseModelView):
             transaction.doom()
             return False
         else:
-            self.after_model_change(form, model, True)
+            self._after_model_change(form, model, True)
 
         return model
 
@@ -1018,7 +1490,7 @@ class ModelView(BaseModelView):
 
             return False
         else:
-            self.after_model_change(form, model, False)
+            self._after_model_change(form, model, False)
 
         return True
 
@@ -1043,7 +1515,7 @@ class ModelView(BaseModelView):
             transaction.doom()
             return False
         else:
-            self.after_model_delete(model)
+            self._after_model_delete(model)
 
         return True
 
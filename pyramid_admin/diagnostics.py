@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+"""
+    pyramid_admin.diagnostics
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Startup profiler for admin views.
+
+    Builds the application, times every scaffolding phase of every admin view
+    and measures memory retained by each view with `tracemalloc`.
+
+    Usage::
+
+        python -m pyramid_admin.diagnostics myapp.admin:create_app
+        python -m pyramid_admin.diagnostics --ini development.ini --json report.json
+
+    The factory is called without arguments and should return an
+    :class:`~pyramid_admin.base.Admin` instance, a Pyramid `Configurator` or a
+    WSGI application created by Pyramid.
+
+    The command exits with status code 1 if one of the `--max-time`,
+    `--max-view-time` or `--baseline` checks fails, so it can be used in CI.
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from functools import wraps
+
+from pyramid.path import DottedNameResolver
+
+from pyramid_admin import json
+from pyramid_admin.actions import ActionsMixin
+from pyramid_admin.base import Admin, AdminViewMeta, BaseView
+from pyramid_admin._compat import itervalues
+
+
+# Instrumented methods and phases they are reported under. Nested calls of
+# the same phase for the same view are counted once.
+PHASES = (
+    ('__init__', ('total',)),
+    ('prepare', ('total',)),
+    ('configure_to', ('total', 'routes')),
+    ('init_actions', ('actions',)),
+    ('get_list_columns', ('list_columns',)),
+    ('get_sortable_columns', ('sortable_columns',)),
+    ('init_search', ('search',)),
+    ('get_form', ('forms',)),
+    ('get_delete_form', ('forms',)),
+    ('get_list_form', ('forms',)),
+    ('_process_ajax_references', ('ajax',)),
+    ('_refresh_filters_cache', ('filters',)),
+    ('_refresh_form_rules_cache', ('form_rules',)),
+)
+
+PHASE_NAMES = ('total', 'routes', 'actions', 'list_columns', 'sortable_columns',
+               'search', 'forms', 'ajax', 'filters', 'form_rules')
+
+
+class ViewReport(object):
+    """
+        Timings and memory usage of one view.
+    """
+    def __init__(self, view):
+        self.view = view
+        self.time = {}
+        self.memory = {}
+
+    @property
+    def name(self):
+        return getattr(self.view, 'name', None)
+
+    @property
+    def endpoint(self):
+        return getattr(self.view, 'endpoint', None)
+
+    @property
+    def total_time(self):
+        return self.time.get('total', 0)
+
+    @property
+    def total_memory(self):
+        return self.memory.get('total', 0)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'endpoint': self.endpoint,
+            'class': '%s.%s' % (type(self.view).__module__, type(self.view).__name__),
+            'time': dict(self.time),
+            'memory': dict(self.memory),
+        }
+
+
+class Report(object):
+    """
+        Startup report for all instrumented views.
+    """
+    def __init__(self, views, total_time, total_memory):
+        self.views = views
+        self.total_time = total_time
+        self.total_memory = total_memory
+
+    def sorted_views(self, key='time'):
+        """
+            Return views, slowest (or largest, if `key` is `memory`) first.
+        """
+        if key == 'memory':
+            return sorted(self.views, key=lambda v: v.total_memory, reverse=True)
+
+        return sorted(self.views, key=lambda v: v.total_time, reverse=True)
+
+    def to_dict(self, key='time'):
+        return {
+            'total_time': self.total_time,
+            'total_memory': self.total_memory,
+            'views': [v.to_dict() for v in self.sorted_views(key)],
+        }
+
+    def format_table(self, key='time'):
+        """
+            Format report as a text table. Times are in milliseconds,
+            memory in kilobytes.
+        """
+        header = ['view', 'total ms', 'memory KiB'] + ['%s ms' % p for p in PHASE_NAMES[1:]]
+        rows = [header]
+
+        for v in self.sorted_views(key):
+            row = [v.endpoint or '?',
+                   '%.1f' % (v.total_time * 1000),
+                   '%.1f' % (v.total_memory / 1024.0)]
+            row.extend('%.1f' % (v.time[p] * 1000) if p in v.time else '-'
+                       for p in PHASE_NAMES[1:])
+            rows.append(row)
+
+        widths = [max(len(r[i]) for r in rows) for i in range(len(header))]
+
+        lines = []
+        for n, row in enumerate(rows):
+            lines.append('  '.join(c.ljust(w) if i == 0 else c.rjust(w)
+                                   for i, (c, w) in enumerate(zip(row, widths))))
+            if n == 0:
+                lines.append('  '.join('-' * w for w in widths))
+
+        lines.append('')
+        lines.append('%d views, %.1f ms, %.1f KiB retained' % (len(self.views),
+                                                               self.total_time * 1000,
+                                                               self.total_memory / 1024.0))
+        return '\n'.join(lines)
+
+
+class Profiler(object):
+    """
+        Instruments admin view classes while the application is being built.
+
+        Methods listed in :data:`PHASES` are wrapped on :class:`BaseView`,
+        :class:`ActionsMixin` and all their subclasses, including classes created while the profiler is
+        active. Original methods are restored by :meth:`stop`.
+    """
+    def __init__(self):
+        self.views = {}
+
+        self._patched = []
+        self._depth = {}
+        self._meta_init = None
+        self._started_tracing = False
+
+    def _get_report(self, view):
+        report = self.views.get(id(view))
+
+        if report is None:
+            report = self.views[id(view)] = ViewReport(view)
+
+        return report
+
+    def _wrap(self, fn, phases):
+        profiler = self
+
+        @wraps(fn)
+        def inner(self, *args, **kwargs):
+            active = []
+
+            for phase in phases:
+                key = (id(self), phase)
+                depth = profiler._depth.get(key, 0)
+                profiler._depth[key] = depth + 1
+
+                if depth == 0:
+                    active.append(phase)
+
+            if not active:
+                try:
+                    return fn(self, *args, **kwargs)
+                finally:
+                    for phase in phases:
+                        profiler._depth[(id(self), phase)] -= 1
+
+            memory = tracemalloc.get_traced_memory()[0]
+            start = time.time()
+
+            try:
+                return fn(self, *args, **kwargs)
+            finally:
+                elapsed = time.time() - start
+                memory = tracemalloc.get_traced_memory()[0] - memory
+
+                report = profiler._get_report(self)
+
+                for phase in phases:
+                    profiler._depth[(id(self), phase)] -= 1
+
+                for phase in active:
+                    report.time[phase] = report.time.get(phase, 0) + elapsed
+                    report.memory[phase] = report.memory.get(phase, 0) + memory
+
+        inner._profiled = True
+        return inner
+
+    def instrument(self, cls):
+        """
+            Wrap methods defined by the class.
+
+            :param cls:
+                View class
+        """
+        for name, phases in PHASES:
+            fn = cls.__dict__.get(name)
+
+            if fn is None or not callable(fn) or getattr(fn, '_profiled', False):
+                continue
+
+            self._patched.append((cls, name, fn))
+            setattr(cls, name, self._wrap(fn, phases))
+
+    def start(self):
+        """
+            Start tracing memory and instrument view classes.
+        """
+        # Leave tracing of the caller running on stop
+        self._started_tracing = not tracemalloc.is_tracing()
+
+        if self._started_tracing:
+            tracemalloc.start()
+
+        seen = set()
+        stack = [BaseView, ActionsMixin]
+        while stack:
+            cls = stack.pop()
+
+            if cls not in seen:
+                seen.add(cls)
+                self.instrument(cls)
+                stack.extend(cls.__subclasses__())
+
+        # Instrument classes defined while the application is imported
+        profiler = self
+        meta_init = self._meta_init = AdminViewMeta.__init__
+
+        def init(cls, classname, bases, fields):
+            meta_init(cls, classname, bases, fields)
+            profiler.instrument(cls)
+
+        AdminViewMeta.__init__ = init
+
+    def stop(self):
+        """
+            Restore original methods and stop tracing memory, if it was
+            started by :meth:`start`.
+        """
+        if self._meta_init is not None:
+            AdminViewMeta.__init__ = self._meta_init
+            self._meta_init = None
+
+        for cls, name, fn in reversed(self._patched):
+            setattr(cls, name, fn)
+
+        self._patched = []
+
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+
+def find_admins(app):
+    """
+        Find :class:`~pyramid_admin.base.Admin` instances registered with
+        the application.
+
+        :param app:
+            `Admin` instance, Pyramid `Configurator` or WSGI application
+    """
+    if isinstance(app, Admin):
+        return [app]
+
+    registry = getattr(app, 'registry', None)
+    extensions = getattr(registry, 'extensions', None) or {}
+
+    return list(extensions.get('admin', []))
+
+
+def profile(factory):
+    """
+        Build the application with the profiler active and return a
+        :class:`Report`.
+
+        Views with `lazy_scaffolding` are prepared with
+        :meth:`~pyramid_admin.base.Admin.warmup` after the application
+        is built, so they are included in the report.
+
+        :param factory:
+            Callable that builds the application
+    """
+    profiler = Profiler()
+    profiler.start()
+
+    try:
+        start = time.time()
+
+        app = factory()
+
+        for admin in find_admins(app):
+            admin.warmup()
+
+        total_time = time.time() - start
+        total_memory = tracemalloc.get_traced_memory()[0]
+    finally:
+        profiler.stop()
+
+    return Report(list(itervalues(profiler.views)), total_time, total_memory)
+
+
+def check(report, max_time=None, max_view_time=None, baseline=None, tolerance=0.2):
+    """
+        Check report against limits. Returns list of error messages.
+
+        :param report:
+            :class:`Report` instance
+        :param max_time:
+            Maximum total startup time, in seconds
+        :param max_view_time:
+            Maximum startup time of a single view, in seconds
+        :param baseline:
+            Previous report, as a dictionary returned by :meth:`Report.to_dict`
+        :param tolerance:
+            Allowed total time regression relative to the baseline
+    """
+    errors = []
+
+    if max_time is not None and report.total_time > max_time:
+        errors.append('Total startup time %.1f ms exceeds %.1f ms' % (report.total_time * 1000,
+                                                                      max_time * 1000))
+
+    if max_view_time is not None:
+        for v in report.sorted_views():
+            if v.total_time > max_view_time:
+                errors.append('View %s startup time %.1f ms exceeds %.1f ms' % (v.endpoint,
+                                                                                v.total_time * 1000,
+                                                                                max_view_time * 1000))
+
+    if baseline is not None:
+        limit = baseline['total_time'] * (1 + tolerance)
+
+        if report.total_time > limit:
+            errors.append('Total startup time %.1f ms regressed from %.1f ms' % (report.total_time * 1000,
+                                                                                 baseline['total_time'] * 1000))
+
+    return errors
+
+
+def _load_factory(args):
+    if args.ini:
+        from pyramid.paster import get_app
+
+        return lambda: get_app(args.ini, args.app_name)
+
+    if not args.factory:
+        raise SystemExit('Either factory or --ini is required')
+
+    return DottedNameResolver().resolve(args.factory)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pyramid_admin.diagnostics',
+                                     description='Profile admin views startup.')
+    parser.add_argument('factory', nargs='?',
+                        help='Dotted name of the application factory, e.g. myapp:create_app')
+    parser.add_argument('--ini', help='PasteDeploy configuration file to load the application from')
+    parser.add_argument('--app-name', default=None, help='Application section in the configuration file')
+    parser.add_argument('--sort', choices=('time', 'memory'), default='time')
+    parser.add_argument('--json', dest='json_path', help='Write JSON report to the file ("-" for stdout)')
+    parser.add_argument('--max-time', type=float, help='Fail if total startup time exceeds this many seconds')
+    parser.add_argument('--max-view-time', type=float, help='Fail if any view startup exceeds this many seconds')
+    parser.add_argument('--baseline', help='Fail if total startup time regressed compared to this JSON report')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed regression relative to the baseline (default: 0.2)')
+
+    args = parser.parse_args(argv)
+
+    report = profile(_load_factory(args))
+
+    if args.json_path == '-':
+        sys.stdout.write(json.dumps(report.to_dict(args.sort), indent=2) + '\n')
+    else:
+        sys.stdout.write(report.format_table(args.sort) + '\n')
+
+        if args.json_path:
+            with open(args.json_path, 'w') as fp:
+                json.dump(report.to_dict(args.sort), fp, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+
+    errors = check(report, args.max_time, args.max_view_time, baseline, args.tolerance)
+
+    for error in errors:
+        sys.stderr.write(error + '\n')
+
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
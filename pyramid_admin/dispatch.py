@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+    pyramid_admin.dispatch
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Single-route dispatcher for admin views.
+
+    Instead of registering one Pyramid route per exposed view method, the
+    dispatcher registers one ``<admin url>/*subpath`` route and resolves the
+    view method through a dictionary built when views are added.
+"""
+import re
+
+from pyramid.encode import quote_plus, url_quote
+from pyramid.httpexceptions import HTTPNotFound, HTTPMethodNotAllowed
+from pyramid.security import NO_PERMISSION_REQUIRED
+
+from ._compat import iteritems, string_types, text_type
+
+
+# Matches werkzeug-style placeholders: <name> and <converter:name>
+_placeholder_re = re.compile(r'<(?:(\w+):)?(\w+)>')
+
+_converters = {
+    None: '[^/]+',
+    'string': '[^/]+',
+    'int': r'\d+',
+    'path': '.+',
+}
+
+
+class UrlRule(object):
+    """
+        Exposed view URL, possibly containing placeholders.
+
+        Rules are compiled once, when the view is configured, so building
+        a URL for a view method is a dictionary lookup and string formatting.
+    """
+    def __init__(self, url, view, name, methods, url_prefix='', placeholders=True):
+        """
+            Constructor.
+
+            :param url:
+                Absolute URL of the view method
+            :param view:
+                View instance
+            :param name:
+                View method name
+            :param methods:
+                Allowed HTTP methods
+            :param url_prefix:
+                Prefix added to generated URLs (Pyramid route prefix)
+            :param placeholders:
+                If set to `False`, URL is used literally
+        """
+        self.url = url
+        self.view = view
+        self.name = name
+        self.url_prefix = url_prefix
+        self.methods = frozenset(m.upper() for m in methods)
+
+        if 'GET' in self.methods:
+            self.methods |= frozenset(['HEAD'])
+
+        self.arguments = [m.group(2) for m in _placeholder_re.finditer(url)] if placeholders else []
+        self.regex = None
+
+        if self.arguments:
+            pattern, pos = [], 0
+
+            for m in _placeholder_re.finditer(url):
+                pattern.append(re.escape(url[pos:m.start()]))
+                pattern.append('(?P<%s>%s)' % (m.group(2), _converters.get(m.group(1), '[^/]+')))
+                pos = m.end()
+
+            pattern.append(re.escape(url[pos:]))
+            self.regex = re.compile('^%s$' % ''.join(pattern))
+
+    def match(self, path):
+        """
+            Return dictionary of view arguments if `path` matches the rule.
+        """
+        if self.regex is None:
+            return {} if path == self.url else None
+
+        m = self.regex.match(path)
+        return m.groupdict() if m else None
+
+    def build(self, kwargs):
+        """
+            Return path for the rule and remaining query string arguments.
+            If some of the placeholders are missing, returns `None`.
+        """
+        if not self.arguments:
+            return self.url_prefix + self.url, kwargs
+
+        for arg in self.arguments:
+            if kwargs.get(arg) is None:
+                return None
+
+        query = dict((k, v) for k, v in iteritems(kwargs) if k not in self.arguments)
+
+        def substitute(m):
+            safe = '/' if m.group(1) == 'path' else ''
+            return url_quote(kwargs[m.group(2)], safe=safe)
+
+        return self.url_prefix + _placeholder_re.sub(substitute, self.url), query
+
+
+class AdminDispatcher(object):
+    """
+        Resolve admin URLs to view methods in constant time.
+
+        Static URLs are looked up in a dictionary; only URLs with
+        placeholders are matched with regular expressions.
+    """
+    def __init__(self, prefix):
+        """
+            Constructor.
+
+            :param prefix:
+                URL prefix handled by the dispatcher, for example ``/admin``
+        """
+        self.prefix = prefix.rstrip('/')
+
+        self._static = {}
+        self._dynamic = []
+
+    def handles(self, url):
+        """
+            Check if URL is under the dispatcher prefix.
+        """
+        return url.startswith(self.prefix + '/')
+
+    def add(self, rule):
+        """
+            Add exposed view method.
+
+            :param rule:
+                :class:`UrlRule` of the view method
+        """
+        if rule.regex is None:
+            self._static.setdefault(rule.url, rule)
+        else:
+            self._dynamic.append(rule)
+
+    def resolve(self, path):
+        """
+            Find rule and view arguments for the path.
+
+            :param path:
+                Request path, including the prefix
+        """
+        rule = self._static.get(path)
+        if rule is not None:
+            return rule, {}
+
+        for rule in self._dynamic:
+            kwargs = rule.match(path)
+            if kwargs is not None:
+                return rule, kwargs
+
+        return None, None
+
+    def __call__(self, context, request):
+        path = '%s/%s' % (self.prefix, '/'.join(request.matchdict.get('subpath', ())))
+
+        # Keep trailing slash, view URLs are usually exposed with it
+        if request.path_info.endswith('/') and not path.endswith('/'):
+            path += '/'
+
+        rule, kwargs = self.resolve(path)
+
+        if rule is None:
+            raise HTTPNotFound()
+
+        if request.method not in rule.methods:
+            raise HTTPMethodNotAllowed()
+
+        return getattr(rule.view, rule.name)(**kwargs)
+
+    def register(self, config, route_name):
+        """
+            Register dispatcher route and view with the configurator.
+
+            :param config:
+                Pyramid Configurator
+            :param route_name:
+                Route name for the dispatcher
+        """
+        config.add_route(route_name, self.prefix + '/*subpath')
+        config.add_view(view=self,
+                        route_name=route_name,
+                        permission=NO_PERMISSION_REQUIRED)
+
+
+_quote_cache = {}
+_QUOTE_CACHE_SIZE = 4096
+
+
+def _quote(value):
+    """
+        `quote_plus` with memoization - list pages repeat the same query
+        string values (return URL, sort column, etc) for every row.
+    """
+    if not isinstance(value, string_types):
+        value = text_type(value)
+
+    quoted = _quote_cache.get(value)
+
+    if quoted is None:
+        quoted = quote_plus(value)
+
+        if len(_quote_cache) >= _QUOTE_CACHE_SIZE:
+            _quote_cache.clear()
+
+        _quote_cache[value] = quoted
+
+    return quoted
+
+
+def encode_query(query):
+    """
+        Encode query string arguments. Arguments set to `None` are omitted.
+
+        :param query:
+            Dictionary of arguments
+    """
+    parts = []
+
+    for key, value in iteritems(query):
+        if value is None:
+            continue
+
+        key = _quote(key)
+
+        if isinstance(value, (list, tuple)):
+            parts.extend('%s=%s' % (key, _quote(v)) for v in value)
+        else:
+            parts.append('%s=%s' % (key, _quote(value)))
+
+    return '&'.join(parts)
+
+
+def build_url(request, rules, kwargs):
+    """
+        Build URL from the first rule that accepts `kwargs`.
+        Returns `None` if none of the rules can be built.
+
+        :param request:
+            Current request
+        :param rules:
+            List of :class:`UrlRule` objects for the endpoint
+        :param kwargs:
+            View arguments. Arguments that are not part of the URL
+            are added to the query string.
+    """
+    for rule in rules:
+        built = rule.build(kwargs)
+
+        if built is not None:
+            path, query = built
+
+            # Computed by WebOb from the environment on every access
+            application_url = request.__dict__.get('_admin_application_url')
+            if application_url is None:
+                application_url = request.__dict__['_admin_application_url'] = request.application_url
+
+            url = application_url + path
+
+            if query:
+                query = encode_query(query)
+
+                if query:
+                    url += '?' + query
+
+            return url
+
+    return None
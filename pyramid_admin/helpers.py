@@ -20,6 +20,34 @@ def get_current_view():
     return getattr(g, '_admin_view', None)
 
 
+def get_request_cache(request=None, create=True):
+    """
+        Get dictionary for values cached for the duration of the request.
+
+        The dictionary is stored on the request object, so cached values
+        are never shared between requests or threads.
+        Returns `None` if there is no current request.
+
+        :param request:
+            Request. Defaults to the current request.
+        :param create:
+            If set to `False`, returns `None` instead of creating the
+            dictionary when nothing was cached for the request yet.
+    """
+    if request is None:
+        request = get_current_request()
+
+        if request is None:
+            return None
+
+    cache = request.__dict__.get('_admin_request_cache')
+
+    if cache is None and create:
+        cache = request.__dict__['_admin_request_cache'] = {}
+
+    return cache
+
+
 def get_url(endpoint, **kwargs):
     """
         Alternative to Flask `url_for`.
@@ -1,3 +1,5 @@
+from .tools import TimedCache
+
 # TODO: implement url_for
 
 def url_for(endpoint):
@@ -137,3 +139,9 @@ class MenuLink(BaseMenu):
 
     def get_url(self):
         return self.url or url_for(self.endpoint)
+
+
+class MenuCache(TimedCache):
+    """
+        Visible menu cache with limited entry lifetime.
+    """
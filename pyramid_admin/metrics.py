@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""
+    pyramid_admin.metrics
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Admin metrics in the Prometheus text format.
+
+    Metrics are disabled by default and cost a single attribute check per
+    measurement. To enable them, pass :class:`AdminMetrics` to the admin and
+    add :class:`MetricsView` to scrape them::
+
+        from pyramid_admin.metrics import AdminMetrics, MetricsView
+
+        admin = Admin(config, metrics=AdminMetrics())
+        admin.add_view(MetricsView(is_authorized=lambda request: request.has_permission('metrics')))
+
+    By default, :class:`MetricsView` is accessible only in debug mode.
+
+    Collected metrics:
+
+    - ``pyramid_admin_view_seconds``: latency of every exposed view method,
+      for example `index_view`, `edit_view`, `ajax_lookup`, `action_view`
+    - ``pyramid_admin_list_phase_seconds``: time spent in the list view
+      phases: `count`, `fetch`, `format` and `render`. Values are formatted
+      while the template is rendered, `render` does not include `format`.
+    - ``pyramid_admin_list_rows_total``: rows fetched by the list view
+    - ``pyramid_admin_cache_requests_total``: hits and misses of the admin
+      caches
+"""
+import threading
+
+from pyramid.response import Response
+from pyramid.threadlocal import get_current_request
+
+from ._compat import iteritems, perf_counter, text_type
+from .base import BaseView, expose
+
+
+DEFAULT_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4'
+
+
+def _escape(value):
+    return (text_type(value).replace('\\', '\\\\')
+                            .replace('\n', '\\n')
+                            .replace('"', '\\"'))
+
+
+def _format_labels(names, values, extra=None):
+    pairs = ['%s="%s"' % (n, _escape(v)) for n, v in zip(names, values)]
+
+    if extra:
+        pairs.append('%s="%s"' % extra)
+
+    return '{%s}' % ','.join(pairs) if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter(object):
+    """
+        Monotonically increasing counter.
+    """
+    type_name = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        """
+            Increment counter.
+
+            :param labels:
+                Tuple of label values, in the `labelnames` order
+            :param amount:
+                Amount to add
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def collect(self):
+        with self._lock:
+            values = sorted(iteritems(self._values))
+
+        for labels, value in values:
+            yield '%s%s %s' % (self.name,
+                               _format_labels(self.labelnames, labels),
+                               _format_value(value))
+
+
+class Histogram(object):
+    """
+        Distribution of observed values, in cumulative buckets.
+    """
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+        # labels -> [bucket counts, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        """
+            Observe value.
+
+            :param value:
+                Observed value, for example time in seconds
+            :param labels:
+                Tuple of label values, in the `labelnames` order
+        """
+        with self._lock:
+            data = self._values.get(labels)
+
+            if data is None:
+                data = self._values[labels] = [[0] * len(self.buckets), 0]
+
+            counts = data[0]
+
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+
+            data[1] += value
+
+    def get_count(self, labels=()):
+        data = self._values.get(labels)
+        return sum(data[0]) if data else 0
+
+    def collect(self):
+        with self._lock:
+            values = sorted((labels, (list(data[0]), data[1]))
+                            for labels, data in iteritems(self._values))
+
+        for labels, (counts, total) in values:
+            cumulative = 0
+
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield '%s_bucket%s %d' % (self.name,
+                                          _format_labels(self.labelnames, labels,
+                                                         ('le', _format_value(bound))),
+                                          cumulative)
+
+            label_text = _format_labels(self.labelnames, labels)
+
+            yield '%s_sum%s %s' % (self.name, label_text, _format_value(float(total)))
+            yield '%s_count%s %d' % (self.name, label_text, cumulative)
+
+
+class MetricsRegistry(object):
+    """
+        Collection of metrics.
+    """
+    def __init__(self):
+        self._metrics = []
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """
+            Add metric to the registry. Returns already registered metric
+            with the same name, if there is one.
+
+            :param metric:
+                :class:`Counter` or :class:`Histogram` instance
+        """
+        with self._lock:
+            existing = self._names.get(metric.name)
+
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError('Metric %s is already registered with different type '
+                                     'or labels' % metric.name)
+
+                return existing
+
+            self._metrics.append(metric)
+            self._names[metric.name] = metric
+
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def generate_text(self):
+        """
+            Return metrics in the Prometheus text exposition format.
+        """
+        lines = []
+
+        for metric in self._metrics:
+            lines.append('# HELP %s %s' % (metric.name, _escape(metric.documentation)))
+            lines.append('# TYPE %s %s' % (metric.name, metric.type_name))
+            lines.extend(metric.collect())
+
+        return '\n'.join(lines) + '\n'
+
+
+class _NullTimer(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _PhaseTimer(object):
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.histogram.observe(perf_counter() - self.start, self.labels)
+        return False
+
+
+class NullMetrics(object):
+    """
+        Metrics that are not collected. Used when the admin has no metrics.
+    """
+    enabled = False
+
+    registry = None
+
+    def observe_view(self, endpoint, view, seconds):
+        pass
+
+    def observe_phase(self, endpoint, phase, seconds):
+        pass
+
+    def time_phase(self, endpoint, phase):
+        return NULL_TIMER
+
+    def add_rows(self, endpoint, count):
+        pass
+
+    def cache_hit(self, cache):
+        pass
+
+    def cache_miss(self, cache):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+class AdminMetrics(NullMetrics):
+    """
+        Admin metrics.
+    """
+    enabled = True
+
+    def __init__(self, registry=None, buckets=DEFAULT_BUCKETS):
+        """
+            Constructor.
+
+            :param registry:
+                :class:`MetricsRegistry` to add the admin metrics to. If not
+                provided, a new registry is created.
+            :param buckets:
+                Latency histogram buckets, in seconds
+        """
+        self.registry = registry if registry is not None else MetricsRegistry()
+
+        self.view_seconds = self.registry.histogram(
+            'pyramid_admin_view_seconds',
+            'Admin view latency in seconds',
+            ('endpoint', 'view'), buckets)
+
+        self.list_phase_seconds = self.registry.histogram(
+            'pyramid_admin_list_phase_seconds',
+            'Time spent in list view phases in seconds',
+            ('endpoint', 'phase'), buckets)
+
+        self.list_rows = self.registry.counter(
+            'pyramid_admin_list_rows_total',
+            'Rows fetched by list views',
+            ('endpoint',))
+
+        self.cache_requests = self.registry.counter(
+            'pyramid_admin_cache_requests_total',
+            'Admin cache lookups',
+            ('cache', 'result'))
+
+    def observe_view(self, endpoint, view, seconds):
+        """
+            Record view method latency.
+
+            :param endpoint:
+                View endpoint
+            :param view:
+                View method name
+            :param seconds:
+                Latency
+        """
+        self.view_seconds.observe(seconds, (endpoint, view))
+
+    def observe_phase(self, endpoint, phase, seconds):
+        """
+            Record time spent in a list view phase.
+
+            :param endpoint:
+                View endpoint
+            :param phase:
+                Phase name
+            :param seconds:
+                Time spent
+        """
+        self.list_phase_seconds.observe(seconds, (endpoint, phase))
+
+    def time_phase(self, endpoint, phase):
+        """
+            Return context manager that records time spent in the block as
+            a list view phase.
+
+            :param endpoint:
+                View endpoint
+            :param phase:
+                Phase name
+        """
+        return _PhaseTimer(self.list_phase_seconds, (endpoint, phase))
+
+    def add_rows(self, endpoint, count):
+        self.list_rows.inc((endpoint,), count)
+
+    def cache_hit(self, cache):
+        self.cache_requests.inc((cache, 'hit'))
+
+    def cache_miss(self, cache):
+        self.cache_requests.inc((cache, 'miss'))
+
+
+class MetricsView(BaseView):
+    """
+        Metrics of the admin in the Prometheus text format.
+
+        The view is not shown in the menu.
+    """
+    def __init__(self, name=None, category=None, endpoint=None, url=None,
+                 is_authorized=None):
+        """
+            Constructor.
+
+            :param name:
+                View name
+            :param category:
+                View category
+            :param endpoint:
+                Base endpoint. Defaults to `metrics`.
+            :param url:
+                Base URL. If not provided, will use endpoint as a URL.
+            :param is_authorized:
+                Function that takes the request and returns `True` if it is
+                allowed to scrape the metrics. By default, metrics are
+                available only when the ``debug`` setting is on.
+        """
+        super(MetricsView, self).__init__(name or 'Metrics', category,
+                                          endpoint or 'metrics', url)
+
+        self.is_authorized = is_authorized or self._is_debug
+
+    @staticmethod
+    def _is_debug(request):
+        return bool(request.registry.settings.get('debug'))
+
+    def is_accessible(self):
+        return self.is_authorized(get_current_request())
+
+    def is_visible(self):
+        return False
+
+    @expose('/')
+    def index(self):
+        registry = self.admin.metrics.registry
+        text = registry.generate_text() if registry is not None else ''
+
+        return Response(text, content_type=CONTENT_TYPE, charset='utf-8')
+
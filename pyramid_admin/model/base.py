@@ -1,36 +1,46 @@
-from pyramid.httpexceptions import HTTPNotFound
+from pyramid.httpexceptions import HTTPBadRequest, HTTPNotFound
 from pyramid.threadlocal import get_current_request
+import logging
+import threading
+import time
 import warnings
 import re
 
 from pyramid.response import Response
 from .._compat import flash, redirect, get_flashed_messages, json
 
-from jinja2 import contextfunction
+from jinja2 import contextfunction, Markup
 from wtforms.fields import HiddenField
 from wtforms.fields.core import UnboundField
 from wtforms.validators import ValidationError, Required
 
-from pyramid_admin.babel import gettext
+from pyramid_admin.babel import gettext, get_catalog_key
 
+from pyramid_admin import audit, slowlog
 from pyramid_admin.base import BaseView, expose
 from pyramid_admin.form import BaseForm, FormOpts, rules
 from pyramid_admin.model import filters, typefmt
 from pyramid_admin.actions import ActionsMixin
 from pyramid_admin.helpers import (get_form_data, validate_form_on_submit,
-                                 get_redirect_target, flash_errors)
-from pyramid_admin.tools import rec_getattr
+                                 get_redirect_target, flash_errors, get_request_cache)
+from pyramid_admin.tools import rec_getattr, TimedCache
 from .._backwards import ObsoleteAttr
-from .._compat import iteritems, OrderedDict, as_unicode
+from .._compat import iteritems, OrderedDict, as_unicode, string_types, perf_counter
 from .helpers import prettify_name, get_mdict_item_or_list
 from .ajax import AjaxModelLoader
 from .fields import ListEditableFieldList
 
 
+log = logging.getLogger("pyramid-admin.model")
+
+
 # Used to generate filter query string name
 filter_char_re = re.compile('[^a-z0-9 ]')
 filter_compact_re = re.compile(' +')
 
+# Functions of `column_summaries`
+SUMMARY_FUNCTIONS = ('sum', 'avg', 'min', 'max')
+
 
 class ViewArgs(object):
     """
@@ -282,6 +292,88 @@ class BaseModelView(BaseView, ActionsMixin):
                 column_editable_list = ('name', 'last_name')
     """
 
+    column_truncate_list = None
+    """
+        Long list columns that are truncated in the list view. Dictionary
+        of column name to the number of characters to show, or collection
+        of column names that are truncated to `column_truncate_length`.
+
+        Backends that support it load only the beginning of the value and
+        its length from the database. A link after the truncated value
+        loads the full value on demand. Binary values are shown as their
+        size with a download link.
+
+        If not set, the backend picks columns by their type, for example
+        `Text` columns of SQLAlchemy models. Columns with a formatter and
+        editable columns are never truncated. Set to an empty collection
+        to disable truncation.
+
+        Example::
+
+            class MyModelView(BaseModelView):
+                column_truncate_list = {'description': 200}
+    """
+
+    column_truncate_length = 100
+    """
+        Default number of characters of a truncated column, see
+        `column_truncate_list`.
+    """
+
+    column_deferred_list = None
+    """
+        Collection of the expensive list columns, like aggregates or
+        formatters that query other models, that are loaded after the
+        list page is rendered.
+
+        The list view renders placeholders for these columns. The page
+        then requests their values for all rows in one AJAX request, which
+        loads the models with `get_many`. Backends that support it leave
+        the columns out of the list query.
+
+        Formatters of deferred columns are called without template context,
+        so macro formatters can not be used. Editable columns are never
+        deferred.
+
+        Example::
+
+            class MyModelView(BaseModelView):
+                column_deferred_list = ('order_count', 'location')
+    """
+
+    column_summaries = None
+    """
+        Summaries of list columns, shown in the list table footer.
+        Dictionary of column name to a function name or a tuple of
+        function names. Supported functions are `sum`, `avg`, `min`
+        and `max`.
+
+        Summaries are computed over all models that match the current
+        search and filters, not only the current page. Backends that
+        support it compute them together with the count of the list.
+
+        Example::
+
+            class MyModelView(BaseModelView):
+                column_summaries = {
+                    'amount': ('sum', 'avg'),
+                    'created_at': 'max',
+                }
+    """
+
+    list_totals_cache_ttl = None
+    """
+        Number of seconds to cache the count and the summaries of the list
+        for a search and filters combination. Busy lists with expensive
+        counts can set it to show slightly stale totals instead of running
+        the count on every request. Disabled by default.
+
+        Cached totals are shared by all users of the view. If `get_query`
+        limits the rows per user, override `get_list_totals_cache_key` to
+        include the user, otherwise one user will see the count and the
+        summaries of another.
+    """
+
     column_choices = None
     """
         Map choices to columns in list view
@@ -542,6 +634,85 @@ class BaseModelView(BaseView, ActionsMixin):
         Default page size for pagination.
     """
 
+    # Audit
+    audit_log = None
+    """
+        :class:`~pyramid_admin.audit.AuditLog` instance which receives a
+        change log entry for every created, updated and deleted model.
+
+        Entries are written asynchronously, so they do not add latency to
+        the request that changed the model.
+
+        For example::
+
+            from pyramid_admin.audit import AuditLog, JSONLinesAuditSink
+
+            audit_log = AuditLog(JSONLinesAuditSink('/var/log/admin-audit.jsonl'))
+
+            class MyModelView(BaseModelView):
+                audit_log = audit_log
+    """
+
+    audit_exclude_columns = None
+    """
+        Collection of form field names that should never be written to the
+        audit log.
+
+        For example::
+
+            class MyModelView(BaseModelView):
+                audit_exclude_columns = ('password',)
+    """
+
+    # Slow list queries
+    slow_query_log = None
+    """
+        :class:`~pyramid_admin.slowlog.SlowQueryLog` instance. If set, the
+        time spent in `get_list` by the list view is measured, and slow lists
+        are logged with their filters, search, sort, query and query plan.
+
+        For example::
+
+            from pyramid_admin.slowlog import SlowQueryLog
+
+            slow_query_log = SlowQueryLog(threshold=0.5)
+
+            class MyModelView(BaseModelView):
+                slow_query_log = slow_query_log
+    """
+
+    slow_query_threshold = None
+    """
+        Slow list threshold for the view, in seconds. If not provided, the
+        threshold of the `slow_query_log` is used.
+    """
+
+    list_streaming = False
+    """
+        If set to `True`, the list view is sent to the client while it is
+        being rendered, see :meth:`~pyramid_admin.base.BaseView.render_streamed`.
+        Reduces time to first byte and memory usage for large `page_size`.
+
+        The page is rendered after the view method returns, so all list
+        columns should be loaded by `get_list`.
+
+        With `pyramid_tm`, the transaction is committed before the page is
+        rendered. SQLAlchemy views need a session created with
+        `expire_on_commit=False`, otherwise the loaded models are expired
+        by the commit and rendering fails with `DetachedInstanceError`.
+    """
+
+    lazy_scaffolding = False
+    """
+        If set to `True`, actions, list columns, forms, filters and form rules
+        are scaffolded when the view handles its first request instead of in
+        the constructor. This makes application startup faster when there are
+        many model views or when filters query the database for their options.
+
+        Use :meth:`~pyramid_admin.base.Admin.warmup` to scaffold all views
+        explicitly, for example before the worker starts accepting requests.
+    """
+
     def __init__(self, model,
                  name=None, category=None, endpoint=None, url=None, static_folder=None,
                  menu_class_name=None, menu_icon_type=None, menu_icon_value=None):
@@ -583,11 +754,34 @@ class BaseModelView(BaseView, ActionsMixin):
                                             menu_icon_type=menu_icon_type,
                                             menu_icon_value=menu_icon_value)
 
-        # Actions
-        self.init_actions()
+        self._scaffolded = False
+        self._scaffold_lock = threading.Lock()
+
+        if not self.lazy_scaffolding:
+            self.prepare()
+
+    def prepare(self):
+        """
+            Scaffold the view, if it was not scaffolded yet.
+        """
+        if self._scaffolded:
+            return
+
+        with self._scaffold_lock:
+            if self._scaffolded:
+                return
+
+            start = time.time()
 
-        # Scaffolding
-        self._refresh_cache()
+            # Actions
+            self.init_actions()
+
+            # Scaffolding
+            self._refresh_cache()
+
+            self._scaffolded = True
+
+            log.debug('Scaffolded %s in %.1f ms', self.endpoint, (time.time() - start) * 1000)
 
     # Endpoint
     def _get_endpoint(self, endpoint):
@@ -616,27 +810,33 @@ class BaseModelView(BaseView, ActionsMixin):
 
     def _refresh_filters_cache(self):
         self._filters = self.get_filters()
+        self._filter_groups_labels = {}
 
         if self._filters:
             self._filter_groups = OrderedDict()
             self._filter_args = {}
+            self._filter_arg_names = []
 
             for i, flt in enumerate(self._filters):
                 if flt.name not in self._filter_groups:
                     self._filter_groups[flt.name] = []
 
+                arg = self.get_filter_arg(i, flt)
+
                 self._filter_groups[flt.name].append({
                     'index': i,
-                    'arg': self.get_filter_arg(i, flt),
+                    'arg': arg,
                     'operation': flt.operation(),
                     'options': flt.get_options(self) or None,
                     'type': flt.data_type
                 })
 
-                self._filter_args[self.get_filter_arg(i, flt)] = (i, flt)
+                self._filter_args[arg] = (i, flt)
+                self._filter_arg_names.append(arg)
         else:
             self._filter_groups = None
             self._filter_args = None
+            self._filter_arg_names = None
 
     def _refresh_form_rules_cache(self):
         if self.form_create_rules:
@@ -673,6 +873,19 @@ class BaseModelView(BaseView, ActionsMixin):
         # Forms
         self._refresh_forms_cache()
 
+        # Deferred and truncated columns, need editable columns from the
+        # forms cache
+        self._column_deferred = self.get_deferred_columns()
+        self._column_truncate = self.get_truncate_columns()
+
+        # Summaries and cached list totals
+        self._column_summaries = self.get_summary_columns()
+
+        if self.list_totals_cache_ttl:
+            self._list_totals_cache = TimedCache(self.list_totals_cache_ttl)
+        else:
+            self._list_totals_cache = None
+
         # Search
         self._search_supported = self.init_search()
 
@@ -751,6 +964,69 @@ class BaseModelView(BaseView, ActionsMixin):
 
         return [(c, self.get_column_name(c)) for c in columns]
 
+    def scaffold_truncate_columns(self):
+        """
+            Return dictionary of the list columns that are truncated when
+            `column_truncate_list` is not set, with their maximum length.
+            Nothing is truncated by default.
+        """
+        return {}
+
+    def get_truncate_columns(self):
+        """
+            Return dictionary of the truncated list columns and their
+            maximum length, from `column_truncate_list` or
+            `scaffold_truncate_columns`.
+        """
+        columns = self.column_truncate_list
+
+        if columns is None:
+            columns = self.scaffold_truncate_columns()
+        elif not isinstance(columns, dict):
+            columns = dict((name, self.column_truncate_length) for name in columns)
+
+        listed = set(name for name, _ in self._list_columns)
+        excluded = (set(self.column_formatters or ()) | set(self.column_editable_list or ()) |
+                    self._column_deferred)
+
+        return dict((name, length) for name, length in columns.items()
+                    if name in listed and name not in excluded)
+
+    def get_deferred_columns(self):
+        """
+            Return set of the deferred list columns from `column_deferred_list`.
+        """
+        listed = set(name for name, _ in self._list_columns)
+        editable = set(self.column_editable_list or ())
+
+        return set(name for name in self.column_deferred_list or ()
+                   if name in listed and name not in editable)
+
+    def get_summary_columns(self):
+        """
+            Return ordered dictionary of the summarized list columns and
+            tuples of their summary functions, from `column_summaries`.
+        """
+        summaries = self.column_summaries or {}
+        result = OrderedDict()
+
+        for name, _ in self._list_columns:
+            functions = summaries.get(name)
+
+            if not functions:
+                continue
+
+            if isinstance(functions, string_types):
+                functions = (functions,)
+
+            for function in functions:
+                if function not in SUMMARY_FUNCTIONS:
+                    raise Exception('Invalid summary function %r of column %s.' % (function, name))
+
+            result[name] = tuple(functions)
+
+        return result
+
     def scaffold_sortable_columns(self):
         """
             Returns dictionary of sortable columns. Must be implemented in
@@ -865,9 +1141,21 @@ class BaseModelView(BaseView, ActionsMixin):
 
     def _get_filter_groups(self):
         """
-            Returns non-lazy version of filter strings
+            Returns non-lazy version of filter strings.
+
+            Computed once per message catalog, the result should not
+            be modified.
         """
         if self._filter_groups:
+            catalog = get_catalog_key()
+
+            results = self._filter_groups_labels.get(catalog)
+            if results is not None:
+                self._metrics.cache_hit('filter_groups')
+                return results
+
+            self._metrics.cache_miss('filter_groups')
+
             results = OrderedDict()
 
             for key, value in iteritems(self._filter_groups):
@@ -880,6 +1168,7 @@ class BaseModelView(BaseView, ActionsMixin):
 
                 results[key] = items
 
+            self._filter_groups_labels[catalog] = results
             return results
 
         return None
@@ -1151,6 +1440,15 @@ class BaseModelView(BaseView, ActionsMixin):
         """
         raise NotImplementedError('Please implement get_list method')
 
+    def explain_list(self, page, sort_field, sort_desc, search, filters):
+        """
+            Return text and execution plan of the list query, for the slow
+            query log. Either can be `None` if it is not available.
+
+            Arguments are the same as for `get_list`. Not supported by default.
+        """
+        raise NotImplementedError()
+
     def get_one(self, id):
         """
             Return one model by its id.
@@ -1162,6 +1460,17 @@ class BaseModelView(BaseView, ActionsMixin):
         """
         raise NotImplementedError('Please implement get_one method')
 
+    def get_many(self, ids):
+        """
+            Return models with the given ids. Missing models are left out.
+
+            The default implementation calls `get_one` for every id.
+
+            :param ids:
+                List of model ids
+        """
+        return [model for model in (self.get_one(id) for id in ids) if model is not None]
+
     # Exception handler
     def handle_view_exception(self, exc):
         if isinstance(exc, ValidationError):
@@ -1223,6 +1532,19 @@ class BaseModelView(BaseView, ActionsMixin):
         """
         pass
 
+    def _after_model_change(self, form, model, is_created):
+        """
+            Call `after_model_change` and record the change in the audit log.
+        """
+        self.after_model_change(form, model, is_created)
+
+        if self.audit_log is not None:
+            changes = audit.get_form_changes(form, is_created, self.audit_exclude_columns)
+
+            if is_created or changes:
+                action = audit.ACTION_CREATE if is_created else audit.ACTION_UPDATE
+                self._record_audit(audit.make_entry(self, model, action, changes))
+
     def on_model_delete(self, model):
         """
             Perform some actions before a model is deleted.
@@ -1249,6 +1571,27 @@ class BaseModelView(BaseView, ActionsMixin):
         """
         pass
 
+    def _after_model_delete(self, model):
+        """
+            Call `after_model_delete` and record the deletion in the audit log.
+        """
+        self.after_model_delete(model)
+
+        if self.audit_log is not None:
+            self._record_audit(audit.make_entry(self, model, audit.ACTION_DELETE))
+
+    def _record_audit(self, entry):
+        """
+            Pass audit entry to the audit log.
+
+            Model backends with deferred commits can override this to
+            postpone the entry until the data is actually committed.
+
+            :param entry:
+                Audit entry
+        """
+        self.audit_log.record(entry)
+
     def on_form_prefill (self, form, id):
         """
             Perform additional actions to pre-fill the edit form.
@@ -1395,10 +1738,13 @@ class BaseModelView(BaseView, ActionsMixin):
         kwargs.update(view_args.extra_args)
 
         if view_args.filters:
+            # Filter argument names are precomputed by `_refresh_filters_cache`
+            arg_names = self._filter_arg_names
+
             for i, pair in enumerate(view_args.filters):
                 idx, flt_name, value = pair
 
-                key = 'flt%d_%s' % (i, self.get_filter_arg(idx, self._filters[idx]))
+                key = 'flt%d_%s' % (i, arg_names[idx])
                 kwargs[key] = value
 
         return self.get_url('.index_view', **kwargs)
@@ -1420,6 +1766,257 @@ class BaseModelView(BaseView, ActionsMixin):
         """
         return rec_getattr(model, name)
 
+    def _get_full_value(self, model, name):
+        """
+            Get full value of a truncated column from the model returned
+            by `get_one`.
+        """
+        return self._get_field_value(model, name)
+
+    def _format_truncated(self, model, name, value):
+        """
+            Return markup of a truncated column value with a link that
+            loads the full value, or the value if it is short enough.
+            Values that were not truncated by the backend are truncated
+            here.
+        """
+        if not isinstance(value, typefmt.TruncatedValue):
+            length = self._column_truncate[name]
+
+            if not isinstance(value, string_types) or len(value) <= length:
+                return value
+
+            value = typefmt.TruncatedValue(value[:length], len(value))
+
+        if not value.truncated:
+            return value.value
+
+        url = self.get_url('.ajax_value', id=self.get_pk_value(model), name=name)
+
+        # Only length is known, for example of binary columns, which are
+        # downloaded instead of being loaded into the list
+        if value.value is None:
+            return Markup(u'<span class="truncated-value"><a href="%s">%s</a></span>') % (
+                url, gettext('Download (%(length)s)', length=value.length))
+
+        return Markup(u'<span class="truncated-value">%s&hellip; '
+                      u'<a href="%s" data-role="truncated-value">%s</a></span>') % (
+            value.value, url, gettext('Show all'))
+
+    def _get_deferred_list_value(self, get_value):
+        """
+            Return `get_value` that renders deferred columns as placeholders,
+            which are filled by `ajax_deferred`.
+        """
+        @contextfunction
+        def get_deferred_value(context, model, name):
+            if name in self._column_deferred:
+                return Markup(u'<span class="deferred-value" data-role="deferred-value" '
+                              u'data-id="%s" data-column="%s">&hellip;</span>') % (
+                    self.get_pk_value(model), name)
+
+            return get_value(context, model, name)
+
+        return get_deferred_value
+
+    def _get_timed_list_value(self, total):
+        """
+            Return `get_list_value` that adds time spent formatting values
+            to `total[0]`.
+        """
+        @contextfunction
+        def get_value(context, model, name):
+            start = perf_counter()
+
+            try:
+                return self.get_list_value(context, model, name)
+            finally:
+                total[0] += perf_counter() - start
+
+        return get_value
+
+    def _list_phase(self, phase):
+        """
+            Return context manager that measures time spent in the block as
+            a list view phase, for example `count` or `fetch`.
+
+            :param phase:
+                Phase name
+        """
+        return self._metrics.time_phase(self.endpoint, phase)
+
+    def _check_slow_list(self, view_args, sort_column, duration):
+        """
+            Capture slow list query.
+
+            :param view_args:
+                List arguments
+            :param sort_column:
+                Sort column name
+            :param duration:
+                Time spent in `get_list`, in seconds
+        """
+        slow_query_log = self.slow_query_log
+
+        if not slow_query_log.is_slow(self, duration):
+            return
+
+        skipped = slow_query_log.should_capture(self.endpoint)
+        if skipped is None:
+            return
+
+        statement = plan = None
+
+        if slow_query_log.explain:
+            try:
+                statement, plan = self.explain_list(view_args.page, sort_column,
+                                                    view_args.sort_desc, view_args.search,
+                                                    view_args.filters)
+            except NotImplementedError:
+                pass
+            except Exception:
+                log.exception('Failed to explain slow list query of %s', self.endpoint)
+
+        entry = slowlog.SlowQuery(self.endpoint, duration,
+                                  slowlog.normalize_view_args(self, view_args, sort_column),
+                                  statement, plan, skipped)
+        slow_query_log.add(entry)
+
+    def _get_list_totals(self, search, filters, compute=None):
+        """
+            Return tuple of the count and the summaries of the list for the
+            search and filters.
+
+            Totals are kept for the duration of the request, so the list
+            view does not compute them twice, and for `list_totals_cache_ttl`
+            seconds if it is set.
+
+            :param search:
+                Search query
+            :param filters:
+                List of filter tuples
+            :param compute:
+                Function that computes the totals. If `None`, only cached
+                totals are returned.
+        """
+        key = self.get_list_totals_cache_key(search, filters)
+        request_key = ('list_totals', self.endpoint, key)
+
+        request_cache = get_request_cache()
+
+        if request_cache is not None and request_key in request_cache:
+            return request_cache[request_key]
+
+        cache = self._list_totals_cache
+        totals = cache.get(key) if cache is not None else None
+
+        if totals is not None:
+            self._metrics.cache_hit('list_totals')
+        elif compute is not None:
+            if cache is not None:
+                self._metrics.cache_miss('list_totals')
+
+            totals = compute()
+
+            if cache is not None:
+                cache.set(key, totals)
+        else:
+            return None
+
+        if request_cache is not None:
+            request_cache[request_key] = totals
+
+        return totals
+
+    def get_list_totals_cache_key(self, search, filters):
+        """
+            Return hashable key of the list count and summaries in the
+            `list_totals_cache_ttl` cache.
+
+            Override to add everything else that changes the rows of the list,
+            for example the user if `get_query` filters rows per user::
+
+                class MyModelView(BaseModelView):
+                    def get_list_totals_cache_key(self, search, filters):
+                        key = super(MyModelView, self).get_list_totals_cache_key(search, filters)
+                        return key + (get_current_request().authenticated_userid,)
+
+            :param search:
+                Search query
+            :param filters:
+                List of filter tuples
+        """
+        return (search or None, tuple(tuple(flt) for flt in filters or ()))
+
+    def get_list_summaries(self, search, filters):
+        """
+            Return summaries of the list columns computed by `get_list` with
+            the same search and filters, as a dictionary of column name to
+            a dictionary of function name and value. Returns `None` if the
+            summaries were not computed.
+
+            :param search:
+                Search query
+            :param filters:
+                List of filter tuples
+        """
+        if not self._column_summaries:
+            return None
+
+        totals = self._get_list_totals(search, filters)
+
+        return totals[1] if totals is not None else None
+
+    def get_summary_label(self, function):
+        """
+            Return label of a summary function.
+
+            :param function:
+                Function name, for example `sum`
+        """
+        if function == 'sum':
+            return gettext('Sum')
+        elif function == 'avg':
+            return gettext('Average')
+        elif function == 'min':
+            return gettext('Minimum')
+
+        return gettext('Maximum')
+
+    def get_summary_value(self, name, function, value):
+        """
+            Return summary value to be displayed in the list table footer.
+            Applies `column_type_formatters` by default.
+
+            :param name:
+                Column name
+            :param function:
+                Function name, for example `sum`
+            :param value:
+                Summary value
+        """
+        for typeobj, formatter in self.column_type_formatters.items():
+            if isinstance(value, typeobj):
+                return formatter(self, value)
+
+        return value
+
+    def _format_list_summaries(self, summaries):
+        """
+            Return dictionary of column name to a list of summary label and
+            formatted value tuples for the list template.
+        """
+        result = {}
+
+        for name, functions in iteritems(self._column_summaries):
+            values = summaries.get(name) or {}
+
+            result[name] = [(self.get_summary_label(function),
+                             self.get_summary_value(name, function, values.get(function)))
+                            for function in functions]
+
+        return result
+
     @contextfunction
     def get_list_value(self, context, model, name):
         """
@@ -1439,6 +2036,12 @@ class BaseModelView(BaseView, ActionsMixin):
         else:
             value = self._get_field_value(model, name)
 
+            if name in self._column_truncate:
+                value = self._format_truncated(model, name, value)
+
+                if isinstance(value, Markup):
+                    return value
+
         choices_map = self._column_choices_map.get(name, {})
         if choices_map:
             return choices_map.get(value) or value
@@ -1502,10 +2105,25 @@ class BaseModelView(BaseView, ActionsMixin):
         if sort_column is not None:
             sort_column = sort_column[0]
 
+        metrics = self._metrics
+
         # Get count and data
+        start = time.time()
+
         count, data = self.get_list(view_args.page, sort_column, view_args.sort_desc,
                                     view_args.search, view_args.filters)
 
+        if self.slow_query_log is not None:
+            self._check_slow_list(view_args, sort_column, time.time() - start)
+
+        if metrics.enabled and hasattr(data, '__len__'):
+            metrics.add_rows(self.endpoint, len(data))
+
+        summaries = self.get_list_summaries(view_args.search, view_args.filters)
+
+        if summaries is not None:
+            summaries = self._format_list_summaries(summaries)
+
         # Calculate number of pages
         if count is not None:
             num_pages = count // self.page_size
@@ -1539,7 +2157,23 @@ class BaseModelView(BaseView, ActionsMixin):
                                                               search=None,
                                                               filters=None))
 
-        return self.render(
+        get_value = self.get_list_value
+
+        # Streamed list is rendered after the view returns, so only
+        # the regular render is measured
+        measure_render = metrics.enabled and not self.list_streaming
+
+        if measure_render:
+            format_time = [0]
+            get_value = self._get_timed_list_value(format_time)
+            start = perf_counter()
+
+        if self._column_deferred:
+            get_value = self._get_deferred_list_value(get_value)
+
+        render = self.render_streamed if self.list_streaming else self.render
+
+        response = render(
             self.list_template,
             data=data,
             form=form,
@@ -1557,6 +2191,9 @@ class BaseModelView(BaseView, ActionsMixin):
             page=view_args.page,
             page_size=self.page_size,
 
+            # Summaries
+            summaries=summaries,
+
             # Sorting
             sort_column=view_args.sort,
             sort_desc=view_args.sort_desc,
@@ -1579,10 +2216,19 @@ class BaseModelView(BaseView, ActionsMixin):
             # Misc
             enumerate=enumerate,
             get_pk_value=self.get_pk_value,
-            get_value=self.get_list_value,
+            get_value=get_value,
             return_url=self._get_list_url(view_args),
         )
 
+        if measure_render:
+            # Values are formatted while the template is rendered, so the
+            # render phase excludes the format phase
+            duration = perf_counter() - start
+            metrics.observe_phase(self.endpoint, 'render', duration - format_time[0])
+            metrics.observe_phase(self.endpoint, 'format', format_time[0])
+
+        return response
+
     @expose('/new/', methods=('GET', 'POST'))
     def create_view(self):
         """
@@ -1709,16 +2355,75 @@ class BaseModelView(BaseView, ActionsMixin):
         request = get_current_request()
         name = request.GET.get('name')
         query = request.GET.get('query')
-        offset = request.GET.get('offset', type=int)
-        limit = request.GET.get('limit', 10, type=int)
-
         loader = self._form_ajax_refs.get(name)
 
         if not loader:
             raise HTTPNotFound()
 
+        try:
+            offset = int(request.GET['offset']) if 'offset' in request.GET else None
+            limit = int(request.GET.get('limit', 10))
+        except ValueError:
+            raise HTTPBadRequest()
+
+        if (offset is not None and offset < 0) or limit < 1:
+            raise HTTPBadRequest()
+
+        # No more than a page of models
+        limit = min(limit, self.page_size)
+
         data = [loader.format(m) for m in loader.get_list(query, offset, limit)]
-        return Response(json.dumps(data), content_type='application/json')
+        return Response(json.dumps(data), content_type='application/json', charset='utf-8')
+
+    @expose('/ajax/value/')
+    def ajax_value(self):
+        """
+            Returns full value of a truncated list column.
+        """
+        request = get_current_request()
+        id = request.GET.get('id')
+        name = request.GET.get('name')
+
+        if id is None or name not in self._column_truncate:
+            raise HTTPNotFound()
+
+        model = self.get_one(id)
+
+        if model is None:
+            raise HTTPNotFound()
+
+        value = self._get_full_value(model, name)
+
+        if isinstance(value, bytes):
+            return Response(body=value, content_type='application/octet-stream',
+                            content_disposition='attachment')
+
+        return Response(as_unicode(value) if value is not None else u'',
+                        content_type='text/plain', charset='utf-8')
+
+    @expose('/ajax/deferred/')
+    def ajax_deferred(self):
+        """
+            Returns formatted values of the deferred list columns of the
+            models with given ids, as a JSON object of id to an object of
+            column name to HTML.
+        """
+        if not self._column_deferred:
+            raise HTTPNotFound()
+
+        request = get_current_request()
+
+        # No more than a page of models
+        ids = request.GET.getall('id')[:self.page_size]
+
+        data = {}
+
+        for model in self.get_many(ids) if ids else ():
+            data[as_unicode(self.get_pk_value(model))] = dict(
+                (name, as_unicode(Markup.escape(self.get_list_value(None, model, name))))
+                for name in self._column_deferred)
+
+        return Response(json.dumps(data), content_type='application/json', charset='utf-8')
 
     @expose('/ajax/update/', methods=('POST',))
     def ajax_update(self):
@@ -1733,7 +2438,7 @@ class BaseModelView(BaseView, ActionsMixin):
 
         # prevent validation issues due to submitting a single field
         # delete all fields except the field being submitted
-        for field in form:
+        for field in list(form):
             # only the submitted field has a positive last_index
             if getattr(field, 'last_index', 0):
                 record = self.get_one(str(field.last_index))
@@ -1743,22 +2448,22 @@ class BaseModelView(BaseView, ActionsMixin):
                 form.__delitem__(field.name)
 
         if record is None:
-            return gettext('Failed to update record. %(error)s', error=''), 500
+            return Response(gettext('Failed to update record. %(error)s', error=''), status=500)
 
         if self.validate_form(form):
             if self.update_model(form, record):
                 # Success
-                return gettext('Record was successfully saved.')
+                return Response(gettext('Record was successfully saved.'))
             else:
                 # Error: No records changed, or problem saving to database.
                 msgs = ", ".join([msg for msg in get_flashed_messages()])
-                return gettext('Failed to update record. %(error)s',
-                               error=msgs), 500
+                return Response(gettext('Failed to update record. %(error)s',
+                                        error=msgs), status=500)
         else:
             for field in form:
                 for error in field.errors:
                     # return validation error to x-editable
                     if isinstance(error, list):
-                        return ", ".join(error), 500
+                        return Response(", ".join(error), status=500)
                     else:
-                        return error, 500
+                        return Response(error, status=500)
@@ -44,6 +44,43 @@ def list_formatter(view, values):
     return u', '.join(text_type(v) for v in values)
 
 
+class TruncatedValue(object):
+    """
+        Beginning of a long list column value, loaded in place of the full
+        value. See `column_truncate_list` of the model view.
+    """
+    __slots__ = ('value', 'length', '_truncated')
+
+    def __init__(self, value, length, truncated=None):
+        """
+            Constructor.
+
+            :param value:
+                Beginning of the value
+            :param length:
+                Length of the full value, or `None` if it is unknown
+            :param truncated:
+                Whether the value was truncated. Computed from `length`
+                if not set.
+        """
+        self.value = value
+        self.length = length
+        self._truncated = truncated
+
+    @property
+    def truncated(self):
+        """
+            `True` if the full value is longer than the loaded value.
+        """
+        if self._truncated is not None:
+            return self._truncated
+
+        if self.length is None:
+            return False
+
+        return self.value is None or self.length > len(self.value)
+
+
 BASE_FORMATTERS = {
     type(None): empty_formatter,
     bool: bool_formatter,
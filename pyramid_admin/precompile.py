@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+    pyramid_admin.precompile
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Ahead-of-time compilation of admin templates into the bytecode cache
+    configured with the `bytecode_cache_dir` argument of
+    :class:`~pyramid_admin.base.Admin`.
+
+    Usage::
+
+        python -m pyramid_admin.precompile myapp:create_app
+        python -m pyramid_admin.precompile --ini production.ini
+
+    Run it when building the deployment, so workers load compiled templates
+    instead of compiling them on the first request.
+
+    Templates are compiled with the environment of the application, so the
+    cached code matches its settings (autoescaping, extensions, etc). Cache
+    entries are keyed by template name and file location and are checked
+    against the template source, so changed or overridden templates are
+    compiled again at runtime.
+"""
+import argparse
+import sys
+
+from pyramid.path import DottedNameResolver
+
+from pyramid_admin.diagnostics import find_admins
+from pyramid_admin.templating import get_environment
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pyramid_admin.precompile',
+                                     description='Compile admin templates into the bytecode cache.')
+    parser.add_argument('factory', nargs='?',
+                        help='Dotted name of the application factory, e.g. myapp:create_app')
+    parser.add_argument('--ini', help='PasteDeploy configuration file to load the application from')
+    parser.add_argument('--app-name', default=None, help='Application section in the configuration file')
+
+    args = parser.parse_args(argv)
+
+    if args.ini:
+        from pyramid.paster import get_app
+
+        app = get_app(args.ini, args.app_name)
+    elif args.factory:
+        app = DottedNameResolver().resolve(args.factory)()
+    else:
+        parser.error('Either factory or --ini is required')
+
+    admins = find_admins(app)
+
+    if not admins:
+        sys.stderr.write('No admin instances found\n')
+        return 1
+
+    for admin in admins:
+        # Registers the Jinja2 environment
+        admin.config.commit()
+
+        env = get_environment(admin.config.registry)
+
+        if env is None or env.bytecode_cache is None:
+            sys.stderr.write('Admin %s has no bytecode cache configured\n' % admin.endpoint)
+            return 1
+
+        sys.stdout.write('%s: compiled %d templates\n' % (admin.endpoint, admin.compile_templates()))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
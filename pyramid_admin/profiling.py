@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+"""
+    pyramid_admin.profiling
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    On-demand profiling of admin view requests.
+
+    An authorized request with the ``_profile`` query parameter runs the view
+    under `cProfile` and a stack sampler. Both results are stored in a
+    directory:
+
+    - ``.pstats``: `cProfile` statistics, for `pstats` or `snakeviz`
+    - ``.collapsed``: sampled stacks in the collapsed format of
+      `flamegraph.pl` and `speedscope`
+
+    Optionally, a small fraction of all admin requests is sampled with a
+    low-frequency stack sampler. The stacks are aggregated in memory, so
+    there is no per-request storage and negligible overhead::
+
+        from pyramid_admin.profiling import RequestProfiler, ProfilesView
+
+        profiler = RequestProfiler('/var/tmp/admin-profiles',
+                                   is_authorized=lambda request: request.has_permission('profile'),
+                                   sample_rate=0.01)
+
+        admin = Admin(config, profiler=profiler)
+        admin.add_view(ProfilesView())
+"""
+import cProfile
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+
+from pyramid.httpexceptions import HTTPFound, HTTPNotFound
+from pyramid.response import FileResponse, Response
+from pyramid.threadlocal import get_current_request
+
+from ._compat import iteritems
+from .babel import lazy_gettext
+from .base import BaseView, expose
+
+
+# Set up logger
+log = logging.getLogger("pyramid-admin.profiling")
+
+
+HEADER_NAME = 'X-Admin-Profile'
+
+_name_re = re.compile(r'^[\w.-]+$')
+
+
+def format_frame(frame):
+    code = frame.f_code
+    return '%s:%s' % (frame.f_globals.get('__name__', '?'), code.co_name)
+
+
+def collapse_stack(frame, limit=128):
+    """
+        Return stack of the frame as a ``outer;...;inner`` string.
+
+        :param frame:
+            Innermost frame
+        :param limit:
+            Maximum stack depth
+    """
+    names = []
+
+    while frame is not None and len(names) < limit:
+        names.append(format_frame(frame))
+        frame = frame.f_back
+
+    names.reverse()
+    return ';'.join(names)
+
+
+def format_collapsed(stacks):
+    """
+        Return stacks in the collapsed format, one ``stack count`` per line.
+
+        :param stacks:
+            Dictionary of stack strings to sample counts
+    """
+    return ''.join('%s %d\n' % (stack, count)
+                   for stack, count in sorted(iteritems(stacks)))
+
+
+class StackSampler(object):
+    """
+        Samples stacks of the registered threads from a background thread.
+    """
+    def __init__(self, interval=0.01):
+        """
+            Constructor.
+
+            :param interval:
+                Time between samples, in seconds
+        """
+        self.interval = interval
+
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, thread_id, stacks):
+        """
+            Start sampling the thread.
+
+            :param thread_id:
+                Thread identifier
+            :param stacks:
+                Dictionary the sampled stacks are counted in
+        """
+        with self._lock:
+            self._threads[thread_id] = stacks
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run,
+                                                name='pyramid-admin-profiler')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def remove(self, thread_id):
+        with self._lock:
+            self._threads.pop(thread_id, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+
+            with self._lock:
+                if not self._threads:
+                    # Exit when idle, started again by `add`
+                    self._thread = None
+                    return
+
+                threads = list(iteritems(self._threads))
+
+            frames = sys._current_frames()
+
+            for thread_id, stacks in threads:
+                frame = frames.get(thread_id)
+
+                if frame is not None:
+                    stack = collapse_stack(frame)
+                    stacks[stack] = stacks.get(stack, 0) + 1
+
+
+class RequestProfiler(object):
+    """
+        Runs admin views under the profiler.
+    """
+    def __init__(self, directory, is_authorized=None, param='_profile',
+                 sample_rate=0, sample_interval=0.01, profile_interval=0.001,
+                 max_profiles=50):
+        """
+            Constructor.
+
+            :param directory:
+                Directory to store profiles in. Created if it does not exist.
+            :param is_authorized:
+                Function that takes the request and returns `True` if it is
+                allowed to request profiling. By default, profiling is allowed
+                only when the ``debug`` setting is on.
+            :param param:
+                Query parameter that requests profiling
+            :param sample_rate:
+                Fraction of admin requests sampled into the aggregated
+                stacks, from 0 to 1. Disabled by default.
+            :param sample_interval:
+                Time between stack samples of sampled requests, in seconds
+            :param profile_interval:
+                Time between stack samples of profiled requests, in seconds
+            :param max_profiles:
+                Number of stored profiles to keep. Older profiles are removed.
+        """
+        self.directory = directory
+        self.is_authorized = is_authorized or self._is_debug
+        self.param = param
+        self.sample_rate = sample_rate
+        self.max_profiles = max_profiles
+
+        self.stacks = {}
+
+        self._sampler = StackSampler(sample_interval)
+        self._profile_sampler = StackSampler(profile_interval)
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    @staticmethod
+    def _is_debug(request):
+        return bool(request.registry.settings.get('debug'))
+
+    def run(self, view, fn, *args, **kwargs):
+        """
+            Run the view method, profiling it if requested.
+
+            :param view:
+                Admin view
+            :param fn:
+                View method
+            :param args:
+                Positional arguments
+            :param kwargs:
+                Keyword arguments
+        """
+        request = get_current_request()
+
+        if request is not None and self.param in request.GET and self.is_authorized(request):
+            return self.profile(view, fn, *args, **kwargs)
+
+        if self.sample_rate and random.random() < self.sample_rate:
+            return self.sample(view, fn, *args, **kwargs)
+
+        return view._run_view(fn, *args, **kwargs)
+
+    def sample(self, view, fn, *args, **kwargs):
+        """
+            Run the view method, aggregating its stacks in `stacks`.
+        """
+        thread_id = threading.current_thread().ident
+        self._sampler.add(thread_id, self.stacks)
+
+        try:
+            return view._run_view(fn, *args, **kwargs)
+        finally:
+            self._sampler.remove(thread_id)
+
+    def profile(self, view, fn, *args, **kwargs):
+        """
+            Run the view method under the profiler and store the results.
+            The profile name is added to the response headers.
+        """
+        stacks = {}
+        profiler = cProfile.Profile()
+
+        thread_id = threading.current_thread().ident
+        self._profile_sampler.add(thread_id, stacks)
+
+        try:
+            response = profiler.runcall(view._run_view, fn, *args, **kwargs)
+        finally:
+            self._profile_sampler.remove(thread_id)
+
+        name = self.save(view.endpoint, fn.__name__, profiler, stacks)
+
+        headers = getattr(response, 'headers', None)
+        if headers is not None:
+            headers[HEADER_NAME] = name
+
+        return response
+
+    def save(self, endpoint, method, profiler, stacks):
+        """
+            Store profile and return its name.
+        """
+        name = '%s-%s-%s' % (datetime.utcnow().strftime('%Y%m%d%H%M%S%f'), endpoint, method)
+        name = re.sub(r'[^\w.-]', '_', name)
+
+        path = os.path.join(self.directory, name)
+
+        profiler.dump_stats(path + '.pstats')
+
+        with open(path + '.collapsed', 'w') as fp:
+            fp.write(format_collapsed(stacks))
+
+        log.info('Stored profile %s', name)
+
+        self._cleanup()
+
+        return name
+
+    def _cleanup(self):
+        profiles = self.list_profiles()
+
+        for name, _ in profiles[self.max_profiles:]:
+            for ext in ('.pstats', '.collapsed'):
+                try:
+                    os.remove(os.path.join(self.directory, name + ext))
+                except OSError:
+                    pass
+
+    def list_profiles(self):
+        """
+            Return list of ``(name, modification time)`` of the stored
+            profiles, most recent first.
+        """
+        profiles = []
+
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.pstats'):
+                path = os.path.join(self.directory, filename)
+                profiles.append((filename[:-len('.pstats')], os.path.getmtime(path)))
+
+        profiles.sort(key=lambda p: (p[1], p[0]), reverse=True)
+        return profiles
+
+    def get_path(self, name, ext):
+        """
+            Return path of the stored profile file or `None` if there is
+            no such profile.
+
+            :param name:
+                Profile name
+            :param ext:
+                ``.pstats`` or ``.collapsed``
+        """
+        if not _name_re.match(name) or ext not in ('.pstats', '.collapsed'):
+            return None
+
+        path = os.path.join(self.directory, name + ext)
+
+        return path if os.path.isfile(path) else None
+
+    def get_aggregated(self):
+        """
+            Return aggregated stacks of sampled requests in the
+            collapsed format.
+        """
+        return format_collapsed(dict(self.stacks))
+
+    def reset(self):
+        self.stacks.clear()
+
+
+class ProfilesView(BaseView):
+    """
+        Admin page to download stored profiles and aggregated stacks.
+
+        Only requests authorized by the profiler of the admin can access
+        the page.
+    """
+    list_template = 'admin/profiling/index.jinja2'
+
+    def __init__(self, name=None, category=None, endpoint=None, url=None):
+        """
+            Constructor.
+
+            :param name:
+                View name. Defaults to 'Profiles'.
+            :param category:
+                View category
+            :param endpoint:
+                Base endpoint. If not provided, will use the class name.
+            :param url:
+                Base URL. If not provided, will use endpoint as a URL.
+        """
+        super(ProfilesView, self).__init__(name or lazy_gettext('Profiles'),
+                                           category, endpoint, url)
+
+    def is_accessible(self):
+        profiler = self.admin.profiler
+        return profiler is not None and profiler.is_authorized(get_current_request())
+
+    @property
+    def profiler(self):
+        profiler = self.admin.profiler
+
+        if profiler is None:
+            raise HTTPNotFound()
+
+        return profiler
+
+    @expose('/')
+    def index(self):
+        profiler = self.profiler
+
+        profiles = [(name, datetime.utcfromtimestamp(mtime))
+                    for name, mtime in profiler.list_profiles()]
+
+        return self.render(self.list_template,
+                           profiles=profiles,
+                           profiler=profiler,
+                           aggregated_count=sum(profiler.stacks.values()))
+
+    @expose('/download/')
+    def download(self):
+        request = get_current_request()
+
+        name = request.GET.get('name', '')
+        ext = request.GET.get('ext', '')
+
+        path = self.profiler.get_path(name, '.' + ext)
+
+        if path is None:
+            raise HTTPNotFound()
+
+        response = FileResponse(path, request=request,
+                                content_type='application/octet-stream')
+        response.content_disposition = 'attachment; filename="%s.%s"' % (name, ext)
+
+        return response
+
+    @expose('/aggregated/')
+    def aggregated(self):
+        response = Response(self.profiler.get_aggregated(), content_type='text/plain',
+                            charset='utf-8')
+        response.content_disposition = 'attachment; filename="aggregated.collapsed"'
+
+        return response
+
+    @expose('/reset/', methods=('POST',))
+    def reset(self):
+        self.profiler.reset()
+        return HTTPFound(location=self.get_url('.index'))
@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+    pyramid_admin.queries
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Request-scoped database query inspector.
+
+    When the ``debug`` setting is on, every admin view request collects the
+    queries issued by instrumented backends, with their duration and the
+    view method (or formatter) that caused them. The totals are sent in the
+    ``X-Admin-Queries`` response header and the queries are listed at the
+    bottom of the admin pages.
+
+    Backends are instrumented explicitly::
+
+        from pyramid_admin.contrib.sqla.queries import instrument_engine
+        instrument_engine(engine)
+
+    See also :mod:`pyramid_admin.contrib.pymongo.queries` (used by
+    pymongo and mongoengine) and :mod:`pyramid_admin.contrib.peewee.queries`.
+
+    Tests can guard views against N+1 queries with :func:`assert_max_queries`,
+    which works without the ``debug`` setting::
+
+        with assert_max_queries(3):
+            client.get('/admin/post/')
+"""
+import logging
+import sys
+import threading
+from contextlib import contextmanager
+
+from . import json
+
+
+# Set up logger
+log = logging.getLogger("pyramid-admin.queries")
+
+
+HEADER_NAME = 'X-Admin-Queries'
+
+# Frames of these modules are not reported as query sources
+IGNORED_MODULES = ('sqlalchemy', 'pymongo', 'bson', 'mongoengine', 'peewee', 'playhouse',
+                   'pyramid_admin.queries',
+                   'pyramid_admin.contrib.sqla.queries',
+                   'pyramid_admin.contrib.pymongo.queries',
+                   'pyramid_admin.contrib.peewee.queries')
+
+# How many frames to inspect when looking for the query source
+MAX_SOURCE_DEPTH = 64
+
+# Active captures of the thread, see `capture_queries`
+_captures = threading.local()
+
+
+class QueryRecord(object):
+    """
+        Recorded query.
+    """
+    __slots__ = ('backend', 'statement', 'duration', 'source', 'location')
+
+    def __init__(self, backend, statement, duration, source=None, location=None):
+        """
+            Constructor.
+
+            :param backend:
+                Backend name, for example `sqlalchemy`
+            :param statement:
+                Query text
+            :param duration:
+                Duration, in seconds
+            :param source:
+                Admin view method that issued the query, for example
+                ``UserView.get_list``
+            :param location:
+                Innermost application frame, ``file:line in function``
+        """
+        self.backend = backend
+        self.statement = statement
+        self.duration = duration
+        self.source = source
+        self.location = location
+
+    def to_dict(self):
+        return dict(backend=self.backend,
+                    statement=self.statement,
+                    duration=self.duration,
+                    source=self.source,
+                    location=self.location)
+
+
+class QueryLog(object):
+    """
+        Queries recorded during the request.
+    """
+    def __init__(self):
+        self.queries = []
+
+    def __len__(self):
+        return len(self.queries)
+
+    def __iter__(self):
+        return iter(self.queries)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_time(self):
+        return sum(q.duration for q in self.queries)
+
+    def add(self, record):
+        self.queries.append(record)
+
+    def summary(self):
+        """
+            Return dictionary with query count and total time, overall
+            and per backend.
+        """
+        backends = {}
+
+        for q in self.queries:
+            stats = backends.setdefault(q.backend, {'count': 0, 'time': 0})
+            stats['count'] += 1
+            stats['time'] += q.duration
+
+        return {
+            'count': self.count,
+            'time': self.total_time,
+            'backends': backends,
+        }
+
+    def to_dict(self):
+        result = self.summary()
+        result['queries'] = [q.to_dict() for q in self.queries]
+        return result
+
+
+def start(request=None):
+    """
+        Start recording queries for the request and return the log.
+
+        :param request:
+            Request. Defaults to the current request.
+    """
+    cache = get_request_cache(request)
+
+    if cache is None:
+        return None
+
+    query_log = cache.get('query_log')
+    if query_log is None:
+        query_log = cache['query_log'] = QueryLog()
+
+    return query_log
+
+
+def get_query_log(request=None):
+    """
+        Return query log of the request or `None` if queries
+        are not recorded.
+
+        :param request:
+            Request. Defaults to the current request.
+    """
+    # Called for every query, so do not create the cache for requests
+    # that do not record queries
+    cache = get_request_cache(request, create=False)
+
+    if cache is None:
+        return None
+
+    return cache.get('query_log')
+
+
+def is_recording():
+    """
+        Return `True` if queries of the current thread are recorded, by
+        the request query log or a capture.
+    """
+    return bool(getattr(_captures, 'logs', None)) or get_query_log() is not None
+
+
+def find_source(frame):
+    """
+        Return admin view method and innermost application frame that
+        lead to the query.
+
+        :param frame:
+            Frame to start looking from
+    """
+    source = location = None
+    depth = 0
+
+    while frame is not None and depth < MAX_SOURCE_DEPTH:
+        module = frame.f_globals.get('__name__') or ''
+
+        if not module.startswith(IGNORED_MODULES):
+            code = frame.f_code
+
+            if location is None:
+                location = '%s:%d in %s' % (code.co_filename, frame.f_lineno, code.co_name)
+
+            view = frame.f_locals.get('self')
+            if isinstance(view, base.BaseView):
+                source = '%s.%s' % (type(view).__name__, code.co_name)
+                break
+
+        frame = frame.f_back
+        depth += 1
+
+    return source, location
+
+
+def record(backend, statement, duration):
+    """
+        Record query if the current request collects queries or a
+        capture is active.
+
+        Called by the backend instrumentation.
+
+        :param backend:
+            Backend name
+        :param statement:
+            Query text
+        :param duration:
+            Duration, in seconds
+    """
+    query_log = get_query_log()
+    captures = getattr(_captures, 'logs', None)
+
+    if query_log is None and not captures:
+        return
+
+    source, location = find_source(sys._getframe(1))
+    query = QueryRecord(backend, statement, duration, source, location)
+
+    if query_log is not None:
+        query_log.add(query)
+
+    for capture in captures or ():
+        capture.add(query)
+
+
+@contextmanager
+def capture_queries():
+    """
+        Record queries executed by the current thread in the block, in and
+        outside of requests, and return them as a :class:`QueryLog`::
+
+            with capture_queries() as query_log:
+                client.get('/admin/user/')
+
+            print(query_log.count)
+    """
+    query_log = QueryLog()
+
+    logs = getattr(_captures, 'logs', None)
+    if logs is None:
+        logs = _captures.logs = []
+
+    logs.append(query_log)
+
+    try:
+        yield query_log
+    finally:
+        logs.remove(query_log)
+
+
+@contextmanager
+def assert_max_queries(count, backend=None):
+    """
+        Fail with `AssertionError` if the block executes more than `count`
+        queries. The error lists the queries and the view methods that
+        executed them.
+
+        Use a budget that does not depend on the number of rows, so that
+        queries per row (N+1) fail the test::
+
+            with assert_max_queries(2):
+                client.get('/admin/post/')
+
+        :param count:
+            Maximum number of queries
+        :param backend:
+            Count only queries of this backend, for example ``sqlalchemy``
+    """
+    with capture_queries() as query_log:
+        yield query_log
+
+    executed = [q for q in query_log if backend is None or q.backend == backend]
+
+    if len(executed) > count:
+        raise AssertionError('%d queries executed, expected at most %d:\n%s' % (
+            len(executed), count,
+            '\n'.join('%d. %s [%s]' % (i + 1, q.statement, q.source or q.location)
+                      for i, q in enumerate(executed))))
+
+
+def add_header(response, query_log):
+    """
+        Add query totals to the response headers.
+
+        Queries issued while a streamed response is generated are not
+        included.
+
+        :param response:
+            Response
+        :param query_log:
+            Query log
+    """
+    headers = getattr(response, 'headers', None)
+
+    if headers is not None:
+        headers[HEADER_NAME] = json.dumps(query_log.summary())
+
+    if query_log.count:
+        log.debug('%d queries in %.1f ms', query_log.count, query_log.total_time * 1000)
+
+
+# lazy imports
+from . import base
+from .helpers import get_request_cache
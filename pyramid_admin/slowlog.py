@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+    pyramid_admin.slowlog
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Slow list query log.
+
+    Model views time `get_list` in the list view. When it takes longer than
+    the threshold, the list arguments (filters, search, sort, page), the
+    query and its execution plan (``EXPLAIN`` or MongoDB ``explain()``) are
+    captured and logged.
+
+    Capturing runs the list query builder and the ``EXPLAIN`` again, so
+    captures are sampled and rate-limited per view, and slow lists that are
+    not captured are only counted::
+
+        from pyramid_admin.slowlog import SlowQueryLog, SlowQueryView
+
+        slow_query_log = SlowQueryLog(threshold=0.5)
+
+        class MyModelView(ModelView):
+            slow_query_log = slow_query_log
+
+        admin.add_view(SlowQueryView(slow_query_log))
+
+    Captured queries contain search terms and filter values, so
+    :class:`SlowQueryView` is accessible only in debug mode unless it is
+    given an ``is_authorized`` function.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from pyramid.threadlocal import get_current_request
+
+from ._compat import as_unicode
+from .babel import lazy_gettext
+from .base import BaseView, expose
+
+
+# Set up logger
+log = logging.getLogger("pyramid-admin.slowlog")
+
+
+class SlowQuery(object):
+    """
+        Captured slow list query.
+    """
+    def __init__(self, endpoint, duration, args, statement=None, plan=None, skipped=0):
+        """
+            Constructor.
+
+            :param endpoint:
+                Model view endpoint
+            :param duration:
+                Time spent in `get_list`, in seconds
+            :param args:
+                Normalized list arguments, see :func:`normalize_view_args`
+            :param statement:
+                Query text
+            :param plan:
+                Query plan text
+            :param skipped:
+                Number of slow lists of the view that were not captured
+                since the previous capture
+        """
+        self.timestamp = datetime.utcnow()
+        self.endpoint = endpoint
+        self.duration = duration
+        self.args = args
+        self.statement = statement
+        self.plan = plan
+        self.skipped = skipped
+
+    def to_dict(self):
+        return dict(timestamp=self.timestamp.isoformat(),
+                    endpoint=self.endpoint,
+                    duration=self.duration,
+                    args=self.args,
+                    statement=self.statement,
+                    plan=self.plan,
+                    skipped=self.skipped)
+
+
+def normalize_view_args(view, view_args, sort_column):
+    """
+        Return list arguments as a dictionary of plain values, with filters
+        identified by their column and operation instead of the index.
+
+        :param view:
+            Model view
+        :param view_args:
+            :class:`~pyramid_admin.model.base.ViewArgs` instance
+        :param sort_column:
+            Sort column name
+    """
+    filters = []
+
+    for idx, name, value in view_args.filters or ():
+        flt = view._filters[idx]
+        filters.append({
+            'column': as_unicode(flt.name),
+            'operation': as_unicode(flt.operation()),
+            'value': value,
+        })
+
+    return {
+        'page': view_args.page,
+        'sort': sort_column,
+        'sort_desc': view_args.sort_desc,
+        'search': view_args.search,
+        'filters': filters,
+    }
+
+
+class SlowQueryLog(object):
+    """
+        Keeps recently captured slow list queries in memory.
+    """
+    def __init__(self, threshold=1.0, max_entries=100, sample_rate=1.0,
+                 min_interval=60, explain=True):
+        """
+            Constructor.
+
+            :param threshold:
+                Default threshold, in seconds. Model views can override it
+                with `slow_query_threshold`.
+            :param max_entries:
+                Number of captured queries to keep
+            :param sample_rate:
+                Fraction of slow lists that are captured, from 0 to 1
+            :param min_interval:
+                Minimum number of seconds between two captures of the same view
+            :param explain:
+                Capture query and its plan. If disabled, only the list
+                arguments and time are logged.
+        """
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.min_interval = min_interval
+        self.explain = explain
+
+        self._entries = deque(maxlen=max_entries)
+        self._last_capture = {}
+        self._skipped = {}
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self):
+        """
+            Captured queries, most recent first.
+        """
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def get_threshold(self, view):
+        """
+            Return threshold for the view.
+
+            :param view:
+                Model view
+        """
+        threshold = getattr(view, 'slow_query_threshold', None)
+        return self.threshold if threshold is None else threshold
+
+    def is_slow(self, view, duration):
+        return duration >= self.get_threshold(view)
+
+    def should_capture(self, endpoint):
+        """
+            Decide if slow list of the view is captured, based on the sample
+            rate and time since the previous capture. Returns number of
+            skipped lists since the previous capture or `None` if the list
+            should not be captured.
+
+            :param endpoint:
+                Model view endpoint
+        """
+        now = time.time()
+
+        with self._lock:
+            last = self._last_capture.get(endpoint)
+
+            if ((last is not None and now - last < self.min_interval) or
+                    random.random() >= self.sample_rate):
+                self._skipped[endpoint] = self._skipped.get(endpoint, 0) + 1
+                return None
+
+            self._last_capture[endpoint] = now
+            return self._skipped.pop(endpoint, 0)
+
+    def add(self, entry):
+        """
+            Store and log captured query.
+
+            :param entry:
+                :class:`SlowQuery` instance
+        """
+        with self._lock:
+            self._entries.append(entry)
+
+        log.warning('Slow list query in %s: %.1f ms, args: %r, skipped: %d\n%s\n%s',
+                    entry.endpoint, entry.duration * 1000, entry.args, entry.skipped,
+                    entry.statement or '', entry.plan or '')
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._last_capture.clear()
+            self._skipped.clear()
+
+
+class SlowQueryView(BaseView):
+    """
+        Admin page with recently captured slow list queries.
+    """
+    list_template = 'admin/slowlog/index.jinja2'
+
+    def __init__(self, slow_query_log,
+                 name=None, category=None, endpoint=None, url=None,
+                 is_authorized=None):
+        """
+            Constructor.
+
+            :param slow_query_log:
+                :class:`SlowQueryLog` instance
+            :param name:
+                View name. Defaults to 'Slow queries'.
+            :param category:
+                View category
+            :param endpoint:
+                Base endpoint. If not provided, will use the class name.
+            :param url:
+                Base URL. If not provided, will use endpoint as a URL.
+            :param is_authorized:
+                Function that takes the request and returns `True` if it is
+                allowed to see the captured queries. By default, the view is
+                available only when the ``debug`` setting is on.
+        """
+        super(SlowQueryView, self).__init__(name or lazy_gettext('Slow queries'),
+                                            category, endpoint, url)
+
+        self.slow_query_log = slow_query_log
+        self.is_authorized = is_authorized or self._is_debug
+
+    @staticmethod
+    def _is_debug(request):
+        return bool(request.registry.settings.get('debug'))
+
+    def is_accessible(self):
+        return self.is_authorized(get_current_request())
+
+    @expose('/')
+    def index(self):
+        return self.render(self.list_template,
+                           entries=self.slow_query_log.entries,
+                           slow_query_log=self.slow_query_log)
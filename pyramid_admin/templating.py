@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+    pyramid_admin.templating
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Helpers to access the Jinja2 environment that renders admin templates.
+
+"""
+import logging
+import os
+
+from jinja2 import FileSystemBytecodeCache, TemplateNotFound, TemplateSyntaxError
+
+from ._compat import string_types
+
+
+log = logging.getLogger("pyramid-admin.templating")
+
+TEMPLATES_PATH = os.path.join(os.path.dirname(__file__), 'templates')
+
+
+def get_environment(registry, name='.jinja2'):
+    """
+        Return Jinja2 environment registered by `pyramid_jinja2` or `None`
+        if there is no environment for the renderer.
+
+        :param registry:
+            Pyramid registry
+        :param name:
+            Renderer name
+    """
+    try:
+        from pyramid_jinja2 import IJinja2Environment
+    except ImportError:
+        return None
+
+    return registry.queryUtility(IJinja2Environment, name=name)
+
+
+def create_bytecode_cache(directory):
+    """
+        Create on-disk Jinja2 bytecode cache, creating the directory
+        if it does not exist.
+
+        :param directory:
+            Cache directory
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    return FileSystemBytecodeCache(directory)
+
+
+def setup_bytecode_cache(config, directory, name='.jinja2'):
+    """
+        Use on-disk bytecode cache for the Jinja2 environment once it is
+        created by `pyramid_jinja2`.
+
+        :param config:
+            Pyramid Configurator
+        :param directory:
+            Cache directory
+        :param name:
+            Renderer name
+    """
+    def register():
+        env = get_environment(config.registry, name)
+
+        if env is None:
+            log.warning('Jinja2 environment %s is not configured, bytecode cache is not used', name)
+            return
+
+        env.bytecode_cache = create_bytecode_cache(directory)
+
+    # Environment is registered by pyramid_jinja2 at order 0
+    config.action(None, register, order=999)
+
+
+def list_templates(template_mode):
+    """
+        Return names of the admin templates shipped for the template mode,
+        for example ``admin/model/list.jinja2``.
+
+        :param template_mode:
+            Template mode, `bootstrap2` or `bootstrap3`
+    """
+    root = os.path.join(TEMPLATES_PATH, template_mode)
+    names = []
+
+    for path, dirs, files in os.walk(os.path.join(root, 'admin')):
+        rel = os.path.relpath(path, root).replace(os.sep, '/')
+
+        for filename in files:
+            if filename.endswith('.jinja2'):
+                names.append('%s/%s' % (rel, filename))
+
+    return sorted(names)
+
+
+def get_view_templates(view):
+    """
+        Return template names configured on the view: class and instance
+        attributes ending with ``_template``.
+
+        :param view:
+            Admin view
+    """
+    names = set()
+
+    for attr in dir(view):
+        if attr.endswith('_template') and not attr.startswith('__'):
+            value = getattr(view, attr, None)
+
+            if isinstance(value, string_types) and value.endswith('.jinja2'):
+                names.add(value)
+
+    return names
+
+
+def compile_templates(env, names):
+    """
+        Load templates into the environment cache, so they are not compiled
+        on the first request. Returns number of compiled templates.
+
+        Templates that can not be found or fail to compile are skipped.
+
+        :param env:
+            Jinja2 environment
+        :param names:
+            Template names
+    """
+    compiled = 0
+
+    for name in names:
+        try:
+            env.get_template(name)
+            compiled += 1
+        except TemplateNotFound:
+            log.debug('Template %s not found, skipping', name)
+        except TemplateSyntaxError as ex:
+            log.warning('Failed to compile template %s: %s', name, ex)
+
+    return compiled
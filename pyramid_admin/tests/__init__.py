@@ -0,0 +1,60 @@
+from pyramid.config import Configurator
+from pyramid.session import SignedCookieSessionFactory
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from pyramid_admin import base
+from pyramid_admin.contrib.sqla.queries import instrument_engine
+
+
+def create_config(settings=None):
+    """
+        Create Pyramid configurator with sessions, Jinja2 and the
+        bootstrap3 admin templates.
+
+        :param settings:
+            Application settings
+    """
+    config = Configurator(settings=settings or {},
+                          session_factory=SignedCookieSessionFactory('test'))
+    config.include('pyramid_jinja2')
+    config.add_jinja2_search_path('pyramid_admin:templates/bootstrap3')
+    config.add_static_view('static', 'pyramid_admin:static')
+
+    return config
+
+
+def create_sqla_app(metadata, populate, *views):
+    """
+        Create Pyramid application with admin views of SQLAlchemy models
+        stored in an in-memory SQLite database. Queries of the database
+        are recorded by :func:`~pyramid_admin.queries.capture_queries`.
+
+        Returns `(app, views, session)` tuple.
+
+        :param metadata:
+            `MetaData` of the models
+        :param populate:
+            Function that adds test data to the session or `None`
+        :param views:
+            `(view class, model)` tuples
+    """
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    instrument_engine(engine)
+
+    session = scoped_session(sessionmaker(bind=engine))
+
+    if populate is not None:
+        populate(session)
+        session.commit()
+
+    config = create_config()
+
+    admin = base.Admin(config, template_mode='bootstrap3')
+    instances = [view_class(model, session) for view_class, model in views]
+
+    for view in instances:
+        admin.add_view(view)
+
+    return config.make_wsgi_app(), instances, session
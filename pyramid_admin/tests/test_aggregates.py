@@ -0,0 +1,182 @@
+from nose.plugins.skip import SkipTest
+from nose.tools import eq_, ok_, raises
+
+from pyramid.config import Configurator
+from pyramid.request import Request
+from sqlalchemy import Column, ForeignKey, Integer, Numeric, String, Table
+from sqlalchemy.orm import declarative_base, relationship
+
+from pyramid_admin import base
+from pyramid_admin.contrib.sqla import ModelView
+from pyramid_admin.queries import capture_queries
+from pyramid_admin.tests import create_sqla_app
+
+
+Base = declarative_base()
+
+
+customer_tags = Table('customer_tags', Base.metadata,
+                      Column('customer_id', Integer, ForeignKey('customers.id')),
+                      Column('tag_id', Integer, ForeignKey('tags.id')))
+
+
+class Tag(Base):
+    __tablename__ = 'tags'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+
+class Order(Base):
+    __tablename__ = 'orders'
+
+    id = Column(Integer, primary_key=True)
+    amount = Column(Numeric(10, 2))
+    customer_id = Column(Integer, ForeignKey('customers.id'))
+
+
+class Customer(Base):
+    __tablename__ = 'customers'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    orders = relationship(Order)
+    tags = relationship(Tag, secondary=customer_tags)
+
+
+class CustomerView(ModelView):
+    column_list = ('name', 'order_count', 'order_total', 'tag_count')
+    column_aggregates = {
+        'order_count': (Customer.orders, 'count'),
+        'order_total': ('orders', 'sum', Order.amount),
+        'tag_count': (Customer.tags, 'count'),
+    }
+    column_filters = ('order_count',)
+
+
+def populate(session):
+    tags = [Tag(name='a'), Tag(name='b')]
+    session.add_all([Customer(name='harry', orders=[Order(amount=10), Order(amount=5)],
+                              tags=tags),
+                     Customer(name='oliver', orders=[Order(amount=1)], tags=tags[:1]),
+                     Customer(name='jack')])
+
+
+def create_app(view_class):
+    app, (view,), session = create_sqla_app(Base.metadata, populate, (view_class, Customer))
+    return app, view
+
+
+def check_aggregates(view_class):
+    app, view = create_app(view_class)
+
+    with capture_queries() as log:
+        count, data = view.get_list(None, 'order_count', True, None, None)
+
+    eq_([(m.name, m.order_count, m.order_total, m.tag_count) for m in data],
+        [('harry', 2, 15, 2), ('oliver', 1, 1, 1), ('jack', 0, None, 0)])
+
+    # Count and list, children are not loaded
+    eq_(len(log), 2)
+
+    idx = view._filters.index([f for f in view._filters
+                               if f.operation() == 'greater than'][0])
+
+    count, data = view.get_list(None, None, False, None, [(idx, None, '0')])
+    eq_(count, 2)
+    eq_(sorted(m.name for m in data), ['harry', 'oliver'])
+
+    rv = Request.blank('/admin/customer/?sort=1').get_response(app)
+    eq_(rv.status_int, 200)
+    ok_('Order Count' in rv.text)
+
+
+def test_aggregates():
+    check_aggregates(CustomerView)
+
+
+def test_tuples():
+    class TupleView(CustomerView):
+        list_row_mode = 'tuples'
+
+    check_aggregates(TupleView)
+
+
+def test_scaffold():
+    class ScaffoldView(ModelView):
+        column_aggregates = CustomerView.column_aggregates
+
+    app, view = create_app(ScaffoldView)
+
+    eq_([name for name, _ in view._list_columns],
+        ['name', 'order_count', 'order_total', 'tag_count'])
+    ok_('order_count' in view._sortable_columns)
+
+
+def test_deferred():
+    class DeferredView(CustomerView):
+        column_deferred_list = ('order_total',)
+
+    app, view = create_app(DeferredView)
+
+    count, data = view.get_list(None, None, False, None, None)
+    ok_(not hasattr(data[0], 'order_total'))
+
+    eq_(sorted((m.name, m.order_total) for m in view.get_many(['1', '2'])),
+        [('harry', 15), ('oliver', 1)])
+
+
+@raises(Exception)
+def test_conflict():
+    class ConflictView(ModelView):
+        column_aggregates = {'orders': (Customer.orders, 'count')}
+
+    create_app(ConflictView)
+
+
+def test_pymongo():
+    try:
+        import mongomock
+    except ImportError:
+        raise SkipTest('mongomock is not installed')
+
+    from wtforms import fields, form
+
+    from pyramid_admin.contrib.pymongo import ModelView as PyMongoModelView
+
+    class CustomerForm(form.Form):
+        name = fields.StringField()
+
+    class CustomerDocView(PyMongoModelView):
+        form = CustomerForm
+        column_list = ('name', 'order_count', 'order_total')
+        column_sortable_list = ('name', 'order_count')
+        column_aggregates = {
+            'order_count': ('orders', 'customer_id', 'count'),
+            'order_total': ('orders', 'customer_id', 'sum', 'amount'),
+        }
+
+    db = mongomock.MongoClient().db
+    db.customers.insert_many([{'_id': 'c1', 'name': 'harry'},
+                              {'_id': 'c2', 'name': 'oliver'},
+                              {'_id': 'c3', 'name': 'jack'}])
+    db.orders.insert_many([{'customer_id': 'c1', 'amount': 10},
+                           {'customer_id': 'c1', 'amount': 5},
+                           {'customer_id': 'c2', 'amount': 1}])
+
+    config = Configurator(settings={})
+    admin = base.Admin(config)
+    view = CustomerDocView(db.customers)
+    admin.add_view(view)
+
+    count, data = view.get_list(None, 'order_count', True, None, None)
+    eq_([(d['name'], d['order_count'], d['order_total']) for d in data],
+        [('harry', 2, 15), ('oliver', 1, 1), ('jack', 0, 0)])
+    ok_(not any(key.startswith('__') for key in data[0]))
+
+    count, data = view.get_list(None, 'name', False, None, None)
+    eq_([(d['name'], d['order_count']) for d in data],
+        [('harry', 2), ('jack', 0), ('oliver', 1)])
+
+    eq_(sorted((d['name'], d['order_total']) for d in view.get_many(['c1', 'c2'])),
+        [('harry', 15), ('oliver', 1)])
@@ -0,0 +1,91 @@
+import json
+
+from nose.tools import eq_
+
+from pyramid.request import Request
+from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy.orm import declarative_base, relationship
+
+from pyramid_admin.contrib.sqla import ModelView
+from pyramid_admin.tests import create_sqla_app
+
+
+Base = declarative_base()
+
+
+class User(Base):
+    __tablename__ = 'users'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+    def __str__(self):
+        return self.name
+
+
+class Post(Base):
+    __tablename__ = 'posts'
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(50))
+    user_id = Column(Integer, ForeignKey(User.id))
+    user = relationship(User)
+
+
+class UserView(ModelView):
+    column_editable_list = ('name',)
+
+
+class PostView(ModelView):
+    page_size = 2
+    form_ajax_refs = {
+        'user': {'fields': ('name',)},
+    }
+
+
+def populate(session):
+    session.add_all([User(name='harry'), User(name='harriet'), User(name='oliver')])
+
+
+def create_app():
+    app, views, session = create_sqla_app(Base.metadata, populate,
+                                          (UserView, User), (PostView, Post))
+    return app, session
+
+
+def test_ajax_lookup():
+    app, session = create_app()
+
+    rv = Request.blank('/admin/post/ajax/lookup/?name=user&query=har').get_response(app)
+    eq_(rv.status_int, 200)
+    eq_(rv.content_type, 'application/json')
+    eq_(sorted(label for _, label in json.loads(rv.text)), ['harriet', 'harry'])
+
+    rv = Request.blank('/admin/post/ajax/lookup/?name=user&query=har&limit=1').get_response(app)
+    eq_(len(json.loads(rv.text)), 1)
+
+    # Limit is clamped to the page size
+    rv = Request.blank('/admin/post/ajax/lookup/?name=user&query=r&limit=100').get_response(app)
+    eq_(len(json.loads(rv.text)), 2)
+
+    rv = Request.blank('/admin/post/ajax/lookup/?name=user&limit=x').get_response(app)
+    eq_(rv.status_int, 400)
+
+    rv = Request.blank('/admin/post/ajax/lookup/?name=user&offset=-1').get_response(app)
+    eq_(rv.status_int, 400)
+
+    rv = Request.blank('/admin/post/ajax/lookup/?name=missing&limit=x').get_response(app)
+    eq_(rv.status_int, 404)
+
+
+def test_ajax_update():
+    app, session = create_app()
+
+    rv = Request.blank('/admin/user/ajax/update/', method='POST',
+                       POST={'name-1': 'henry'}).get_response(app)
+    eq_(rv.status_int, 200)
+    eq_(session.get(User, 1).name, 'henry')
+
+    rv = Request.blank('/admin/user/ajax/update/', method='POST',
+                       POST={'name-99': 'henry'}).get_response(app)
+    eq_(rv.status_int, 500)
@@ -0,0 +1,114 @@
+import gzip
+import io
+import os
+import shutil
+import tempfile
+
+from nose.tools import eq_, ok_
+
+from pyramid.config import Configurator
+from pyramid.request import Request
+from pyramid.response import Response
+
+from pyramid_admin import assets, base
+from pyramid_admin._compat import url_for
+
+
+CSS = b"""
+.a { background: url('../img/a.png'); }
+.b { src: url(../fonts/b.eot?#iefix); }
+.c { background: url(data:image/png;base64,AAAA); }
+"""
+
+JS = b'var admin = {};\n' * 100
+
+
+class AssetView(base.BaseView):
+    @base.expose('/')
+    def index(self):
+        return Response(url_for('admin.static', filename='js/app.js'))
+
+
+def create_source():
+    path = tempfile.mkdtemp()
+
+    files = {
+        'css/style.css': CSS,
+        'img/a.png': b'PNG',
+        'fonts/b.eot': b'EOT',
+        'js/app.js': JS,
+    }
+
+    for name, content in files.items():
+        filename = os.path.join(path, *name.split('/'))
+
+        if not os.path.isdir(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+
+        with open(filename, 'wb') as fp:
+            fp.write(content)
+
+    return path
+
+
+def test_build():
+    source = create_source()
+    target = tempfile.mkdtemp()
+
+    try:
+        manifest = assets.build(target, source, use_brotli=False)
+
+        eq_(sorted(manifest), ['css/style.css', 'fonts/b.eot', 'img/a.png', 'js/app.js'])
+        ok_(manifest['js/app.js'].startswith('js/app.'))
+        ok_(manifest['js/app.js'].endswith('.js'))
+
+        # References are rewritten to fingerprinted names
+        with open(os.path.join(target, manifest['css/style.css']), 'rb') as fp:
+            css = fp.read().decode('utf-8')
+
+        ok_("url('../%s')" % manifest['img/a.png'] in css)
+        ok_('url(../%s?#iefix)' % manifest['fonts/b.eot'] in css)
+        ok_('url(data:image/png;base64,AAAA)' in css)
+
+        # Precompressed sibling
+        with gzip.open(os.path.join(target, manifest['js/app.js'] + '.gz')) as fp:
+            eq_(fp.read(), JS)
+
+        # Same content, same names
+        eq_(assets.build(target, source, use_brotli=False), manifest)
+    finally:
+        shutil.rmtree(source)
+        shutil.rmtree(target)
+
+
+def test_serve():
+    source = create_source()
+    target = tempfile.mkdtemp()
+
+    try:
+        manifest = assets.build(target, source, use_brotli=False)
+
+        config = Configurator(settings={})
+        admin = base.Admin(config, static_assets_dir=target)
+        admin.add_view(AssetView())
+        app = config.make_wsgi_app()
+
+        url = Request.blank('/admin/assetview/').get_response(app).text
+        eq_(url, 'http://localhost/admin/_static/' + manifest['js/app.js'])
+
+        path = url[len('http://localhost'):]
+
+        rv = Request.blank(path).get_response(app)
+        eq_(rv.status_int, 200)
+        eq_(rv.body, JS)
+        ok_('immutable' in rv.headers['Cache-Control'])
+
+        rv = Request.blank(path, headers={'Accept-Encoding': 'gzip'}).get_response(app)
+        eq_(rv.content_encoding, 'gzip')
+        eq_(gzip.GzipFile(fileobj=io.BytesIO(rv.body)).read(), JS)
+
+        eq_(Request.blank('/admin/_static/manifest.json').get_response(app).status_int, 404)
+        eq_(Request.blank('/admin/_static/js/app.js').get_response(app).status_int, 404)
+    finally:
+        shutil.rmtree(source)
+        shutil.rmtree(target)
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import threading
+from datetime import date
+
+from nose.tools import eq_, ok_
+
+from wtforms import Form, fields
+
+from pyramid_admin import audit, json
+
+
+class MockSink(audit.BaseAuditSink):
+    def __init__(self):
+        self.batches = []
+        self.closed = False
+
+    def write(self, entries):
+        self.batches.append(list(entries))
+
+    def close(self):
+        self.closed = True
+
+
+class BlockingSink(MockSink):
+    def __init__(self):
+        super(BlockingSink, self).__init__()
+        self.event = threading.Event()
+
+    def write(self, entries):
+        self.event.wait()
+        super(BlockingSink, self).write(entries)
+
+
+class MockForm(Form):
+    name = fields.StringField()
+    born = fields.DateField()
+
+
+class MockModel(object):
+    def __init__(self, name, born):
+        self.name = name
+        self.born = born
+
+
+def test_normalize_value():
+    eq_(audit.normalize_value(None), None)
+    eq_(audit.normalize_value(5), 5)
+    eq_(audit.normalize_value(date(2015, 1, 2)), '2015-01-02')
+    eq_(audit.normalize_value((1, [date(2015, 1, 2)])), [1, ['2015-01-02']])
+    eq_(audit.normalize_value({1: object}), {u'1': u"<class 'object'>"})
+
+
+def test_form_changes():
+    obj = MockModel('test', date(2015, 1, 2))
+
+    form = MockForm(obj=obj)
+    eq_(audit.get_form_changes(form, False), {})
+
+    form.name.data = 'changed'
+    eq_(audit.get_form_changes(form, False), {'name': ('test', 'changed')})
+    eq_(audit.get_form_changes(form, False, exclude=('name',)), {})
+
+    changes = audit.get_form_changes(form, True)
+    eq_(changes, {'name': (None, 'changed'), 'born': (None, '2015-01-02')})
+
+
+def test_batching():
+    sink = MockSink()
+    log = audit.AuditLog(sink, batch_size=3, flush_interval=0.05)
+
+    for i in range(7):
+        ok_(log.record({'pk': i}))
+
+    ok_(log.flush(5))
+
+    eq_([e['pk'] for batch in sink.batches for e in batch], list(range(7)))
+    ok_(all(len(batch) <= 3 for batch in sink.batches))
+
+    log.close()
+    ok_(sink.closed)
+    ok_(not log.record({'pk': 8}))
+
+
+def test_backpressure():
+    sink = BlockingSink()
+    log = audit.AuditLog(sink, max_queue_size=2, batch_size=1,
+                         flush_interval=0.05, put_timeout=0.01)
+
+    results = [log.record({'pk': i}) for i in range(5)]
+
+    # One entry is held by the writer, two more fit in the queue
+    ok_(not all(results))
+    ok_(log.dropped >= 2)
+    eq_(log.dropped, results.count(False))
+
+    sink.event.set()
+    log.close()
+
+    eq_(len(sink.batches), results.count(True))
+
+
+def test_jsonlines_sink():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+
+    try:
+        log = audit.AuditLog(audit.JSONLinesAuditSink(path), flush_interval=0.05)
+        log.record({'pk': 1, 'changes': {'name': ['a', 'b']}})
+        log.record({'pk': 2, 'changes': {}})
+        log.close()
+
+        with open(path) as fp:
+            lines = [json.loads(line) for line in fp]
+
+        eq_(lines, [{'pk': 1, 'changes': {'name': ['a', 'b']}},
+                    {'pk': 2, 'changes': {}}])
+    finally:
+        os.remove(path)
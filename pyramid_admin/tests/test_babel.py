@@ -0,0 +1,226 @@
+import sys
+import types
+from contextlib import contextmanager
+
+try:
+    from importlib import reload
+except ImportError:
+    pass
+
+from nose.tools import eq_, ok_
+
+from pyramid import testing
+
+from pyramid_admin import babel
+from pyramid_admin.actions import ActionsMixin, action
+from pyramid_admin.helpers import set_current_view
+
+
+class LazyText(object):
+    def __init__(self, text):
+        self.text = text
+        self.resolved = 0
+
+    def __str__(self):
+        self.resolved += 1
+        return self.text
+
+    __unicode__ = __str__
+
+
+delete_text = LazyText('Delete')
+delete_confirmation = LazyText('Are you sure?')
+edit_text = LazyText('Edit')
+
+
+class MockActions(ActionsMixin):
+    def __init__(self):
+        super(MockActions, self).__init__()
+        self.init_actions()
+
+    def is_action_allowed(self, name):
+        return name != 'edit'
+
+    @action('delete', delete_text, delete_confirmation)
+    def action_delete(self, ids):
+        pass
+
+    @action('edit', edit_text)
+    def action_edit(self, ids):
+        pass
+
+
+def test_action_labels():
+    view = MockActions()
+
+    for _ in range(3):
+        actions, confirmation = view.get_actions_list()
+
+        eq_(actions, [('delete', u'Delete')])
+        eq_(confirmation, {'delete': u'Are you sure?'})
+
+    # Lazy strings are resolved once per catalog
+    eq_(delete_text.resolved, 1)
+    eq_(delete_confirmation.resolved, 1)
+    eq_(edit_text.resolved, 1)
+
+    view.init_actions()
+    view.get_actions_list()
+    eq_(delete_text.resolved, 2)
+
+
+class StubTranslations(object):
+    def __init__(self, path, locale):
+        self.path = path
+        self.locale = locale
+
+    def ugettext(self, string):
+        return u'%s:%s' % (self.path, string)
+
+
+class StubDomain(object):
+    """
+        Minimal `pyramid_babelex.Domain` with a locale-only catalog cache.
+    """
+    locale = 'en'
+    loads = []
+
+    def __init__(self, dirname=None, domain='messages'):
+        self.dirname = dirname
+        self.cache = {}
+
+    def get_translations_path(self, ctx):
+        return self.dirname
+
+    def get_translations_cache(self, ctx):
+        return self.cache
+
+    def get_translations(self):
+        cache = self.get_translations_cache(None)
+
+        translations = cache.get(self.locale)
+        if translations is None:
+            path = self.get_translations_path(None)
+            StubDomain.loads.append((path, self.locale))
+            translations = cache[self.locale] = StubTranslations(path, self.locale)
+
+        return translations
+
+    def gettext(self, string, **variables):
+        return self.get_translations().ugettext(string) % variables
+
+    def ngettext(self, singular, plural, num, **variables):
+        return self.gettext(singular if num == 1 else plural, **variables)
+
+    def lazy_gettext(self, string, **variables):
+        return self.gettext(string, **variables)
+
+
+@contextmanager
+def stub_babelex():
+    module = types.ModuleType('pyramid_babelex')
+    module.Domain = StubDomain
+
+    original = sys.modules.get('pyramid_babelex')
+    sys.modules['pyramid_babelex'] = module
+    del StubDomain.loads[:]
+
+    try:
+        yield reload(babel)
+    finally:
+        if original is None:
+            del sys.modules['pyramid_babelex']
+        else:
+            sys.modules['pyramid_babelex'] = original
+
+        reload(babel)
+
+
+class MockAdmin(object):
+    def __init__(self, translations_path):
+        self.translations_path = translations_path
+
+
+class MockView(object):
+    def __init__(self, translations_path):
+        self.admin = MockAdmin(translations_path)
+
+
+@contextmanager
+def request_for(view):
+    testing.setUp(request=testing.DummyRequest())
+    set_current_view(view)
+
+    try:
+        yield
+    finally:
+        set_current_view(None)
+        testing.tearDown()
+
+
+def test_babelex_catalog_key():
+    view_a = MockView('/translations/a')
+    view_b = MockView('/translations/b')
+
+    with stub_babelex() as stubbed:
+        # No catalog key outside of a request
+        eq_(stubbed.get_catalog_key(), None)
+
+        with request_for(view_a):
+            key_a = stubbed.get_catalog_key()
+            ok_(stubbed.get_catalog_key() is key_a)
+            eq_(stubbed.gettext('Delete'), u'/translations/a:Delete')
+
+        with request_for(view_b):
+            key_b = stubbed.get_catalog_key()
+            eq_(stubbed.gettext('Delete'), u'/translations/b:Delete')
+
+        # Catalogs are cached per translations path, so the key is stable
+        # between requests
+        with request_for(view_a):
+            ok_(stubbed.get_catalog_key() is key_a)
+
+        ok_(key_a is not key_b)
+        eq_(StubDomain.loads, [('/translations/a', 'en'), ('/translations/b', 'en')])
+
+        labels = {key_a: 'a', key_b: 'b'}
+
+        with request_for(view_b):
+            eq_(labels[stubbed.get_catalog_key()], 'b')
+
+    # Fallback is restored
+    eq_(babel.get_catalog_key(), None)
+    eq_(babel.gettext('Delete'), 'Delete')
+
+
+def test_babelex_action_labels():
+    text = LazyText('Delete')
+
+    class Actions(ActionsMixin):
+        def __init__(self):
+            super(Actions, self).__init__()
+            self.init_actions()
+
+        @action('delete', text)
+        def action_delete(self, ids):
+            pass
+
+    with stub_babelex() as stubbed:
+        # ActionsMixin looks the key up through the module it imported
+        import pyramid_admin.actions as actions_module
+
+        original = actions_module.get_catalog_key
+        actions_module.get_catalog_key = stubbed.get_catalog_key
+
+        try:
+            view = Actions()
+
+            for path in ('/translations/a', '/translations/a', '/translations/b'):
+                with request_for(MockView(path)):
+                    eq_(view.get_actions_list()[0], [('delete', u'Delete')])
+
+            # Resolved once per catalog
+            eq_(text.resolved, 2)
+            eq_(len(view._action_labels), 2)
+        finally:
+            actions_module.get_catalog_key = original
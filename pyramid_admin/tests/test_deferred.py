@@ -0,0 +1,115 @@
+import json
+import warnings
+
+from nose.tools import eq_, ok_
+
+from pyramid.request import Request
+from sqlalchemy import Column, ForeignKey, Integer, String, func, select
+from sqlalchemy.orm import column_property, declarative_base, relationship
+
+from pyramid_admin.contrib.sqla import ModelView
+from pyramid_admin.queries import capture_queries
+from pyramid_admin.tests import create_sqla_app
+
+
+Base = declarative_base()
+
+
+class Post(Base):
+    __tablename__ = 'posts'
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(50))
+    user_id = Column(Integer, ForeignKey('users.id'))
+
+
+class User(Base):
+    __tablename__ = 'users'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    posts = relationship(Post, backref='user')
+    post_count = column_property(select(func.count(Post.id))
+                                 .where(Post.user_id == id)
+                                 .correlate_except(Post)
+                                 .scalar_subquery())
+
+
+class UserView(ModelView):
+    column_list = ('name', 'post_count', 'titles')
+    column_deferred_list = ('post_count', 'titles')
+    column_formatters = {
+        'titles': lambda v, c, m, p: u', '.join(p.title for p in m.posts),
+    }
+
+
+def populate(session):
+    session.add_all([User(name='harry', posts=[Post(title='<b>first</b>'), Post(title='second')]),
+                     User(name='oliver')])
+
+
+def create_app(view_class):
+    app, (view,), session = create_sqla_app(Base.metadata, populate, (view_class, User))
+    return app, view
+
+
+def check_deferred(view_class):
+    app, view = create_app(view_class)
+
+    with capture_queries() as log:
+        rv = Request.blank('/admin/user/').get_response(app)
+
+    eq_(rv.status_int, 200)
+    ok_('data-id="1" data-column="post_count"' in rv.text)
+    ok_('data-id="2" data-column="titles"' in rv.text)
+    ok_('first' not in rv.text)
+
+    # Neither the aggregate nor the posts are loaded
+    eq_(len(log), 2)
+    ok_('posts' not in log.queries[1].statement)
+
+    rv = Request.blank('/admin/user/ajax/deferred/?id=1&id=2&id=99').get_response(app)
+    eq_(rv.status_int, 200)
+    eq_(json.loads(rv.text), {
+        '1': {'post_count': '2', 'titles': '&lt;b&gt;first&lt;/b&gt;, second'},
+        '2': {'post_count': '0', 'titles': ''},
+    })
+
+
+def test_deferred():
+    check_deferred(UserView)
+
+
+def test_tuples():
+    class TupleView(UserView):
+        list_row_mode = 'tuples'
+
+    # Deferred columns do not need to be selectable as tuples
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        check_deferred(TupleView)
+
+    eq_([x for x in w if 'as a tuple' in str(x.message)], [])
+
+
+def test_not_deferred():
+    app, view = create_app(ModelView)
+
+    rv = Request.blank('/admin/user/ajax/deferred/?id=1').get_response(app)
+    eq_(rv.status_int, 404)
+
+
+def test_auto_joins():
+    class PostView(ModelView):
+        column_list = ('title', 'user', 'user.name')
+
+    class DeferredPostView(PostView):
+        column_deferred_list = ('user', 'user.name')
+
+    app, (view, deferred_view), session = create_sqla_app(
+        Base.metadata, populate, (PostView, Post), (DeferredPostView, Post))
+
+    eq_(view._auto_joins, [Post.user])
+
+    # Deferred relations are not joined to the list query
+    eq_(deferred_view._auto_joins, [])
@@ -0,0 +1,101 @@
+import tracemalloc
+
+from nose.tools import eq_, ok_
+
+from pyramid.config import Configurator
+
+from wtforms import fields
+
+from pyramid_admin import base, diagnostics, form
+from pyramid_admin.model import BaseModelView
+
+
+class Model(object):
+    pass
+
+
+class Form(form.BaseForm):
+    col1 = fields.StringField()
+
+
+class MockModelView(BaseModelView):
+    def get_pk_value(self, model):
+        return 1
+
+    def scaffold_list_columns(self):
+        return ['col1']
+
+    def scaffold_sortable_columns(self):
+        return ['col1']
+
+    def init_search(self):
+        return False
+
+    def scaffold_form(self):
+        return Form
+
+
+def create_app():
+    class LazyModelView(MockModelView):
+        lazy_scaffolding = True
+
+    config = Configurator(settings={})
+    admin = base.Admin(config)
+    admin.add_view(MockModelView(Model, endpoint='eager'))
+    admin.add_view(LazyModelView(Model, endpoint='lazy'))
+    return config
+
+
+def test_profile():
+    original = MockModelView.__dict__['scaffold_form']
+
+    report = diagnostics.profile(create_app)
+
+    views = dict((v.endpoint, v) for v in report.views)
+    eq_(sorted(views), ['admin', 'eager', 'lazy'])
+
+    for endpoint in ('eager', 'lazy'):
+        view = views[endpoint]
+
+        for phase in ('total', 'routes', 'actions', 'list_columns', 'forms', 'filters'):
+            ok_(phase in view.time, (endpoint, phase))
+
+        ok_(view.total_time >= view.time['forms'])
+
+    ok_('forms' not in views['admin'].time)
+    ok_(report.total_time > 0)
+
+    # Instrumentation is removed
+    eq_(MockModelView.__dict__['scaffold_form'], original)
+    ok_(not hasattr(BaseModelView.__dict__['get_form'], '_profiled'))
+
+    data = report.to_dict()
+    eq_(len(data['views']), 3)
+    ok_('eager' in report.format_table())
+
+
+def test_check():
+    report = diagnostics.profile(create_app)
+
+    eq_(diagnostics.check(report), [])
+    eq_(len(diagnostics.check(report, max_time=0)), 1)
+    eq_(len(diagnostics.check(report, max_view_time=0)), 3)
+
+    baseline = {'total_time': report.total_time / 10}
+    eq_(len(diagnostics.check(report, baseline=baseline)), 1)
+
+
+def test_tracing():
+    ok_(not tracemalloc.is_tracing())
+
+    diagnostics.profile(create_app)
+    ok_(not tracemalloc.is_tracing())
+
+    # Tracing started by the caller is left running
+    tracemalloc.start()
+
+    try:
+        diagnostics.profile(create_app)
+        ok_(tracemalloc.is_tracing())
+    finally:
+        tracemalloc.stop()
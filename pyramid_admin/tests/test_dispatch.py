@@ -0,0 +1,79 @@
+from nose.tools import eq_, ok_
+
+from pyramid.config import Configurator
+from pyramid.response import Response
+from pyramid.request import Request
+
+from pyramid_admin import base, dispatch
+from pyramid_admin._compat import url_for
+
+
+class MockView(base.BaseView):
+    @base.expose('/')
+    def index(self):
+        return Response('Index')
+
+    @base.expose('/edit/', methods=('GET', 'POST'))
+    def edit(self):
+        return Response('Edit')
+
+    @base.expose('/b/<path:path>')
+    def browse(self, path=None):
+        return Response('Browse %s' % path)
+
+    @base.expose('/link/')
+    def link(self):
+        return Response(url_for('.browse', path='a/b c', sort=1))
+
+
+def create_app(**kwargs):
+    config = Configurator(settings={})
+    admin = base.Admin(config, **kwargs)
+    admin.add_view(MockView())
+    return config, admin
+
+
+def get(app, path, method='GET'):
+    return Request.blank(path, method=method).get_response(app)
+
+
+def test_url_rule():
+    rule = dispatch.UrlRule('/admin/b/<path:path>', None, 'browse', ('GET',))
+    eq_(rule.arguments, ['path'])
+    ok_('HEAD' in rule.methods)
+    eq_(rule.match('/admin/b/x/y'), {'path': 'x/y'})
+    eq_(rule.match('/admin/c/x'), None)
+    eq_(rule.build({'sort': 1}), None)
+    eq_(rule.build({'path': 'x y/z', 'sort': 1}), ('/admin/b/x%20y/z', {'sort': 1}))
+
+    rule = dispatch.UrlRule('/admin/', None, 'index', ('GET',))
+    eq_(rule.match('/admin/'), {})
+    eq_(rule.build({'page': 1}), ('/admin/', {'page': 1}))
+
+
+def test_single_route():
+    config, admin = create_app(single_route=True)
+
+    # One route for the whole admin
+    eq_(config.registry.admin_routes, set())
+
+    app = config.make_wsgi_app()
+
+    eq_(get(app, '/admin/mockview/').text, 'Index')
+    eq_(get(app, '/admin/mockview/edit/', 'POST').text, 'Edit')
+    eq_(get(app, '/admin/mockview/b/x/y').text, 'Browse x/y')
+    eq_(get(app, '/admin/mockview/link/').text,
+        'http://localhost/admin/mockview/b/a/b%20c?sort=1')
+
+    eq_(get(app, '/admin/mockview/missing/').status_int, 404)
+    eq_(get(app, '/admin/mockview/', 'POST').status_int, 405)
+
+
+def test_route_names():
+    config, admin = create_app()
+
+    ok_('mockview.index--1' in config.registry.admin_routes)
+    ok_('mockview.edit--1' in config.registry.admin_routes)
+
+    app = config.make_wsgi_app()
+    eq_(get(app, '/admin/mockview/').text, 'Index')
@@ -0,0 +1,115 @@
+import warnings
+
+from nose.tools import eq_, ok_, raises
+
+from pyramid.request import Request
+from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy.orm import declarative_base, relationship
+
+from pyramid_admin.contrib.sqla import ModelView
+from pyramid_admin.contrib.sqla.tools import ListRow, get_row_factory
+from pyramid_admin.tests import create_sqla_app
+
+
+Base = declarative_base()
+
+
+class User(Base):
+    __tablename__ = 'users'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+    def __str__(self):
+        return self.name
+
+
+class Post(Base):
+    __tablename__ = 'posts'
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(50))
+    user_id = Column(Integer, ForeignKey(User.id))
+    user = relationship(User)
+
+
+class PostView(ModelView):
+    list_row_mode = 'tuples'
+    column_list = ('title', 'user.name')
+    column_sortable_list = ('title', 'user.name')
+    column_searchable_list = ('title', User.name)
+    column_formatters = {
+        'title': lambda v, c, m, p: '%s #%s' % (m.title, m.id),
+    }
+
+
+def populate(session):
+    session.add_all([Post(title='first', user=User(name='harry')),
+                     Post(title='second', user=User(name='oliver')),
+                     Post(title='third')])
+
+
+def create_app(view_class):
+    app, (view,), session = create_sqla_app(Base.metadata, populate, (view_class, Post))
+    return app, view, session
+
+
+def test_row_factory():
+    make = get_row_factory('PostRow', ['id', 'title', 'user.name', 'user.id'])
+
+    row = make((1, 'first', 'harry', 2))
+    ok_(isinstance(row, ListRow))
+    eq_(type(row).__name__, 'PostRow')
+    eq_((row.id, row.title, row.user.name, row.user.id), (1, 'first', 'harry', 2))
+    ok_(not hasattr(row, '__dict__'))
+
+    # Missing relation
+    eq_(make((3, 'third', None, None)).user, None)
+
+
+def test_get_list():
+    app, view, session = create_app(PostView)
+
+    count, data = view.get_list(None, 'user.name', True, None, None)
+    eq_(count, 3)
+    eq_([(row.id, row.title, row.user and row.user.name) for row in data],
+        [(2, 'second', 'oliver'), (1, 'first', 'harry'), (3, 'third', None)])
+
+    # Rows are not loaded into the session
+    eq_(len(session.identity_map), 0)
+
+    count, data = view.get_list(None, None, False, 'harry', None)
+    eq_([row.title for row in data], ['first'])
+
+
+def test_index_view():
+    app, view, session = create_app(PostView)
+
+    rv = Request.blank('/admin/post/').get_response(app)
+    eq_(rv.status_int, 200)
+    ok_('first #1' in rv.text)
+    ok_('oliver' in rv.text)
+    ok_('/admin/post/edit/?id=2' in rv.text)
+
+
+def test_fallback():
+    class RelationView(ModelView):
+        list_row_mode = 'tuples'
+        column_list = ('title', 'user')
+
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        app, view, session = create_app(RelationView)
+
+    eq_(len([x for x in w if 'as a tuple' in str(x.message)]), 1)
+
+    count, data = view.get_list(None, None, False, None, None)
+    ok_(isinstance(data[0], Post))
+
+
+@raises(Exception)
+def test_invalid_mode():
+    class InvalidView(ModelView):
+        list_row_mode = 'rows'
+
+    create_app(InvalidView)
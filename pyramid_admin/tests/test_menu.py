@@ -0,0 +1,118 @@
+from nose.tools import eq_, ok_
+
+from pyramid.config import Configurator
+from pyramid.request import Request
+from pyramid.response import Response
+from pyramid.threadlocal import manager
+
+from pyramid_admin import base
+
+
+class MockView(base.BaseView):
+    def __init__(self, *args, **kwargs):
+        self.allow_access = kwargs.pop('allow_access', True)
+        self.checks = 0
+
+        super(MockView, self).__init__(*args, **kwargs)
+
+    @base.expose('/')
+    def index(self):
+        return Response('')
+
+    def is_accessible(self):
+        self.checks += 1
+        return self.allow_access
+
+
+class MockSecurityPolicy(object):
+    def identity(self, request):
+        return request.environ.get('userid')
+
+    def authenticated_userid(self, request):
+        return request.environ.get('userid')
+
+    def permits(self, request, context, permission):
+        return True
+
+
+def create_admin(**kwargs):
+    config = Configurator(settings={})
+    config.set_security_policy(MockSecurityPolicy())
+    config.commit()
+    admin = base.Admin(config, **kwargs)
+
+    views = [MockView(name='View1', endpoint='view1'),
+             MockView(name='View2', endpoint='view2', category='Cat'),
+             MockView(name='View3', endpoint='view3', category='Cat', allow_access=False),
+             MockView(name='View4', endpoint='view4', category='Hidden', allow_access=False)]
+
+    for view in views:
+        admin.add_view(view)
+
+    admin.add_link(base.MenuLink('Link', url='http://example.com'))
+
+    return config, admin, views
+
+
+def request(config, fn, userid=None):
+    request = Request.blank('/admin/', environ={'userid': userid})
+    request.registry = config.registry
+
+    manager.push({'request': request, 'registry': config.registry})
+
+    try:
+        return fn()
+    finally:
+        manager.pop()
+
+
+def test_visible_menu():
+    config, admin, views = create_admin()
+
+    def render():
+        menu = admin.visible_menu()
+        admin.visible_menu()
+        return menu, admin.visible_menu_links()
+
+    menu, links = request(config, render)
+
+    eq_([item.name for item, _ in menu], ['Home', 'View1', 'Cat'])
+    eq_([child.name for child in menu[2][1]], ['View2'])
+    eq_([link.name for link in links], ['Link'])
+
+    # Once per request
+    eq_([v.checks for v in views], [1, 1, 1, 1])
+
+    request(config, render)
+    eq_([v.checks for v in views], [2, 2, 2, 2])
+
+
+def test_menu_cache():
+    config, admin, views = create_admin(menu_cache_ttl=60)
+
+    request(config, admin.visible_menu, userid='user1')
+    request(config, admin.visible_menu, userid='user1')
+    eq_([v.checks for v in views], [1, 1, 1, 1])
+
+    request(config, admin.visible_menu, userid='user2')
+    eq_([v.checks for v in views], [2, 2, 2, 2])
+
+    # Anonymous users are not cached by default
+    request(config, admin.visible_menu)
+    request(config, admin.visible_menu)
+    eq_([v.checks for v in views], [4, 4, 4, 4])
+
+    # Menu changes invalidate the cache
+    admin.add_view(MockView(name='View5', endpoint='view5'))
+    menu = request(config, admin.visible_menu, userid='user1')
+    eq_([v.checks for v in views], [5, 5, 5, 5])
+    ok_('View5' in [item.name for item, _ in menu])
+
+
+def test_menu_cache_key():
+    config, admin, views = create_admin(menu_cache_ttl=60,
+                                        menu_cache_key=lambda request: 'shared')
+
+    request(config, admin.visible_menu, userid='user1')
+    request(config, admin.visible_menu, userid='user2')
+    eq_([v.checks for v in views], [1, 1, 1, 1])
@@ -0,0 +1,115 @@
+from nose.tools import eq_, ok_, raises
+
+from pyramid.config import Configurator
+from pyramid.request import Request
+from pyramid.response import Response
+
+from pyramid_admin import base, metrics
+
+
+class MockView(base.BaseView):
+    @base.expose('/')
+    def index(self):
+        return Response('')
+
+
+def test_counter():
+    registry = metrics.MetricsRegistry()
+    counter = registry.counter('requests_total', 'Requests', ('view',))
+
+    counter.inc(('a"b',))
+    counter.inc(('a"b',), 2)
+
+    eq_(counter.get(('a"b',)), 3)
+    eq_(registry.generate_text(),
+        '# HELP requests_total Requests\n'
+        '# TYPE requests_total counter\n'
+        'requests_total{view="a\\"b"} 3\n')
+
+
+def test_histogram():
+    registry = metrics.MetricsRegistry()
+    histogram = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1))
+
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    eq_(histogram.get_count(), 3)
+
+    lines = registry.generate_text().splitlines()
+    eq_(lines[2:], ['latency_seconds_bucket{le="0.1"} 1',
+                    'latency_seconds_bucket{le="1"} 2',
+                    'latency_seconds_bucket{le="+Inf"} 3',
+                    'latency_seconds_sum 5.55',
+                    'latency_seconds_count 3'])
+
+
+@raises(ValueError)
+def test_duplicate_metric():
+    registry = metrics.MetricsRegistry()
+    registry.counter('total', 'Total')
+    registry.histogram('total', 'Total')
+
+
+def test_null_metrics():
+    null = metrics.NULL_METRICS
+
+    ok_(not null.enabled)
+
+    with null.time_phase('view', 'count'):
+        pass
+
+    null.cache_hit('menu')
+
+    config = Configurator(settings={})
+    admin = base.Admin(config)
+    ok_(admin.metrics is metrics.NULL_METRICS)
+
+
+def test_admin_metrics():
+    admin_metrics = metrics.AdminMetrics()
+
+    config = Configurator(settings={'debug': True})
+    admin = base.Admin(config, metrics=admin_metrics)
+    admin.add_view(MockView())
+    admin.add_view(metrics.MetricsView())
+    app = config.make_wsgi_app()
+
+    Request.blank('/admin/mockview/').get_response(app)
+    Request.blank('/admin/mockview/').get_response(app)
+
+    eq_(admin_metrics.view_seconds.get_count(('mockview', 'index')), 2)
+
+    with admin_metrics.time_phase('mockview', 'count'):
+        pass
+
+    eq_(admin_metrics.list_phase_seconds.get_count(('mockview', 'count')), 1)
+
+    rv = Request.blank('/admin/metrics/').get_response(app)
+    eq_(rv.content_type, 'text/plain')
+
+    ok_('pyramid_admin_view_seconds_count{endpoint="mockview",view="index"} 2' in rv.text)
+    ok_('# TYPE pyramid_admin_cache_requests_total counter' in rv.text)
+
+    # Metrics view is not in the menu
+    ok_(not admin._views[-1].is_visible())
+
+
+def test_unauthorized():
+    admin_metrics = metrics.AdminMetrics()
+
+    config = Configurator(settings={})
+    admin = base.Admin(config, metrics=admin_metrics)
+    admin.add_view(metrics.MetricsView())
+    admin.add_view(metrics.MetricsView(endpoint='allowed', is_authorized=lambda request: True))
+    app = config.make_wsgi_app()
+
+    rv = Request.blank('/admin/metrics/').get_response(app)
+    eq_(rv.status_int, 403)
+
+    # Rejected requests are measured too
+    eq_(admin_metrics.view_seconds.get_count(('metrics', 'index')), 1)
+
+    rv = Request.blank('/admin/allowed/').get_response(app)
+    eq_(rv.status_int, 200)
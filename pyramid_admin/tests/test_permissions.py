@@ -0,0 +1,114 @@
+from nose.tools import eq_, ok_
+
+from pyramid.config import Configurator
+from pyramid.request import Request
+from pyramid.response import Response
+from pyramid.threadlocal import manager
+
+from pyramid_admin import base, helpers
+
+
+class MockSecurityPolicy(object):
+    def identity(self, request):
+        return request.environ.get('userid')
+
+    def authenticated_userid(self, request):
+        return request.environ.get('userid')
+
+    def permits(self, request, context, permission):
+        return True
+
+
+class MockView(base.BaseView):
+    def __init__(self, *args, **kwargs):
+        super(MockView, self).__init__(*args, **kwargs)
+        self.checks = []
+
+    @base.expose('/')
+    def index(self):
+        return Response('')
+
+    @base.cached_permission
+    def is_accessible(self):
+        self.checks.append('access')
+        return True
+
+    @base.cached_permission('action')
+    def is_action_allowed(self, name):
+        self.checks.append(name)
+        return name != 'delete'
+
+
+def push_request(config, userid=None):
+    request = Request.blank('/admin/', environ={'userid': userid})
+    request.registry = config.registry
+    manager.push({'request': request, 'registry': config.registry})
+    return request
+
+
+def create_config():
+    config = Configurator(settings={})
+    config.set_security_policy(MockSecurityPolicy())
+    config.commit()
+    return config
+
+
+def test_request_cache():
+    eq_(helpers.get_request_cache(), None)
+
+    config = create_config()
+    request = push_request(config)
+
+    try:
+        cache = helpers.get_request_cache()
+        cache['a'] = 1
+        eq_(helpers.get_request_cache(request), {'a': 1})
+    finally:
+        manager.pop()
+
+    request = push_request(config)
+    try:
+        eq_(helpers.get_request_cache(), {})
+    finally:
+        manager.pop()
+
+
+def test_cached_permission():
+    config = create_config()
+    view = MockView()
+
+    # No request, no caching
+    view.is_accessible()
+    view.is_accessible()
+    eq_(view.checks, ['access', 'access'])
+
+    view.checks = []
+    request = push_request(config, 'user1')
+
+    try:
+        ok_(view.is_accessible())
+        ok_(view.is_accessible())
+        ok_(view.is_action_allowed('edit'))
+        ok_(not view.is_action_allowed('delete'))
+        ok_(not view.is_action_allowed('delete'))
+        eq_(view.checks, ['access', 'edit', 'delete'])
+
+        # Decision depends on the user
+        request.environ['userid'] = 'user2'
+        view.is_accessible()
+        eq_(view.checks, ['access', 'edit', 'delete', 'access'])
+
+        # Other views are checked separately
+        other = MockView(endpoint='other')
+        other.is_accessible()
+        eq_(other.checks, ['access'])
+    finally:
+        manager.pop()
+
+    # Never shared between requests
+    push_request(config, 'user1')
+    try:
+        view.is_accessible()
+        eq_(view.checks.count('access'), 3)
+    finally:
+        manager.pop()
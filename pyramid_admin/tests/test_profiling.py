@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+import time
+
+from nose.tools import eq_, ok_
+
+from pyramid.request import Request
+from pyramid.response import Response
+
+from pyramid_admin import base, profiling
+from pyramid_admin.tests import create_config
+
+
+def busy(seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        pass
+
+
+class SlowView(base.BaseView):
+    @base.expose('/')
+    def index(self):
+        busy(0.1)
+        return Response('ok')
+
+
+def create_app(profiler, debug=True):
+    config = create_config({'debug': debug})
+
+    admin = base.Admin(config, template_mode='bootstrap3', profiler=profiler)
+    admin.add_view(SlowView())
+    admin.add_view(profiling.ProfilesView())
+
+    return config.make_wsgi_app()
+
+
+def test_profile():
+    path = tempfile.mkdtemp()
+
+    try:
+        profiler = profiling.RequestProfiler(path)
+        app = create_app(profiler)
+
+        rv = Request.blank('/admin/slowview/').get_response(app)
+        ok_(profiling.HEADER_NAME not in rv.headers)
+        eq_(profiler.list_profiles(), [])
+
+        rv = Request.blank('/admin/slowview/?_profile=1').get_response(app)
+        eq_(rv.text, 'ok')
+
+        name = rv.headers[profiling.HEADER_NAME]
+        eq_([n for n, _ in profiler.list_profiles()], [name])
+
+        with open(profiler.get_path(name, '.collapsed')) as fp:
+            ok_('test_profiling:busy' in fp.read())
+
+        # Page and downloads
+        rv = Request.blank('/admin/profilesview/').get_response(app)
+        ok_(name in rv.text)
+
+        rv = Request.blank('/admin/profilesview/download/?name=%s&ext=pstats' % name).get_response(app)
+        eq_(rv.status_int, 200)
+
+        rv = Request.blank('/admin/profilesview/download/?name=..%2Fetc&ext=pstats').get_response(app)
+        eq_(rv.status_int, 404)
+    finally:
+        shutil.rmtree(path)
+
+
+def test_unauthorized():
+    path = tempfile.mkdtemp()
+
+    try:
+        profiler = profiling.RequestProfiler(path)
+        app = create_app(profiler, debug=False)
+
+        rv = Request.blank('/admin/slowview/?_profile=1').get_response(app)
+        ok_(profiling.HEADER_NAME not in rv.headers)
+        eq_(os.listdir(path), [])
+
+        # Stored profiles are not exposed either
+        rv = Request.blank('/admin/profilesview/').get_response(app)
+        eq_(rv.status_int, 403)
+
+        rv = Request.blank('/admin/profilesview/download/?name=x&ext=pstats').get_response(app)
+        eq_(rv.status_int, 403)
+
+        rv = Request.blank('/admin/profilesview/aggregated/').get_response(app)
+        eq_(rv.status_int, 403)
+
+        rv = Request.blank('/admin/profilesview/reset/', method='POST').get_response(app)
+        eq_(rv.status_int, 403)
+    finally:
+        shutil.rmtree(path)
+
+
+def test_max_profiles():
+    path = tempfile.mkdtemp()
+
+    try:
+        profiler = profiling.RequestProfiler(path, max_profiles=1)
+        app = create_app(profiler)
+
+        Request.blank('/admin/slowview/?_profile=1').get_response(app)
+        rv = Request.blank('/admin/slowview/?_profile=1').get_response(app)
+
+        eq_([n for n, _ in profiler.list_profiles()], [rv.headers[profiling.HEADER_NAME]])
+        eq_(len(os.listdir(path)), 2)
+    finally:
+        shutil.rmtree(path)
+
+
+def test_sampling():
+    path = tempfile.mkdtemp()
+
+    try:
+        profiler = profiling.RequestProfiler(path, sample_rate=1, sample_interval=0.005)
+        app = create_app(profiler)
+
+        Request.blank('/admin/slowview/').get_response(app)
+
+        ok_('test_profiling:busy' in profiler.get_aggregated())
+        eq_(profiler.list_profiles(), [])
+
+        profiler.reset()
+        eq_(profiler.get_aggregated(), '')
+    finally:
+        shutil.rmtree(path)
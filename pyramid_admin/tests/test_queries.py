@@ -0,0 +1,145 @@
+from nose.tools import eq_, ok_
+
+from pyramid.config import Configurator
+from pyramid.request import Request
+from pyramid.response import Response
+from pyramid.threadlocal import get_current_request
+from sqlalchemy import create_engine, text
+
+from pyramid_admin import base, json, queries
+from pyramid_admin.contrib.sqla.queries import instrument_engine
+
+
+engine = create_engine('sqlite://')
+instrument_engine(engine)
+
+
+def load_value(conn):
+    return conn.execute(text('SELECT 2')).scalar()
+
+
+class QueryView(base.BaseView):
+    @base.expose('/')
+    def index(self):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            load_value(conn)
+
+        return Response('')
+
+
+def create_app(debug):
+    config = Configurator(settings={'debug': debug})
+    admin = base.Admin(config)
+    admin.add_view(QueryView())
+    return config.make_wsgi_app()
+
+
+def test_query_log():
+    rv = Request.blank('/admin/queryview/').get_response(create_app(True))
+
+    summary = json.loads(rv.headers[queries.HEADER_NAME])
+    eq_(summary['count'], 2)
+    eq_(summary['backends']['sqlalchemy']['count'], 2)
+
+
+def test_query_source():
+    query_log = []
+
+    class RecordingView(QueryView):
+        @base.expose('/')
+        def index(self):
+            response = super(RecordingView, self).index()
+            query_log.append(queries.get_query_log())
+            return response
+
+    config = Configurator(settings={'debug': True})
+    admin = base.Admin(config)
+    admin.add_view(RecordingView())
+
+    Request.blank('/admin/recordingview/').get_response(config.make_wsgi_app())
+
+    first, second = query_log[0]
+    eq_(first.statement, 'SELECT 1')
+    eq_(first.source, 'RecordingView.index')
+    ok_(first.location.endswith('in index'))
+
+    eq_(second.source, 'RecordingView.index')
+    ok_(second.location.endswith('in load_value'))
+
+
+def test_no_debug():
+    rv = Request.blank('/admin/queryview/').get_response(create_app(False))
+    ok_(queries.HEADER_NAME not in rv.headers)
+
+    # Outside of requests
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+
+
+def test_no_request_cache():
+    caches = []
+
+    class CacheView(QueryView):
+        @base.expose('/')
+        def index(self):
+            response = super(CacheView, self).index()
+            caches.append(get_current_request().__dict__.get('_admin_request_cache'))
+            return response
+
+    config = Configurator(settings={'debug': False})
+    admin = base.Admin(config)
+    admin.add_view(CacheView())
+
+    Request.blank('/admin/cacheview/').get_response(config.make_wsgi_app())
+    eq_(caches, [None])
+
+
+def test_instrument_twice():
+    other = create_engine('sqlite://')
+    instrument_engine(other)
+    instrument_engine(other)
+
+    with queries.capture_queries() as query_log:
+        with other.connect() as conn:
+            conn.execute(text('SELECT 1'))
+
+    eq_(query_log.count, 1)
+
+
+def test_capture_queries():
+    app = create_app(False)
+
+    with queries.capture_queries() as query_log:
+        Request.blank('/admin/queryview/').get_response(app)
+
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 3'))
+
+    eq_([q.statement for q in query_log], ['SELECT 1', 'SELECT 2', 'SELECT 3'])
+    eq_(query_log.queries[0].source, 'QueryView.index')
+
+    # Not recorded after the block
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+
+    eq_(query_log.count, 3)
+
+
+def test_assert_max_queries():
+    app = create_app(False)
+
+    with queries.assert_max_queries(2):
+        Request.blank('/admin/queryview/').get_response(app)
+
+    with queries.assert_max_queries(0, backend='pymongo'):
+        Request.blank('/admin/queryview/').get_response(app)
+
+    try:
+        with queries.assert_max_queries(1):
+            Request.blank('/admin/queryview/').get_response(app)
+    except AssertionError as ex:
+        ok_('2 queries executed, expected at most 1' in str(ex))
+        ok_('SELECT 2 [QueryView.index]' in str(ex))
+    else:
+        raise AssertionError('Query budget was not enforced')
@@ -0,0 +1,95 @@
+from nose.tools import eq_
+
+from pyramid.request import Request
+from sqlalchemy import Column, ForeignKey, Integer, String, Table
+from sqlalchemy.orm import declarative_base, relationship
+
+from pyramid_admin.contrib.sqla import ModelView
+from pyramid_admin.queries import assert_max_queries
+from pyramid_admin.tests import create_sqla_app
+
+
+Base = declarative_base()
+
+
+post_tags = Table('post_tags', Base.metadata,
+                  Column('post_id', Integer, ForeignKey('posts.id')),
+                  Column('tag_id', Integer, ForeignKey('tags.id')))
+
+
+class User(Base):
+    __tablename__ = 'users'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+    def __str__(self):
+        return self.name
+
+
+class Tag(Base):
+    __tablename__ = 'tags'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+    def __str__(self):
+        return self.name
+
+
+class Post(Base):
+    __tablename__ = 'posts'
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(50))
+    user_id = Column(Integer, ForeignKey(User.id))
+    user = relationship(User)
+    tags = relationship(Tag, secondary=post_tags)
+
+
+class PostView(ModelView):
+    column_list = ('title', 'user.name')
+
+
+def create_app(rows):
+    def populate(session):
+        tags = [Tag(name='tag%d' % i) for i in range(5)]
+        session.add_all(Post(title='post%d' % i, user=User(name='user%d' % i), tags=tags[:2])
+                        for i in range(rows))
+
+    app, views, session = create_sqla_app(Base.metadata, populate, (PostView, Post))
+    return app
+
+
+# Query budgets must not depend on the number of rows
+def test_index_view_queries():
+    for rows in (5, 50):
+        app = create_app(rows)
+
+        # Count and page, related users are joined
+        with assert_max_queries(2):
+            rv = Request.blank('/admin/post/').get_response(app)
+            eq_(rv.status_int, 200)
+
+
+def test_edit_view_queries():
+    for rows in (5, 50):
+        app = create_app(rows)
+
+        # Model, its user and tags, options of the user and tags fields
+        with assert_max_queries(5):
+            rv = Request.blank('/admin/post/edit/?id=1').get_response(app)
+            eq_(rv.status_int, 200)
+
+
+def test_action_delete_queries():
+    for rows in (5, 50):
+        app = create_app(rows)
+
+        # Selected models, then per model: savepoint, tags, two deletes, release
+        with assert_max_queries(11):
+            rv = Request.blank('/admin/post/action/', method='POST',
+                               POST=[('action', 'delete'),
+                                     ('rowid', '2'),
+                                     ('rowid', '3')]).get_response(app)
+            eq_(rv.status_int, 302)
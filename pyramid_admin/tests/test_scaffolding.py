@@ -0,0 +1,77 @@
+from nose.tools import eq_, ok_
+
+from pyramid.request import Request
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import declarative_base
+
+from pyramid_admin.contrib.sqla import ModelView
+from pyramid_admin.tests import create_sqla_app
+
+
+Base = declarative_base()
+
+
+class User(Base):
+    __tablename__ = 'users'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    email = Column(String(50))
+
+
+class Tag(Base):
+    __tablename__ = 'tags'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+
+class LazyView(ModelView):
+    lazy_scaffolding = True
+    column_filters = ('name',)
+
+
+def check_empty(view):
+    ok_(not view._scaffolded)
+    ok_(not hasattr(view, '_list_columns'))
+    ok_(not hasattr(view, '_create_form_class'))
+    ok_(not hasattr(view, '_filters'))
+
+
+def check_filled(view):
+    ok_(view._scaffolded)
+    eq_([name for name, _ in view._list_columns], ['name', 'email'])
+    ok_(view._create_form_class is not None)
+    ok_(view._edit_form_class is not None)
+    ok_(view._filters)
+    ok_(all(flt.column.key == 'name' for flt in view._filters))
+
+
+def test_first_request():
+    app, (view,), session = create_sqla_app(Base.metadata, None, (LazyView, User))
+    check_empty(view)
+
+    rv = Request.blank('/admin/user/').get_response(app)
+    eq_(rv.status_int, 200)
+    check_filled(view)
+
+
+def test_prepare():
+    app, (view,), session = create_sqla_app(Base.metadata, None, (LazyView, User))
+    check_empty(view)
+
+    view.prepare()
+    check_filled(view)
+
+
+def test_warmup():
+    app, (view, tag_view), session = create_sqla_app(Base.metadata, None,
+                                                     (LazyView, User), (ModelView, Tag))
+    check_empty(view)
+
+    # Views without lazy scaffolding are prepared in the constructor
+    ok_(tag_view._scaffolded)
+
+    timings = view.admin.warmup()
+    eq_([v for v, _ in timings if v in (view, tag_view)], [view, tag_view])
+    check_filled(view)
@@ -0,0 +1,149 @@
+from nose.tools import eq_, ok_
+
+from pyramid.request import Request
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, select
+from sqlalchemy.orm import declarative_base
+
+from pyramid_admin import base, slowlog
+from pyramid_admin.contrib.sqla import ModelView
+from pyramid_admin.contrib.sqla.tools import explain_query
+from pyramid_admin.tests import create_config, create_sqla_app
+
+
+Base = declarative_base()
+
+
+class User(Base):
+    __tablename__ = 'users'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    email = Column(String(50))
+
+
+class MockView(object):
+    slow_query_threshold = None
+
+
+def test_should_capture():
+    log = slowlog.SlowQueryLog(threshold=1, min_interval=60)
+    view = MockView()
+
+    ok_(not log.is_slow(view, 0.5))
+    ok_(log.is_slow(view, 1))
+
+    view.slow_query_threshold = 0.1
+    ok_(log.is_slow(view, 0.5))
+
+    eq_(log.should_capture('a'), 0)
+    eq_(log.should_capture('a'), None)
+    eq_(log.should_capture('a'), None)
+    eq_(log.should_capture('b'), 0)
+
+    # Skipped captures are reported with the next capture
+    log.min_interval = 0
+    eq_(log.should_capture('a'), 2)
+
+    log = slowlog.SlowQueryLog(sample_rate=0)
+    eq_(log.should_capture('a'), None)
+
+
+def test_entries():
+    log = slowlog.SlowQueryLog(max_entries=2)
+
+    for i in range(3):
+        log.add(slowlog.SlowQuery('view%d' % i, 1, {}))
+
+    eq_([e.endpoint for e in log.entries], ['view2', 'view1'])
+
+    log.clear()
+    eq_(log.entries, [])
+
+
+def test_explain_query():
+    engine = create_engine('sqlite://')
+
+    table = Table('users', MetaData(),
+                  Column('id', Integer, primary_key=True),
+                  Column('name', String(50)))
+    table.create(engine)
+
+    sql, plan = explain_query(select(table).where(table.c.name == 'test'), engine)
+
+    ok_("'test'" in sql)
+    ok_('users' in plan)
+
+
+def test_view():
+    log = slowlog.SlowQueryLog()
+    log.add(slowlog.SlowQuery('users', 1.5,
+                              {'page': None, 'sort': 'name', 'sort_desc': True, 'search': 'joe',
+                               'filters': [{'column': 'Name', 'operation': 'equals', 'value': 'x'}]},
+                              'SELECT 1', 'SCAN users'))
+
+    config = create_config({'debug': True})
+
+    admin = base.Admin(config, template_mode='bootstrap3')
+    admin.add_view(slowlog.SlowQueryView(log))
+
+    rv = Request.blank('/admin/slowqueryview/').get_response(config.make_wsgi_app())
+    eq_(rv.status_int, 200)
+
+    ok_('SCAN users' in rv.text)
+    ok_('Name equals x' in rv.text)
+
+
+def test_unauthorized():
+    log = slowlog.SlowQueryLog()
+    log.add(slowlog.SlowQuery('users', 1.5, {}, 'SELECT 1', 'SCAN users'))
+
+    config = create_config()
+
+    admin = base.Admin(config, template_mode='bootstrap3')
+    admin.add_view(slowlog.SlowQueryView(log))
+    admin.add_view(slowlog.SlowQueryView(log, endpoint='allowed',
+                                         is_authorized=lambda request: True))
+    app = config.make_wsgi_app()
+
+    rv = Request.blank('/admin/slowqueryview/').get_response(app)
+    eq_(rv.status_int, 403)
+
+    rv = Request.blank('/admin/allowed/').get_response(app)
+    eq_(rv.status_int, 200)
+    ok_('SCAN users' in rv.text)
+
+
+def test_index_view():
+    slow_query_log = slowlog.SlowQueryLog(threshold=0)
+
+    class UserView(ModelView):
+        column_list = ('name', 'email')
+        column_filters = ('name',)
+
+    UserView.slow_query_log = slow_query_log
+
+    def populate(session):
+        session.add_all([User(name='harry', email='harry@example.com'),
+                         User(name='oliver', email='oliver@example.com')])
+
+    app, (view,), session = create_sqla_app(Base.metadata, populate, (UserView, User))
+
+    flt = [f for f in view._filters if f.operation() == 'equals'][0]
+    arg = 'flt0_%s' % view._filter_arg_names[view._filters.index(flt)]
+
+    rv = Request.blank('/admin/user/?%s=harry&sort=1&desc=1' % arg).get_response(app)
+    eq_(rv.status_int, 200)
+
+    entry, = slow_query_log.entries
+    eq_(entry.endpoint, 'user')
+    eq_(entry.args['sort'], 'email')
+    ok_(entry.args['sort_desc'])
+    eq_(entry.args['filters'], [{'column': 'Name', 'operation': 'equals', 'value': 'harry'}])
+
+    # List query is explained
+    ok_('users' in entry.statement)
+    ok_('users' in entry.plan)
+
+    # Rate limited
+    Request.blank('/admin/user/').get_response(app)
+    eq_(len(slow_query_log.entries), 1)
@@ -0,0 +1,58 @@
+import transaction
+
+from nose.tools import eq_
+
+from pyramid.config import Configurator
+from sqlalchemy import Column, Integer, String, create_engine, select
+from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from pyramid_admin import audit, base
+from pyramid_admin.contrib.sqla import ModelView
+from pyramid_admin.contrib.sqla.audit import SQLAAuditSink
+
+
+Base = declarative_base()
+
+
+class User(Base):
+    __tablename__ = 'users'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+
+def test_after_commit():
+    # Entries are written by the audit writer thread
+    engine = create_engine('sqlite://', poolclass=StaticPool,
+                           connect_args={'check_same_thread': False})
+    Base.metadata.create_all(engine)
+
+    session = scoped_session(sessionmaker(bind=engine))
+
+    sink = SQLAAuditSink(engine)
+    audit_log = audit.AuditLog(sink, flush_interval=0.05)
+
+    class UserView(ModelView):
+        pass
+
+    UserView.audit_log = audit_log
+
+    admin = base.Admin(Configurator(settings={}))
+    view = UserView(User, session)
+    admin.add_view(view)
+
+    transaction.begin()
+    view._after_model_delete(User(id=1, name='committed'))
+    transaction.commit()
+
+    transaction.begin()
+    view._after_model_delete(User(id=2, name='rolled back'))
+    transaction.abort()
+
+    audit_log.close()
+
+    with engine.connect() as conn:
+        rows = conn.execute(select(sink.table.c.pk, sink.table.c.action)).fetchall()
+
+    eq_([tuple(row) for row in rows], [(u'1', audit.ACTION_DELETE)])
@@ -0,0 +1,201 @@
+from nose.plugins.skip import SkipTest
+from nose.tools import eq_, ok_, raises
+
+from pyramid.config import Configurator
+from pyramid.request import Request
+from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy.orm import declarative_base, relationship
+
+from pyramid_admin import base
+from pyramid_admin.contrib.sqla import ModelView
+from pyramid_admin.queries import capture_queries
+from pyramid_admin.tests import create_sqla_app
+
+
+Base = declarative_base()
+
+
+class Payment(Base):
+    __tablename__ = 'payments'
+
+    id = Column(Integer, primary_key=True)
+    amount = Column(Integer)
+    invoice_id = Column(Integer, ForeignKey('invoices.id'))
+
+
+class Invoice(Base):
+    __tablename__ = 'invoices'
+
+    id = Column(Integer, primary_key=True)
+    customer = Column(String(50))
+    amount = Column(Integer)
+    payments = relationship(Payment)
+
+
+class InvoiceView(ModelView):
+    column_list = ('customer', 'amount', 'paid')
+    column_searchable_list = ('customer',)
+    column_aggregates = {
+        'paid': (Invoice.payments, 'sum', Payment.amount),
+    }
+    column_summaries = {
+        'amount': ('sum', 'avg', 'min', 'max'),
+        'paid': 'sum',
+    }
+
+
+def populate(session):
+    session.add_all([Invoice(customer='harry', amount=10,
+                             payments=[Payment(amount=4), Payment(amount=6)]),
+                     Invoice(customer='harry', amount=20),
+                     Invoice(customer='oliver', amount=30, payments=[Payment(amount=5)])])
+
+
+def create_app(view_class):
+    app, (view,), session = create_sqla_app(Base.metadata, populate, (view_class, Invoice))
+    return app, view
+
+
+def test_index_view():
+    app, view = create_app(InvoiceView)
+
+    with capture_queries() as log:
+        rv = Request.blank('/admin/invoice/?search=harry').get_response(app)
+
+    eq_(rv.status_int, 200)
+    ok_('<tfoot>' in rv.text)
+    ok_('<strong>Sum:</strong> 30' in rv.text)
+    ok_('<strong>Average:</strong> 15' in rv.text)
+    ok_('<strong>Maximum:</strong> 20' in rv.text)
+    ok_('<strong>Sum:</strong> 10' in rv.text)
+
+    # Summaries are computed by the count query
+    eq_(len(log), 2)
+
+
+def test_no_summaries():
+    app, view = create_app(ModelView)
+
+    rv = Request.blank('/admin/invoice/').get_response(app)
+    eq_(rv.status_int, 200)
+    ok_('<tfoot>' not in rv.text)
+
+
+def test_cache():
+    class CachedView(InvoiceView):
+        list_totals_cache_ttl = 60
+
+    app, view = create_app(CachedView)
+
+    count, data = view.get_list(None, None, False, None, None)
+    eq_(count, 3)
+    eq_(view.get_list_summaries(None, None),
+        {'amount': {'sum': 60, 'avg': 20, 'min': 10, 'max': 30}, 'paid': {'sum': 15}})
+
+    # Filtered totals are cached separately
+    eq_(view.get_list_summaries('oliver', None), None)
+
+    with capture_queries() as log:
+        count, data = view.get_list(1, None, False, None, None)
+
+    eq_(count, 3)
+    eq_(len(log), 1)
+
+
+def test_cache_key():
+    users = ['harry']
+
+    class UserCachedView(InvoiceView):
+        list_totals_cache_ttl = 60
+
+        def get_query(self):
+            return super(UserCachedView, self).get_query().filter(Invoice.customer == users[0])
+
+        def get_count_query(self):
+            return super(UserCachedView, self).get_count_query().filter(
+                Invoice.customer == users[0])
+
+        def get_list_totals_cache_key(self, search, filters):
+            key = super(UserCachedView, self).get_list_totals_cache_key(search, filters)
+            return key + (users[0],)
+
+    app, view = create_app(UserCachedView)
+
+    count, data = view.get_list(None, None, False, None, None)
+    eq_(count, 2)
+
+    users[0] = 'oliver'
+
+    count, data = view.get_list(None, None, False, None, None)
+    eq_(count, 1)
+    eq_(view.get_list_summaries(None, None)['amount']['sum'], 30)
+
+
+def test_simple_pager():
+    class SimplePagerView(InvoiceView):
+        simple_list_pager = True
+        list_totals_cache_ttl = 60
+
+    app, view = create_app(SimplePagerView)
+
+    count, data = view.get_list(None, None, False, 'oliver', None)
+    eq_(count, None)
+    eq_(view.get_list_summaries('oliver', None)['amount']['sum'], 30)
+
+
+@raises(Exception)
+def test_invalid_function():
+    class InvalidView(ModelView):
+        column_summaries = {'amount': 'median'}
+
+    create_app(InvalidView)
+
+
+@raises(Exception)
+def test_related_column():
+    class RelatedView(ModelView):
+        column_list = ('customer', 'payments.amount')
+        column_summaries = {'payments.amount': 'sum'}
+
+    create_app(RelatedView)
+
+
+def test_pymongo():
+    try:
+        import mongomock
+    except ImportError:
+        raise SkipTest('mongomock is not installed')
+
+    from wtforms import fields, form
+
+    from pyramid_admin.contrib.pymongo import ModelView as PyMongoModelView
+    from pyramid_admin.contrib.pymongo.filters import FilterEqual
+
+    class InvoiceForm(form.Form):
+        customer = fields.StringField()
+
+    class InvoiceDocView(PyMongoModelView):
+        form = InvoiceForm
+        column_list = ('customer', 'amount')
+        column_filters = (FilterEqual('customer', 'Customer'),)
+        column_summaries = {'amount': ('sum', 'max')}
+        list_totals_cache_ttl = 60
+
+    db = mongomock.MongoClient().db
+    db.invoices.insert_many([{'customer': 'harry', 'amount': 10},
+                             {'customer': 'harry', 'amount': 20},
+                             {'customer': 'oliver', 'amount': 30}])
+
+    config = Configurator(settings={})
+    admin = base.Admin(config)
+    view = InvoiceDocView(db.invoices)
+    admin.add_view(view)
+
+    filters = [(0, 'customer', 'harry')]
+
+    count, data = view.get_list(None, None, False, None, filters)
+    eq_(count, 2)
+    eq_(view.get_list_summaries(None, filters), {'amount': {'sum': 30, 'max': 20}})
+
+    count, data = view.get_list(None, None, False, None, [(0, 'customer', 'jack')])
+    eq_(count, 0)
@@ -0,0 +1,127 @@
+import gc
+import os
+import shutil
+import tempfile
+import warnings
+
+from nose.tools import eq_, ok_
+
+from pyramid.config import Configurator
+from pyramid.request import Request
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
+
+from pyramid_admin import base, templating
+from pyramid_admin.contrib.sqla import ModelView
+
+
+def create_app(**kwargs):
+    config = Configurator(settings={})
+    config.include('pyramid_jinja2')
+    config.add_jinja2_search_path('pyramid_admin:templates/bootstrap3')
+
+    admin = base.Admin(config, template_mode='bootstrap3', **kwargs)
+
+    return config, admin
+
+
+def test_list_templates():
+    names = templating.list_templates('bootstrap3')
+
+    ok_('admin/master.jinja2' in names)
+    ok_('admin/model/list.jinja2' in names)
+
+
+def test_view_templates():
+    view = base.AdminIndexView()
+    eq_(templating.get_view_templates(view), set(['admin/index.jinja2']))
+
+
+def test_prefork_warmup():
+    config, admin = create_app()
+
+    try:
+        admin.prefork_warmup()
+    finally:
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+
+    env = templating.get_environment(config.registry)
+    cached = set(t.name for t in env.cache.values())
+
+    for name in templating.list_templates('bootstrap3'):
+        ok_(name in cached, name)
+
+
+def test_bytecode_cache():
+    path = tempfile.mkdtemp()
+
+    try:
+        config, admin = create_app(bytecode_cache_dir=path)
+        config.commit()
+
+        env = templating.get_environment(config.registry)
+        ok_(env.bytecode_cache is not None)
+
+        compiled = admin.compile_templates()
+        eq_(len(os.listdir(path)), compiled)
+
+        # Another worker loads templates from the cache
+        config, admin = create_app(bytecode_cache_dir=path)
+        config.commit()
+        eq_(admin.compile_templates(), compiled)
+        eq_(len(os.listdir(path)), compiled)
+    finally:
+        shutil.rmtree(path)
+
+
+class StreamView(base.BaseView):
+    stream_chunk_size = 100
+
+    @base.expose('/')
+    def index(self):
+        return self.render_streamed('admin/stream.jinja2', items=range(20))
+
+
+def test_render_streamed():
+    config, admin = create_app()
+    config.add_jinja2_search_path('pyramid_admin:tests/templates')
+    admin.add_view(StreamView())
+
+    app = config.make_wsgi_app()
+
+    # Iterated after the request was handled, like a WSGI server does
+    response = Request.blank('/admin/streamview/').get_response(app)
+
+    chunks = list(response.app_iter)
+    ok_(len(chunks) > 1)
+
+    body = b''.join(chunks).decode('utf-8')
+    eq_(body.count('<li>'), 20)
+    ok_('http://localhost/admin/streamview/?page=19' in body)
+
+
+def test_streamed_list_session():
+    Base = declarative_base()
+
+    class User(Base):
+        __tablename__ = 'users'
+
+        id = Column(Integer, primary_key=True)
+        name = Column(String(50))
+
+    class StreamedView(ModelView):
+        list_streaming = True
+
+    engine = create_engine('sqlite://')
+
+    def check(session):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            StreamedView(User, session)
+
+        return [x for x in w if 'expires models on commit' in str(x.message)]
+
+    eq_(len(check(scoped_session(sessionmaker(bind=engine)))), 1)
+    eq_(check(scoped_session(sessionmaker(bind=engine, expire_on_commit=False))), [])
+    eq_(check(sessionmaker(bind=engine, expire_on_commit=False)()), [])
@@ -0,0 +1,154 @@
+from nose.tools import eq_, ok_
+
+from pyramid.request import Request
+from sqlalchemy import Column, ForeignKey, Integer, LargeBinary, String, Text
+from sqlalchemy.orm import declarative_base, relationship
+
+from pyramid_admin.contrib.sqla import ModelView
+from pyramid_admin.model.typefmt import TruncatedValue
+from pyramid_admin.tests import create_sqla_app
+
+
+Base = declarative_base()
+
+
+class User(Base):
+    __tablename__ = 'users'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    bio = Column(String(500))
+
+
+class Post(Base):
+    __tablename__ = 'posts'
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(50))
+    text = Column(Text)
+    data = Column(LargeBinary)
+    user_id = Column(Integer, ForeignKey(User.id))
+    user = relationship(User)
+
+
+LONG_TEXT = u'lorem ipsum ' * 100
+
+
+def populate(session):
+    session.add_all([Post(title='long', text=LONG_TEXT, data=b'x' * 1000,
+                          user=User(name='harry', bio=LONG_TEXT)),
+                     Post(title='short', text=u'short text'),
+                     Post(title='empty')])
+
+
+def create_app(view_class):
+    app, (view,), session = create_sqla_app(Base.metadata, populate, (view_class, Post))
+    return app, view, session
+
+
+def test_scaffold():
+    app, view, session = create_app(ModelView)
+
+    names = [name for name, _ in view._list_columns]
+    ok_('text' in names)
+    ok_('data' not in names)
+    eq_(view._column_truncate, {'text': view.column_truncate_length})
+
+
+def test_truncated_value():
+    eq_(TruncatedValue(u'abc', 10).truncated, True)
+    eq_(TruncatedValue(u'abc', 3).truncated, False)
+    eq_(TruncatedValue(None, None).truncated, False)
+    eq_(TruncatedValue(None, 10).truncated, True)
+    eq_(TruncatedValue(u'abc', None, truncated=True).truncated, True)
+
+
+def check_list(view_class):
+    app, view, session = create_app(view_class)
+
+    count, data = view.get_list(None, None, False, None, None)
+    values = [view._get_field_value(row, 'text') for row in data]
+
+    eq_([(v.value, v.truncated) for v in values],
+        [(LONG_TEXT[:20], True), (u'short text', False), (None, False)])
+
+    rv = Request.blank('/admin/post/').get_response(app)
+    eq_(rv.status_int, 200)
+    ok_(LONG_TEXT[:20] + '&hellip;' in rv.text)
+    ok_(LONG_TEXT not in rv.text)
+    ok_('short text' in rv.text)
+    ok_('/admin/post/ajax/value/?id=1&amp;name=text' in rv.text)
+
+    # Full value is loaded even if the model is in the session
+    rv = Request.blank('/admin/post/ajax/value/?id=1&name=text').get_response(app)
+    eq_(rv.status_int, 200)
+    eq_(rv.text, LONG_TEXT)
+
+    rv = Request.blank('/admin/post/ajax/value/?id=1&name=title').get_response(app)
+    eq_(rv.status_int, 404)
+
+    rv = Request.blank('/admin/post/ajax/value/?id=99&name=text').get_response(app)
+    eq_(rv.status_int, 404)
+
+
+def test_list():
+    class PostView(ModelView):
+        column_list = ('title', 'text')
+        column_truncate_list = {'text': 20}
+
+    check_list(PostView)
+
+
+def test_tuples():
+    class PostView(ModelView):
+        list_row_mode = 'tuples'
+        column_list = ('title', 'text')
+        column_truncate_list = {'text': 20}
+
+    check_list(PostView)
+
+
+def test_binary_and_related():
+    class PostView(ModelView):
+        column_list = ('title', 'data', 'user.bio')
+        column_truncate_list = ('data', 'user.bio')
+
+    app, view, session = create_app(PostView)
+
+    count, data = view.get_list(None, None, False, None, None)
+
+    # Only length of binary columns is loaded
+    value = view._get_field_value(data[0], 'data')
+    eq_((value.value, value.length), (None, 1000))
+
+    # Related columns are truncated after loading
+    rv = Request.blank('/admin/post/').get_response(app)
+    eq_(rv.status_int, 200)
+    ok_(LONG_TEXT[:view.column_truncate_length] + '&hellip;' in rv.text)
+    ok_(LONG_TEXT not in rv.text)
+
+    # Binary values are downloaded, not loaded into the list
+    ok_('/admin/post/ajax/value/?id=1&amp;name=data">Download (1000)</a>' in rv.text)
+
+    rv = Request.blank('/admin/post/ajax/value/?id=1&name=user.bio').get_response(app)
+    eq_(rv.text, LONG_TEXT)
+
+    rv = Request.blank('/admin/post/ajax/value/?id=1&name=data').get_response(app)
+    eq_(rv.content_type, 'application/octet-stream')
+    eq_(rv.content_disposition, 'attachment')
+    eq_(rv.body, b'x' * 1000)
+
+
+def test_excluded():
+    class PostView(ModelView):
+        column_list = ('title', 'text')
+        column_editable_list = ('text',)
+
+    app, view, session = create_app(PostView)
+    eq_(view._column_truncate, {})
+
+    class BinaryView(ModelView):
+        column_list = ('title', 'data')
+
+    app, view, session = create_app(BinaryView)
+    eq_(view._column_truncate, {'data': 0})
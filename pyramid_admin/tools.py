@@ -1,4 +1,5 @@
 import sys
+import time
 import traceback
 
 # Python 3 compatibility
@@ -149,3 +150,45 @@ def iterdecode(value):
     result.append(accumulator)
 
     return tuple(result)
+
+
+class TimedCache(object):
+    """
+        Cache with limited entry lifetime.
+    """
+    def __init__(self, ttl, max_size=1000):
+        """
+            Constructor.
+
+            :param ttl:
+                Entry lifetime, in seconds
+            :param max_size:
+                Maximum number of entries. Cache is cleared when exceeded.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._data = {}
+
+    def get(self, key):
+        entry = self._data.get(key)
+
+        if entry is None:
+            return None
+
+        expires, value = entry
+
+        if expires < time.time():
+            self._data.pop(key, None)
+            return None
+
+        return value
+
+    def set(self, key, value):
+        if len(self._data) >= self.max_size:
+            self._data.clear()
+
+        self._data[key] = (time.time() + self.ttl, value)
+
+    def clear(self):
+        self._data.clear()